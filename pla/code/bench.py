@@ -0,0 +1,656 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: bench.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Benchmark del simulatore.
+
+Il gruppo I{jit} confronta i motori NumPy con quelli compilati di kernels.JitEngine, sui circuiti
+della libreria e su circuiti sintetici di grandi dimensioni; la compilazione Numba viene eseguita
+prima delle misure. Il gruppo I{threads} misura la scalabilità di parallel.ThreadRunner al variare
+del numero di thread. Il gruppo I{sim} misura le operazioni del simulatore: valutazione, caricamento
+dei circuiti e cambio dei fusibili nel modello (model.PlaModel) e nella vista (pla.Pla), costruzione
+del layout e sintesi con Circuit.generate_obj; le misure della vista richiedono un display, e
+vengono saltate se questo non è disponibile. I tempi riportati sono il migliore di più ripetizioni,
+in millisecondi.
+
+Il gruppo I{gui}, non compreso tra quelli predefiniti, misura la latenza dell'interfaccia grafica
+come la percepisce l'utente: il simulatore viene avviato su un display virtuale Xvfb, per avere
+misure riproducibili e indipendenti dal desktop, e pilotato con eventi generati da event_generate
+(clic sui fusibili, tasti r, f e u) e con i comandi del menu Library. Ogni latenza è misurata
+dall'evento fino a quando Tkinter non ha più eventi né operazioni I{idle} in attesa, cioè fino
+al completamento del ridisegno del canvas, per ciascuna delle dimensioni di I{sim}. Con l'opzione
+-x viene usato il display corrente invece di Xvfb.
+
+Con l'opzione -j tutte le tabelle misurate vengono scritte anche in un file JSON, per confrontare
+versioni diverse del simulatore.
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+"""
+
+from __future__ import print_function
+from optparse   import OptionParser
+from timeit     import default_timer
+from itertools  import product
+from numpy      import array
+from numpy.random import RandomState
+from time       import sleep
+from circuits   import Circuit
+from model      import PlaModel
+import circuits
+import engine
+import kernels
+import parallel
+import json
+import os
+import platform
+
+usage   = """%prog [-r repeat][-s n_inputs,n_and,n_outputs,density ...][-w workers ...][-c chunk][-j json][-x] [jit|threads|sim|gui ...]"""
+
+sizes   = [ ( 32, 1024, 16, 0.05 ), ( 200, 10000, 32, 0.02 ) ]
+workers = [ 1, 2, 4, 8, 16, 32 ]
+sim_sizes   = [ ( 6, 16, 8, 0.3 ), ( 16, 64, 8, 0.1 ), ( 32, 256, 16, 0.05 ) ]
+synth_inputs    = [ 2, 4, 6, 8, 10 ]
+clicks  = 20                            # clic sui fusibili per misura
+results = []                            # tabelle misurate, per il file JSON
+
+
+def best_time( f, repeat=3 ):
+    """
+    Misura il tempo di esecuzione di una funzione.
+
+    @param f: funzione senza argomenti da misurare
+    @param repeat: numero di ripetizioni
+    @return: il tempo migliore, in millisecondi
+    """
+    best    = None
+    for i in range( repeat ):
+        t0  = default_timer()
+        f()
+        t   = default_timer() - t0
+        if best is None or t < best:
+            best = t
+    return 1e3 * best
+
+
+def synthetic( n_inputs, n_and, n_outputs, density, seed=0 ):
+    """
+    Genera un circuito casuale.
+    Ogni riga AND collega ciascun ingresso con probabilità I{density}, in una sola polarità;
+    ogni porta AND è collegata a una uscita scelta a caso.
+
+    @param n_inputs: numero di ingressi
+    @param n_and: numero di porte AND
+    @param n_outputs: numero di uscite
+    @param density: frazione di fusibili collegati nella matrice IN-AND
+    @param seed: seme del generatore casuale
+    @rtype: Circuit
+    """
+    rs      = RandomState( seed )
+    c       = Circuit( n_inputs, n_outputs, n_and )
+    c.description = 'synthetic %dx%dx%d' % ( n_inputs, n_and, n_outputs )
+    c.labels_i  = [ 'I%d' % k for k in range( n_inputs ) ]
+    c.labels_o  = [ 'O%d' % k for k in range( n_outputs ) ]
+    live    = rs.random_sample( ( n_and, n_inputs ) ) < 2 * density
+    pol     = rs.randint( 0, 2, ( n_and, n_inputs ) )
+    r, k    = live.nonzero()
+    c.and_matrix[ r, 2 * k + pol[ r, k ] ] = 1
+    c.or_matrix[ range( n_and ), rs.randint( 0, n_outputs, n_and ) ] = 1
+    return c
+
+
+def vectors( n_inputs, n=None, seed=0 ):
+    """
+    Genera un blocco di vettori di ingresso: tutti i 2^n_inputs vettori se I{n} è None,
+    altrimenti I{n} vettori casuali.
+
+    @param n_inputs: numero di ingressi
+    @param n: numero di vettori
+    @param seed: seme del generatore casuale
+    """
+    if n is None:
+        return array( list( product( [ 0, 1 ], repeat=n_inputs ) ), dtype=bool )
+    return RandomState( seed ).randint( 0, 2, ( n, n_inputs ) ).astype( bool )
+
+
+# ======================================================================================================= #
+
+
+def bench_circuit( c, x, repeat ):
+    """
+    Confronta i motori su un circuito, per un blocco di vettori di ingresso.
+
+    @param c: circuito
+    @type c: Circuit
+    @param x: blocco di vettori di ingresso
+    @param repeat: numero di ripetizioni
+    @return: dizionario dei tempi, indicizzato da (operazione, motore)
+    """
+    engines = [ ( 'dense', engine.DenseEngine ), ( 'sparse', engine.SparseEngine ) ]
+    if kernels.available:
+        engines.append( ( 'jit', kernels.JitEngine ) )
+
+    good    = engine.DenseEngine( c.and_matrix, c.or_matrix ).run( x )
+    bad     = good.copy()
+    bad[ 0, 0 ] = not bad[ 0, 0 ]               # errore sul primo vettore: uscita anticipata
+
+    t       = {}
+    for name, cls in engines:
+        e   = cls( c.and_matrix, c.or_matrix )
+        e.run( x[ : 1 ] )
+        e.first_mismatch( x[ : 1 ], bad[ : 1 ] )
+        t[ 'run', name ]        = best_time( lambda: e.run( x ), repeat )
+        t[ 'verify', name ]     = best_time( lambda: e.first_mismatch( x, good ), repeat )
+        t[ 'early', name ]      = best_time( lambda: e.first_mismatch( x, bad ), repeat )
+    return t
+
+
+def bench_faults( c, repeat ):
+    """
+    Confronta i motori nella simulazione dei guasti, su tutti i vettori di ingresso.
+
+    @param c: circuito
+    @type c: Circuit
+    @param repeat: numero di ripetizioni
+    """
+    x       = vectors( c.n_inputs )
+    t       = {}
+    for name, cls in [ ( 'dense', engine.DenseEngine ), ( 'jit', kernels.JitEngine ) ]:
+        if name == 'jit' and not kernels.available:
+            continue
+        e   = cls( c.and_matrix, c.or_matrix )
+        e.fault_sim( x[ : 1 ] )
+        t[ 'faults', name ]     = best_time( lambda: e.fault_sim( x ), repeat )
+    return t
+
+
+def bench_sequence( c, feedback, cycles, repeat ):
+    """
+    Confronta i motori nella simulazione sequenziale di un flip-flop.
+
+    @param c: circuito
+    @type c: Circuit
+    @param feedback: lista di coppie (uscita, ingresso) retroazionate
+    @param cycles: numero di cicli
+    @param repeat: numero di ripetizioni
+    """
+    x       = vectors( c.n_inputs, cycles )
+    t       = {}
+    for name, cls in [ ( 'dense', engine.DenseEngine ), ( 'jit', kernels.JitEngine ) ]:
+        if name == 'jit' and not kernels.available:
+            continue
+        e   = cls( c.and_matrix, c.or_matrix )
+        e.sequence( x[ : 2 ], feedback )
+        t[ 'sequence', name ]   = best_time( lambda: e.sequence( x, feedback ), repeat )
+    return t
+
+
+def report( title, t ):
+    """
+    Stampa una tabella dei tempi misurati.
+
+    @param title: intestazione della tabella
+    @param t: dizionario dei tempi, indicizzato da (operazione, motore)
+    """
+    print( title )
+    for op in sorted( set( k[ 0 ] for k in t ) ):
+        row = [ '%s %9.3f' % ( k[ 1 ], t[ k ] ) for k in sorted( t ) if k[ 0 ] == op ]
+        print( '    %-10s' % op, '   '.join( row ) )
+    results.append( { 'title': title, 'times': dict( ( '%s %s' % k, t[ k ] ) for k in t ) } )
+
+
+def bench_jit( repeat, sizes ):
+    """
+    Esegue il confronto tra motori NumPy e compilati.
+
+    @param repeat: numero di ripetizioni di ogni misura
+    @param sizes: lista di dimensioni (n_inputs, n_and, n_outputs, density) dei circuiti sintetici
+    """
+    if not kernels.available:
+        print( "Numba non installato: vengono misurati solo i motori NumPy" )
+
+    for c in circuits.circs:
+        t   = bench_circuit( c, vectors( c.n_inputs ), repeat )
+        t.update( bench_faults( c, repeat ) )
+        report( c.description, t )
+
+    for c, fb in [ ( circuits.circ_sr, [ ( 0, 2 ), ( 1, 3 ) ] ),
+                   ( circuits.circ_t, [ ( 0, 1 ) ] ),
+                   ( circuits.circ_jk, [ ( 0, 2 ) ] ) ]:
+        report( c.description, bench_sequence( c, fb, 10000, repeat ) )
+
+    for s in sizes:
+        c   = synthetic( *s )
+        report( c.description, bench_circuit( c, vectors( c.n_inputs, 1000 ), repeat ) )
+
+
+def bench_threads( repeat, workers, chunk, size=( 22, 1024, 16, 0.05 ) ):
+    """
+    Misura la scalabilità della valutazione a blocchi su thread, calcolando la tabella di verità
+    completa di un circuito sintetico.
+
+    Per ogni numero di thread sono riportati il tempo, l'accelerazione rispetto alla prima misura
+    della lista (normalmente 1 thread) e l'efficienza, cioè l'accelerazione divisa per il rapporto
+    tra i numeri di thread delle due misure: un'efficienza vicina a 1 indica una scalabilità lineare. Oltre il numero di
+    processori disponibili, anch'esso riportato, l'accelerazione non può crescere, e le righe
+    relative sono segnate con '*'; le misure sono significative solo su macchine con almeno
+    tanti processori quanti thread.
+
+    @param repeat: numero di ripetizioni di ogni misura
+    @param workers: lista del numero di thread da provare
+    @param chunk: numero di vettori per blocco
+    @param size: dimensioni (n_inputs, n_and, n_outputs, density) del circuito sintetico
+    """
+    c       = synthetic( *size )
+    cpus    = parallel.cpu_count()
+    print( c.description, '- %d vettori, blocchi da %d, %d processori' % ( 1 << c.n_inputs, chunk,
+            cpus ) )
+    print( '    %10s %10s %8s %10s' % ( 'thread', 'tempo', 'acc.', 'efficienza' ) )
+    base    = None
+    for w in workers:
+        with parallel.ThreadRunner( c.and_matrix, c.or_matrix, w, chunk ) as r:
+            t   = best_time( r.truth_table, repeat )
+        if base is None:
+            base = t
+        print( '    %10d %10.1f   x%5.2f %10.2f %s' % ( w, t, base / t, base * workers[ 0 ] / t / w,
+                '*' if w > cpus else '' ) )
+        results.append( { 'title': '%s, %d thread' % ( c.description, w ), 'cpus': cpus,
+                          'times': { 'truth_table threads': t } } )
+
+
+
+def bench_model( c, repeat, toggles=100 ):
+    """
+    Misura le operazioni del modello logico su un circuito: caricamento, valutazione di un vettore
+    e cambio di fusibili.
+
+    @param c: circuito
+    @type c: Circuit
+    @param repeat: numero di ripetizioni
+    @param toggles: numero di fusibili cambiati in ogni misura
+    """
+    m       = PlaModel( c.n_inputs, c.n_outputs, c.n_and )
+    rs      = RandomState( 0 )
+    r, k    = rs.randint( 0, c.n_and, toggles ), rs.randint( 0, 2 * c.n_inputs, toggles )
+    t       = {}
+    t[ 'load', 'model' ]    = best_time( lambda: m.load( c ), repeat )
+    m.inputs[ : ]           = rs.randint( 0, 2, c.n_inputs )
+    t[ 'run', 'model' ]     = best_time( m.run, repeat )
+    t[ 'toggle', 'model' ]  = best_time( lambda: [ m.toggle( 'in', *f ) for f in zip( r, k ) ],
+                                         repeat )
+    return t
+
+
+def bench_view( root, c, repeat, toggles=100 ):
+    """
+    Misura le operazioni del simulatore con interfaccia grafica, per un PLA delle dimensioni del
+    circuito: costruzione del layout, caricamento del circuito in alternativa al circuito vuoto,
+    valutazione, cambio di fusibili, collegamento e interruzione di tutti i fusibili.
+
+    @param root: finestra principale di Tkinter
+    @param c: circuito
+    @type c: Circuit
+    @param repeat: numero di ripetizioni
+    @param toggles: numero di fusibili cambiati in ogni misura
+    """
+    import pla
+    pla.gui()
+    dims    = ( c.n_inputs, c.n_outputs, c.n_and )
+    t       = {}
+    best    = None
+    for i in range( repeat ):
+        w   = pla.Toplevel( root )
+        p   = pla.Pla( w, *dims )
+        t0  = default_timer()
+        p.place_components()
+        root.update_idletasks()
+        dt  = default_timer() - t0
+        best = dt if best is None or dt < best else best
+        if i < repeat - 1:
+            w.destroy()
+    t[ 'place', 'view' ]    = 1e3 * best
+
+    empty   = Circuit( *dims )
+    empty.description   = 'empty'
+    empty.labels_i      = [ '' ] * c.n_inputs
+    empty.labels_o      = [ '' ] * c.n_outputs
+    def load():
+        p.load( empty )
+        p.load( c )
+        root.update_idletasks()
+    t[ 'load', 'view' ]     = best_time( load, repeat ) / 2
+    p.model.inputs[ : ]     = RandomState( 0 ).randint( 0, 2, c.n_inputs )
+    t[ 'run', 'view' ]      = best_time( p.run, repeat )
+
+    rs      = RandomState( 0 )
+    r, k    = rs.randint( 0, c.n_and, toggles ), rs.randint( 0, 2 * c.n_inputs, toggles )
+    t[ 'toggle', 'view' ]   = best_time( lambda: [ p.switch_fuse( 'in', *f ) for f in zip( r, k ) ],
+                                         repeat )
+    def fill():
+        p.fuse_all()
+        p.reset()
+        root.update_idletasks()
+    t[ 'fill', 'view' ]     = best_time( fill, repeat ) / 2
+    w.destroy()
+    return t
+
+
+def bench_library( root, repeat ):
+    """
+    Misura il caricamento di ogni circuito della libreria, nel simulatore con le dimensioni
+    predefinite, partendo dai fusibili tutti collegati.
+
+    @param root: finestra principale di Tkinter, None per il solo modello logico
+    @param repeat: numero di ripetizioni
+    @return: dizionario dei tempi, indicizzato da (circuito, vista o modello)
+    """
+    import pla
+    t       = {}
+    m       = PlaModel( pla.Pla.n_inputs, pla.Pla.n_outputs, pla.Pla.n_and )
+    p       = None
+    if root is not None:
+        pla.gui()
+        w   = pla.Toplevel( root )
+        p   = pla.Pla( w )
+        p.place_components()
+    for c in circuits.circs:
+        def load_model():
+            m.reset()
+            m.load( c )
+        t[ c.description, 'model' ] = best_time( load_model, repeat )
+        if p is not None:
+            def load_view():
+                p.reset()
+                p.load( c )
+                root.update_idletasks()
+            t[ c.description, 'view' ]  = best_time( load_view, repeat )
+    if p is not None:
+        w.destroy()
+    return t
+
+
+def bench_synthesis( repeat, inputs, n_outputs=4 ):
+    """
+    Misura la sintesi di circuiti con Circuit.generate_obj, per funzioni casuali con un numero
+    crescente di ingressi.
+
+    @param repeat: numero di ripetizioni
+    @param inputs: lista del numero di ingressi
+    @param n_outputs: numero di uscite delle funzioni
+    """
+    t       = {}
+    for n in inputs:
+        table   = RandomState( n ).randint( 0, 2, ( 1 << n, n_outputs ) ).astype( bool )
+        f       = lambda *x: tuple( table[ int( ''.join( '1' if b else '0' for b in x ), 2 ) ] )
+        names_i = [ 'I%d' % k for k in range( n ) ]
+        names_o = [ 'O%d' % k for k in range( n_outputs ) ]
+        t[ 'generate', '%d inputs' % n ]    = best_time(
+                lambda: Circuit.generate_obj( 'random', f, names_i, names_o ), repeat )
+    return t
+
+
+def bench_sim( repeat, sizes, inputs ):
+    """
+    Esegue le misure del simulatore: modello logico e, se è disponibile un display, vista
+    grafica, su circuiti sintetici; caricamento dei circuiti della libreria; sintesi.
+
+    @param repeat: numero di ripetizioni di ogni misura
+    @param sizes: lista di dimensioni (n_inputs, n_and, n_outputs, density) dei circuiti sintetici
+    @param inputs: lista del numero di ingressi dei circuiti sintetizzati
+    """
+    import pla
+    pla.gui()
+    try:
+        root    = pla.Tk()
+        root.withdraw()
+    except pla.TclError as e:
+        print( "display non disponibile, misure della vista saltate:", e )
+        root    = None
+
+    for s in sizes:
+        c   = synthetic( *s )
+        t   = bench_model( c, repeat )
+        if root is not None:
+            t.update( bench_view( root, c, repeat ) )
+        report( c.description, t )
+    report( 'library', bench_library( root, repeat ) )
+    report( 'generate_obj', bench_synthesis( repeat, inputs ) )
+    if root is not None:
+        root.destroy()
+
+
+def xvfb( screen='1600x1200x24' ):
+    """
+    Avvia un display virtuale Xvfb sul primo numero di display libero a partire da 99, e lo
+    assegna alla variabile d'ambiente DISPLAY.
+
+    @param screen: dimensioni e profondità di colore dello schermo virtuale
+    @return: il processo Xvfb, o None se non è stato possibile avviarlo
+    """
+    from subprocess import Popen
+    n       = 99
+    while os.path.exists( '/tmp/.X11-unix/X%d' % n ) or os.path.exists( '/tmp/.X%d-lock' % n ):
+        n   += 1
+    try:
+        with open( os.devnull, 'w' ) as null:
+            x   = Popen( [ 'Xvfb', ':%d' % n, '-screen', '0', screen, '-nolisten', 'tcp' ],
+                         stdout=null, stderr=null )
+    except OSError as e:
+        print( "Xvfb non disponibile:", e )
+        return None
+    for i in range( 100 ):
+        if os.path.exists( '/tmp/.X11-unix/X%d' % n ):
+            os.environ[ 'DISPLAY' ] = ':%d' % n
+            return x
+        if x.poll() is not None:
+            break
+        sleep( 0.05 )
+    print( "Xvfb non avviato sul display :%d" % n )
+    x.terminate()
+    return None
+
+
+def latency( root, action, setup=None, repeat=3 ):
+    """
+    Misura la latenza di un'operazione dell'interfaccia grafica: il tempo dall'inizio
+    dell'operazione a quando Tkinter non ha più eventi né operazioni idle in attesa.
+
+    @param root: finestra principale di Tkinter
+    @param action: funzione senza argomenti che genera l'evento
+    @param setup: funzione senza argomenti eseguita prima di ogni ripetizione, fuori dalla misura
+    @param repeat: numero di ripetizioni
+    @return: il tempo migliore, in millisecondi
+    """
+    def f():
+        action()
+        root.update()
+    best    = None
+    for i in range( repeat ):
+        if setup is not None:
+            setup()
+        root.update()
+        t   = best_time( f, 1 )
+        best = t if best is None or t < best else best
+    return best
+
+
+def bench_gui( root, c, repeat ):
+    """
+    Misura la latenza dell'interfaccia grafica per un PLA delle dimensioni di un circuito: avvio
+    con la costruzione progressiva, clic su fusibili visibili scelti a caso (saltati se nessun
+    fusibile è visibile nella finestra), tasti r, f e u, caricamento dal menu Library di ogni
+    circuito della libreria che vi sia contenuto e del circuito stesso, partendo ogni volta dai
+    fusibili tutti collegati.
+
+    @param root: finestra principale di Tkinter
+    @param c: circuito
+    @type c: Circuit
+    @param repeat: numero di ripetizioni
+    @return: dizionario dei tempi, indicizzato da (operazione, evento)
+    """
+    import pla
+    dims    = ( c.n_inputs, c.n_outputs, c.n_and )
+    t       = {}
+    best    = None
+    for i in range( repeat ):
+        w   = pla.Toplevel( root )
+        t0  = default_timer()
+        p   = pla.Pla( w, *dims )
+        p.place_progressive()
+        while p.building is not None:
+            root.update()
+        root.update()
+        dt  = default_timer() - t0
+        best = dt if best is None or dt < best else best
+        if i < repeat - 1:
+            w.destroy()
+    t[ 'start', 'progressive' ] = 1e3 * best
+    w.focus_force()
+
+    cv      = p.canvas
+    x, y    = p.layout.fuse_centers( 'in' )
+    x       = x.ravel() - int( cv.canvasx( 0 ) )
+    y       = y.ravel() - int( cv.canvasy( 0 ) )
+    seen    = ( ( x >= 0 ) & ( x < cv.winfo_width() ) &
+                ( y >= 0 ) & ( y < cv.winfo_height() ) ).nonzero()[ 0 ]
+    if len( seen ):
+        picks   = RandomState( 0 ).choice( seen, min( clicks, len( seen ) ), replace=False )
+        t[ 'click', 'fuse' ]    = latency( root, lambda: [
+                cv.event_generate( '<Button-1>', x=x[ k ], y=y[ k ] ) for k in picks ],
+                repeat=repeat ) / len( picks )
+    else:
+        print( "%s: nessun fusibile visibile, clic sui fusibili non misurati" % c.description )
+
+    rs      = RandomState( 0 )
+    for k in rs.randint( 0, 2, c.n_inputs ).nonzero()[ 0 ]:
+        p.model.set_input( k, 1 )
+    t[ 'key', 'r' ]     = latency( root, lambda: w.event_generate( '<KeyPress-r>' ), repeat=repeat )
+    t[ 'key', 'f' ]     = latency( root, lambda: w.event_generate( '<KeyPress-f>' ), p.reset, repeat )
+    t[ 'key', 'u' ]     = latency( root, lambda: w.event_generate( '<KeyPress-u>' ), p.fuse_all,
+                                   repeat )
+
+    menu    = w.nametowidget( p.menubar.entrycget( 'Library', 'menu' ) )
+    for i, l in enumerate( circuits.circs ):
+        if l.n_inputs <= c.n_inputs and l.n_outputs <= c.n_outputs and l.n_and <= c.n_and:
+            t[ 'library', l.description ]   = latency( root, lambda: menu.invoke( i ), p.reset,
+                                                       repeat )
+    t[ 'library', c.description ]   = latency( root, lambda: p.load( c ), p.reset, repeat )
+    w.destroy()
+    return t
+
+
+def bench_gui_sizes( repeat, sizes, current=False ):
+    """
+    Esegue le misure di latenza dell'interfaccia grafica su un display virtuale Xvfb, per PLA
+    delle dimensioni dei circuiti sintetici.
+
+    @param repeat: numero di ripetizioni di ogni misura
+    @param sizes: lista di dimensioni (n_inputs, n_and, n_outputs, density) dei circuiti sintetici
+    @param current: se True viene usato il display corrente invece di Xvfb
+    """
+    import pla
+    x       = None
+    if not current:
+        x   = xvfb()
+        if x is None:
+            print( "misure dell'interfaccia grafica saltate" )
+            return
+    try:
+        pla.gui()
+        root    = pla.Tk()
+        root.withdraw()
+        for s in sizes:
+            c   = synthetic( *s )
+            report( 'gui ' + c.description, bench_gui( root, c, repeat ) )
+        root.destroy()
+    finally:
+        if x is not None:
+            x.terminate()
+            x.wait()
+
+
+# ======================================================================================================= #
+
+def options( a ):
+    """
+    Definisce le opzioni accettate dal programma nella linea di comando.
+
+    @param a: istanza di OptionParser
+    @type a: oggetto OptionParser
+    """
+    a.add_option( "-r",
+            action  = "store",
+            type    = "int",
+            dest    = "repeat",
+            metavar = "<repeat>",
+            help    = "numero di ripetizioni di ogni misura",
+            default = 3
+    )
+    a.add_option( "-s",
+            action  = "append",
+            type    = "string",
+            dest    = "sizes",
+            metavar = "<n_inputs,n_and,n_outputs,density>",
+            help    = "dimensioni di un circuito sintetico, ripetibile",
+            default = None
+    )
+    a.add_option( "-w",
+            action  = "append",
+            type    = "int",
+            dest    = "workers",
+            metavar = "<workers>",
+            help    = "numero di thread da provare, ripetibile",
+            default = None
+    )
+    a.add_option( "-c",
+            action  = "store",
+            type    = "int",
+            dest    = "chunk",
+            metavar = "<chunk>",
+            help    = "numero di vettori per blocco",
+            default = 1 << 14
+    )
+    a.add_option( "-j",
+            action  = "store",
+            type    = "string",
+            dest    = "json",
+            metavar = "<json>",
+            help    = "scrive i tempi misurati nel file JSON indicato",
+            default = None
+    )
+    a.add_option( "-x",
+            action  = "store_true",
+            dest    = "current",
+            help    = "misura l'interfaccia grafica sul display corrente invece che su Xvfb",
+            default = False
+    )
+
+if __name__ == "__main__":
+    args            = OptionParser( usage )
+    options( args )
+    ( opts, more )  = args.parse_args()
+    if opts.sizes:
+        sizes       = [ tuple( f( v ) for f, v in zip( ( int, int, int, float ), s.split( ',' ) ) )
+                        for s in opts.sizes ]
+        sim_sizes   = sizes
+    if opts.workers:
+        workers     = opts.workers
+    groups          = more or [ 'jit', 'threads', 'sim' ]
+    if 'jit' in groups:
+        bench_jit( opts.repeat, sizes )
+    if 'threads' in groups:
+        bench_threads( opts.repeat, workers, opts.chunk )
+    if 'sim' in groups:
+        bench_sim( opts.repeat, sim_sizes, synth_inputs )
+    if 'gui' in groups:
+        bench_gui_sizes( opts.repeat, sim_sizes, opts.current )
+    if opts.json:
+        with open( opts.json, 'w' ) as f:
+            json.dump( { 'python': platform.python_version(), 'machine': platform.machine(),
+                         'repeat': opts.repeat, 'groups': groups, 'results': results },
+                       f, indent=1, sort_keys=True )
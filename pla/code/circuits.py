@@ -186,6 +186,55 @@ class Circuit( object ):
                 self.or_matrix[a, e]=1
         return self
 
+    @staticmethod
+    def read_map(f, description=None):
+        """
+        Legge un circuito da una mappa di fusibili.
+        Ogni riga della mappa corrisponde a una porta AND, e contiene lo stato dei fusibili della
+        matrice IN-AND (una cifra 0/1 per colonna, nell'ordine di and_matrix), uno spazio e lo
+        stato dei fusibili della matrice AND-OR. Il testo che segue un carattere '#' è un commento;
+        i commenti "# inputs: ..." e "# outputs: ..." assegnano le denominazioni di input e output.
+        @param f: file aperto in lettura, o iterabile di righe
+        @param description: nome del circuito
+        @raise ValueError: se la mappa non è ben formata
+        """
+        labels={'inputs': [], 'outputs': []}
+        rows=[]
+        for n, line in enumerate(f, 1):
+            line, sep, comment=line.partition('#')
+            key, sep, names=comment.partition(':')
+            if sep and key.strip() in labels:
+                labels[key.strip()]=names.split()
+            if not line.strip():
+                continue
+            fields=line.split()
+            if len(fields)!=2 or not set(''.join(fields))<=set('01') or len(fields[0])%2:
+                raise ValueError("riga %d della mappa non valida: %r" % (n, line.strip()))
+            rows.append(fields)
+        if not rows:
+            raise ValueError("la mappa non contiene porte AND")
+        if len(set(map(lambda r: (len(r[0]), len(r[1])), rows)))>1:
+            raise ValueError("le righe della mappa hanno lunghezze diverse")
+
+        self=Circuit(len(rows[0][0])//2, len(rows[0][1]), len(rows))
+        self.description=description or 'fuse map'
+        self.labels_i=labels['inputs'] or ['I%d' % k for k in range(self.n_inputs)]
+        self.labels_o=labels['outputs'] or ['O%d' % k for k in range(self.n_outputs)]
+        self.and_matrix[:]=array([list(map(int, r[0])) for r in rows])
+        self.or_matrix[:]=array([list(map(int, r[1])) for r in rows])
+        return self
+
+    def write_map(self, f):
+        """
+        Scrive la mappa di fusibili del circuito, nel formato letto da I{read_map}.
+        @param f: file aperto in scrittura
+        """
+        f.write("# %s\n" % self.description)
+        f.write("# inputs: %s\n" % ' '.join(self.labels_i))
+        f.write("# outputs: %s\n" % ' '.join(self.labels_o))
+        for a, o in zip(self.and_matrix, self.or_matrix):
+            f.write("%s %s\n" % (''.join(map(str, a)), ''.join(map(str, o))))
+
 # ------------------------------------------------------------------------------------------------------- #
 #	modello
 # ------------------------------------------------------------------------------------------------------- #
@@ -973,3 +1022,22 @@ circ_sqrt.or_matrix[5:15,2]=1
 
 # lista di tutti i circuiti
 circs   = [ circ_h, circ_a, circ_b, circ_compl1, circ_compl2, circ_mult2, circ_sqrt, circ_r32, circ_mlg, circ_e, circ_s, circ_d, circ_bcd, circ_m, circ_g, circ_c, circ_sr , circ_t, circ_jk, circ_pc, circ_crc3]
+
+
+def find( name ):
+    """
+    Cerca un circuito della libreria per nome: il nome della variabile, con o senza il prefisso
+    "circ_" (per esempio "circ_a" oppure "a"), o la descrizione, senza distinzione tra maiuscole
+    e minuscole.
+    @param name: nome del circuito
+    @return: il circuito, None se non presente in libreria
+    @rtype: Circuit
+    """
+    for n in ( name, 'circ_' + name ):
+        c   = globals().get( n )
+        if isinstance( c, Circuit ):
+            return c
+    for c in circs:
+        if c.description.lower() == name.lower():
+            return c
+    return None
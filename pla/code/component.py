@@ -60,30 +60,199 @@ class Component( object ):
     Tuti i valori geometrici sono trattati in coordinate normalizzate, e solo nel momento
     di chiamare le primitive grafiche sono trasformati in valori assoluti (pixel).
 
+    Le dimensioni dei componenti sono moltiplicate per il fattore I{unit} del simulatore, che le
+    riduce quando il passo di griglia è più fitto di quello per cui sono definite.
+
     Per tutti i componenti, Wire e pin di ingresso e uscita esclusi, viene validato l'attributo I{tags}
     di Tkinter con una stringa composta dal nome del componente e il suo numero progressivo.
+    I numeri progressivi sono assegnati dal registro I{counts} del simulatore (vedi I{number}), e
+    le coordinate fisse dei componenti sono lette dal suo layout: più simulatori possono così
+    coesistere nello stesso processo.
+
+    I costruttori accettano inoltre l'argomento opzionale I{tags}, con i tag dei gruppi (riga,
+    colonna, matrice) a cui il componente appartiene: tutti gli oggetti grafici di un gruppo
+    possono così essere modificati con una sola chiamata al canvas.
+
+    @cvar parts: nomi degli attributi che contengono gli oggetti grafici del componente, vedi I{items}
     """
     __abstract  = True
 
+    parts       = ()
+
+
+    def items( self ):
+        """
+        Restituisce gli identificativi di tutti gli oggetti grafici del componente, ad esempio per
+        cancellarli con una sola chiamata al canvas: la ricerca per identificativo non richiede a
+        Tkinter di esaminare tutti gli oggetti, come invece la ricerca per tag.
+
+        @return: lista di identificativi
+        """
+        r   = []
+        for p in self.parts:
+            v   = getattr( self, p, None )
+            if isinstance( v, ( list, tuple ) ):
+                r.extend( v )
+            elif v is not None:
+                r.append( v )
+        return r
+
+
+    @staticmethod
+    def number( pla, category, n=None ):
+        """
+        Assegna a un componente il numero progressivo nella sua categoria, dal registro del simulatore.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param category: categoria del componente, cioè il prefisso del suo tag
+        @param n: numero da assegnare, se None il successivo all'ultimo assegnato
+        @return: il numero assegnato
+        """
+        if n is None:
+            n   = pla.counts.get( category, 0 )
+        pla.counts[ category ]  = n + 1
+        return n
+
         
 class Port( Component ):
     """
     Classe delle porte logiche.
 
-    Tutte le sottoclassi avranno un loro attributo di classe 'count' che contiene il numero di
-    porte correntemente istanziate di quel tipo.
     Tutte le sottoclassi avranno un loro attributo di classe 'name' con il prefisso del rispettivo
     tipo di porta.
 
+    La forma di una porta non dipende dalla sua posizione: ogni sottoclasse ne calcola la sagoma
+    una sola volta per layout (vedi I{shape}), e ogni porta viene disegnata traslandola (vedi I{stamp}).
+
     @cvar size: grandezza complessiva di una porta
     @type size: dimensione normalizzata 0..1
     @cvar thick: spessore dei contorni di una porta
     @cvar color: colore dei bordi di una porta
+    @cvar composite: se True ogni porta viene disegnata con un unico oggetto grafico, una linea
+    spezzata che ne percorre il contorno
+    @cvar arc_points: numero di segmenti con cui viene approssimato un arco nel disegno composito
     """
 
-    size    = 0.04          # dimensione complessiva in coordinate normalizzate
-    thick   = 1             # spessore dei contorni
-    color   = 'black'       # colore dei bordi
+    size        = 0.04          # dimensione complessiva in coordinate normalizzate
+    thick       = 1             # spessore dei contorni
+    color       = 'black'       # colore dei bordi
+    composite   = False         # disegno con un unico oggetto grafico
+    arc_points  = 12            # segmenti per arco nel disegno composito
+
+
+    @classmethod
+    def shape( cls, pla ):
+        """
+        Restituisce la sagoma della porta per il layout corrente, calcolandola solo la prima volta.
+
+        La sagoma è una coppia (items, pins): I{items} è la lista degli oggetti grafici della porta,
+        ciascuno come terna (tipo, coordinate, opzioni) con le coordinate in pixel relative al centro
+        della porta; I{pins} contiene le posizioni dei pin, in coordinate normalizzate relative al centro.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        """
+        scale   = pla.size[ 1 ] * pla.zoom
+        key     = ( cls.name, scale, pla.unit, cls.composite )
+        if key not in pla.shapes:
+            pla.shapes[ key ]   = cls._shape( scale, cls.size * pla.unit )
+        return pla.shapes[ key ]
+
+
+    @classmethod
+    def _shape( cls, scale, size ):
+        """
+        Calcola la sagoma della porta, vedi I{shape}.
+
+        @param scale: fattore di conversione da coordinate normalizzate a pixel
+        @param size: dimensione della porta
+        @type size: dimensione normalizzata 0..1
+        """
+        raise NotImplementedError
+
+
+    @classmethod
+    def _item( cls, kind, coords, scale, **opts ):
+        """
+        Funzione di ausilio per la costruzione di un elemento della sagoma.
+
+        @param kind: tipo di oggetto grafico, 'line', 'polygon', 'oval' o 'arc'
+        @param coords: coordinate normalizzate relative al centro della porta
+        @param scale: fattore di conversione da coordinate normalizzate a pixel
+        """
+        opts[ 'width' ]     = cls.thick
+        return ( kind, tuple( scale * c for c in coords ), opts )
+
+
+    @classmethod
+    def _arc( cls, xc, yc, r, start, extent ):
+        """
+        Campiona un arco di circonferenza per il disegno composito.
+        Gli angoli seguono la convenzione di Tkinter: antiorari a partire dalle ore 3, con l'asse
+        verticale rivolto verso il basso.
+
+        @param xc: coordinata orizzontale del centro
+        @param yc: coordinata verticale del centro
+        @param r: raggio
+        @param start: angolo iniziale, in radianti
+        @param extent: ampiezza dell'arco, in radianti, negativa per percorrerlo in senso orario
+        @return: lista piatta delle coordinate dei punti
+        """
+        n       = cls.arc_points
+        points  = []
+        for i in range( n + 1 ):
+            a   = start + extent * i / n
+            points.extend( ( xc + r * cos( a ), yc - r * sin( a ) ) )
+        return points
+
+
+    def _translate( self, pla, x, y ):
+        """
+        Trasla la sagoma della porta nel punto indicato.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del centro della porta
+        @param y: coordinata verticale del centro della porta
+        @return: lista di terne (tipo, coordinate assolute, opzioni), vedi I{shape}
+        """
+        scale   = pla.size[ 1 ] * pla.zoom
+        x, y    = scale * x, scale * y
+        return [ ( kind, [ int( y + c ) if i % 2 else int( x + c ) for i, c in enumerate( coords ) ], opts )
+                 for kind, coords, opts in self.shape( pla )[ 0 ] ]
+
+
+    def stamp( self, pla, x, y, tags ):
+        """
+        Disegna la sagoma della porta con centro nel punto indicato.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del centro della porta
+        @type x: dimensione normalizzata 0..1
+        @param y: coordinata verticale del centro della porta
+        @type y: dimensione normalizzata 0..1
+        @param tags: tag degli oggetti grafici
+        @return: lista degli oggetti grafici creati
+        """
+        return [ getattr( pla.canvas, 'create_' + kind )( *xy, tags=tags, **opts )
+                 for kind, xy, opts in self._translate( pla, x, y ) ]
+
+
+    def restamp( self, pla, items, x, y ):
+        """
+        Sposta gli oggetti grafici di una porta già disegnata, adattandoli alla sagoma del layout
+        corrente.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param items: gli oggetti grafici della porta, nell'ordine restituito da I{stamp}
+        @param x: coordinata orizzontale del nuovo centro della porta
+        @param y: coordinata verticale del nuovo centro della porta
+        """
+        for item, ( kind, xy, opts ) in zip( items, self._translate( pla, x, y ) ):
+            pla.canvas.coords( item, *xy )
 
 
 
@@ -98,14 +267,15 @@ class Not( Port ):
     La porta viene disegnata in orientamento verticale con ingresso in alto, quindi con un triangolo
     equilatero al cui vertice è\ aggiunto un piccolo cerchio.
 
-    @ivar count: numero di porte NOT correntemente istanziate
     @cvar name: prefisso della porta NOT
-    @ivar y_not: coordinata verticale del centro della porta NOT
+    @ivar y_not: coordinata verticale del centro della porta NOT, dal layout del simulatore
     @type y_not: dimensione normalizzata 0..1
     @cvar c_size: diametro del cerchio da cui è50 composta la porta NOT
     @type c_size: frazione della dimensione totale della porta
     @ivar tag: tag dell'oggetto grafico delineante la porta
     @type tag: Tkinter widget tag
+    @ivar triang: triangolo della porta, o il suo contorno completo nel disegno composito
+    @ivar circ: cerchio della porta, None nel disegno composito
     @ivar x: coordinata orizzontale del centro della porta
     @type x: dimensione normalizzata 0..1
     @ivar y_in: coordinata verticale del pin di ingresso della porta
@@ -114,13 +284,12 @@ class Not( Port ):
     @type y_out: dimensione normalizzata 0..1
     """
 
-    count       = 0
     name        = 'not_'
-    y_not       = 0.        # altezza del centro della NOT
+    parts       = ( 'triang', 'circ' )
     c_size      = 0.2       # diametro del cerchio, come frazione della dimensione totale
 
 
-    def __init__( self, pla, x ):
+    def __init__( self, pla, x, tags=(), n=None ):
         """
         Istanzia una porta NOT.
 
@@ -128,47 +297,71 @@ class Not( Port ):
         @type pla: Pla
         @param x: coordinata orizzontale del centro della porta
         @type x: dimensione normalizzata 0..1
+        @param tags: tag dei gruppi a cui appartiene la porta
+        @param n: numero progressivo della porta, se None il successivo all'ultimo
         """
-        self.tag    = self.name + str( Not.count )
+        self.y_not  = pla.layout.not_y
+        self.tag    = self.name + str( self.number( pla, self.name, n ) )
+        tags        = ( self.tag, ) + tuple( tags )
 
-        h           = self.size - self.c_size * self.size
-        l           = 2 * h / sqrt( 3 )
+        items       = self.stamp( pla, x, self.y_not, tags )
+        self.triang = items[ 0 ]
+        self.circ   = items[ 1 ] if len( items ) > 1 else None
+        self._pins( pla, x )
 
-        y0_nor      = self.y_not - l / 4
-        x0_nor      = x  - l / 2
 
-        y0          = pla.nor_to_abs( y0_nor )
-        y1          = pla.nor_to_abs( y0_nor + h )
-        y2          = pla.nor_to_abs( y0_nor + self.size )
+    def _pins( self, pla, x ):
+        """
+        Calcola la posizione della porta e dei suoi pin.
 
-        x0          = pla.nor_to_abs( x0_nor )
-        x1          = pla.nor_to_abs( x0_nor + l )
-        xc1         = pla.nor_to_abs( x - self.c_size * self.size / 2 )
-        xc2         = pla.nor_to_abs( x + self.c_size * self.size / 2 )
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del centro della porta
+        """
+        pins        = self.shape( pla )[ 1 ]
+        self.x      = x
+        self.y_in   = self.y_not + pins[ 'y_in' ]
+        self.y_out  = self.y_not + pins[ 'y_out' ]
 
-        triang      = ( x1, y0, x0, y0, pla.nor_to_abs( x ), y1 )
-        self.triang = pla.canvas.create_polygon(
-                *triang,
-                tags=self.tag,
-                width=self.thick,
-                outline=self.color,
-                fill=''
-        )
 
-        circ        = ( xc1, y1, xc2, y2 )
-        self.circ   = pla.canvas.create_oval(
-                *circ,
-                tags=self.tag,
-                width=self.thick,
-                outline=self.color,
-                fill=''
-        )
+    def move( self, pla, x ):
+        """
+        Sposta la porta in una nuova posizione del layout corrente, riutilizzandone gli oggetti grafici.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del nuovo centro della porta
+        """
+        items       = [ i for i in ( self.triang, self.circ ) if i is not None ]
+        self.y_not  = pla.layout.not_y
+        self.restamp( pla, items, x, self.y_not )
+        self._pins( pla, x )
 
-        self.x      = x
-        self.y_in   = y0_nor
-        self.y_out  = y0_nor + self.size
 
-        Not.count   += 1
+    @classmethod
+    def _shape( cls, scale, size ):
+        """
+        Calcola la sagoma della porta NOT: un triangolo equilatero con la punta in basso, e il
+        cerchio sotto la punta.
+
+        @param scale: fattore di conversione da coordinate normalizzate a pixel
+        @param size: dimensione della porta
+        @type size: dimensione normalizzata 0..1
+        """
+        h           = size - cls.c_size * size
+        l           = 2 * h / sqrt( 3 )
+        y0          = - l / 4
+        r           = cls.c_size * size / 2
+
+        triang      = ( l / 2, y0, - l / 2, y0, 0, y0 + h )
+        circ        = ( - r, y0 + h, r, y0 + size )
+        if cls.composite:
+            outline = triang + tuple( cls._arc( 0, y0 + h + r, r, pi / 2, 2 * pi ) ) + triang[ : 2 ]
+            items   = [ cls._item( 'line', outline, scale, fill=cls.color ) ]
+        else:
+            items   = [ cls._item( 'polygon', triang, scale, outline=cls.color, fill='' ),
+                        cls._item( 'oval', circ, scale, outline=cls.color, fill='' ) ]
+        return items, { 'y_in': y0, 'y_out': y0 + size }
 
 
 
@@ -202,11 +395,8 @@ class Or( Port ):
         - due linee verticali parallele
         - due archi di cerchio con centri sfasati rispetto all'asse, per la punta
 
-    @ivar count: numero di porte OR correntemente istanziate
     @cvar name: prefisso della porta OR
-    @ivar pla: il simulatore
-    @type pla: Pla
-    @ivar y_or: coordinata verticale del centro della porta OR
+    @ivar y_or: coordinata verticale del centro della porta OR, dal layout del simulatore
     @type y_or: dimensione normalizzata 0..1
     @cvar line_s: dimensione delle linee costituenti la porta
     @type line_s: frazione della dimensione totale della porta
@@ -217,6 +407,9 @@ class Or( Port ):
     @cvar adjust: fattore correttivo della dimensione della porta OR per equipararla alla porta AND
     @ivar tag: tag dell'oggetto grafico delineante la porta
     @type tag: Tkinter widget tag
+    @ivar tags: tag di tutti gli oggetti grafici della porta, compresi quelli dei gruppi
+    @ivar lines: linee verticali della porta, o il suo contorno completo nel disegno composito
+    @ivar arcs: archi della base e della punta, vuota nel disegno composito
     @ivar x: coordinata orizzontale del centro della porta
     @type x: dimensione normalizzata 0..1
     @ivar y_in: coordinata verticale del pin di ingresso della porta
@@ -225,19 +418,18 @@ class Or( Port ):
     @type y_out: dimensione normalizzata 0..1
     """
 
-    count       = 0
     name        = 'or_'
-    y_or        = 0.        # altezza del centro della OR
+    parts       = ( 'lines', 'arcs' )
     line_s      = 0.4       # dimensione delle linee, come frazione della dimensione totale
     elong       = 1.7       # rapporto tra lunghezza (verticale) e larghezza (orizzontale) delle porte
     r_top       = 0.5       # rapporto tra raggio dei cerchi usati per la punta e dimensione
     r_bottom    = 0.7       # rapporto tra raggio del cerchio usato per la base e dimensione
     top_sharp   = 0.2       # inverso dell'acutezza della punta
     adjust      = 1.4       # fattore correttivo della dimensione per equipararla alla AND
-    pla         = None      # l'oggetto circuito
 
 
-    def _rad_to_deg( self, ang ):
+    @staticmethod
+    def _rad_to_deg( ang ):
         """
         Funzione di ausilio per la conversione da radianti in gradi
 
@@ -247,171 +439,111 @@ class Or( Port ):
         return int( round( 180 * ang / pi ) )
 
 
-    def draw_lines( self, xa_0, xa_2, ya_0, ya_2 ):
-        """
-        Traccia le linee verticali della porta
 
-        Il metodo non restituisce nulla, inserisce gli oggetti widget
-        nella lista self.lines
+    @classmethod
+    def _shape( cls, scale, size ):
+        """
+        Calcola la sagoma della porta OR: le due linee verticali, l'arco della base e i due archi
+        della punta; nel disegno composito un'unica linea che percorre il contorno.
 
-        @param xa_0: coordinata orizzontale della linea sinistra
-        @param xa_0: coordinata orizzontale della linea destra
-        @param ya_0: coordinata verticale del vertice superiore delle linee
-        @param ya_2: coordinata verticale del vertice inferiore delle linee
+        @param scale: fattore di conversione da coordinate normalizzate a pixel
+        @param size: dimensione della porta, prima della correzione I{adjust}
+        @type size: dimensione normalizzata 0..1
         """
+        size        = size * cls.adjust
+        half_w      = 0.5 * size / cls.elong
+        half_h      = 0.5 * size
+        xa_0        = - half_w
+        xa_2        = half_w
+        ya_0        = - half_h
+        ya_2        = ya_0 + cls.line_s * size
 
-        x0          = self.pla.nor_to_abs( xa_0 )
-        x1          = self.pla.nor_to_abs( self.x )
-        x2          = self.pla.nor_to_abs( xa_2 )
-        y0          = self.pla.nor_to_abs( ya_0 )
-        y1          = self.pla.nor_to_abs( self.y_or )
-        y2          = self.pla.nor_to_abs( ya_2 )
+        # arco della base, centrato sull'asse
+        rb          = cls.r_bottom * size
+        theta_b     = asin( half_w / rb )
+        y_in        = ya_0 + rb * ( 1 - cos( theta_b ) )
+        y_out       = ya_0 + size / cls.adjust
 
-        line        = ( x0, y0, x0, y2 )
-        l           = []
-        self.lines.append( self.pla.canvas.create_line(
-                *line,
-                width=self.thick,
-                tags=self.tag,
-                fill=self.color )
-        )
-        line        = ( x2, y0, x2, y2 )
-        self.lines.append( self.pla.canvas.create_line(
-                *line,
-                width=self.thick,
-                tags=self.tag,
-                fill=self.color )
-        )
+        # archi della punta, con i centri sfasati rispetto all'asse
+        rt          = cls.r_top * size
+        ya_delta    = cls.top_sharp * size
+        ya_c        = ya_2 - ya_delta
+        theta       = asin( ya_delta / rt )
+        xa_delta    = rt * cos( theta ) - half_w
+        delta       = asin( xa_delta / rt )
+        alfa        = pi / 2 - theta - delta
+
+        if cls.composite:
+            outline = cls._arc( 0, y_in - rb, rb, 3 * pi / 2 - theta_b, 2 * theta_b )
+            outline += [ xa_2, ya_2 ]
+            outline += cls._arc( - xa_delta, ya_c, rt, 3 * pi / 2 + delta + alfa, - alfa )
+            outline += cls._arc( xa_delta, ya_c, rt, pi + theta + alfa, - alfa )
+            outline += [ xa_0, ya_0 ]
+            items   = [ cls._item( 'line', outline, scale, fill=cls.color ) ]
+        else:
+            arc     = dict( fill=cls.color, style=ARC )
+            items   = [
+                cls._item( 'line', ( xa_0, ya_0, xa_0, ya_2 ), scale, fill=cls.color ),
+                cls._item( 'line', ( xa_2, ya_0, xa_2, ya_2 ), scale, fill=cls.color ),
+                cls._item( 'arc', ( - rb, y_in - 2 * rb, rb, y_in ), scale,
+                        start=cls._rad_to_deg( 3 * pi / 2 - theta_b ),
+                        extent=cls._rad_to_deg( 2 * theta_b ), **arc ),
+                cls._item( 'arc', ( xa_delta - rt, ya_c - rt, xa_delta + rt, ya_c + rt ), scale,
+                        start=cls._rad_to_deg( pi + theta ),
+                        extent=cls._rad_to_deg( alfa ), **arc ),
+                cls._item( 'arc', ( - xa_delta - rt, ya_c - rt, - xa_delta + rt, ya_c + rt ), scale,
+                        start=cls._rad_to_deg( 3 * pi / 2 + delta ),
+                        extent=cls._rad_to_deg( alfa ), **arc ) ]
+        return items, { 'y_in': y_in, 'y_out': y_out }
 
 
 
-    def draw_bottom( self, ra, theta ):
+    def __init__( self, pla, x, tags=(), n=None ):
         """
-        Disegna l'arco per la base della porta
-
-        Il metodo non restituisce nulla, inserisce gli oggetti widget
-        nella lista self.arcs
-        
-        @param ra: raggio dell'arco
-        @param theta: semiangolo del vertice superiore del triangolo isoscele su cui insiste l'arco
-        """
-
-        x1      = self.pla.nor_to_abs( self.x )
-        r       = self.pla.nor_to_abs( ra )
-        bx0     = x1 - r
-        bx1     = x1 + r
-        by1     = self.pla.nor_to_abs( self.y_in )
-        bb      = ( bx0, by1 - 2 * r, bx1, by1 )
-        t0      = self._rad_to_deg( 3 * pi / 2 - theta )
-        t1      = self._rad_to_deg( 2 * theta )
-
-        self.arcs.append( self.pla.canvas.create_arc(
-                bb,
-                start=t0,
-                extent=t1,
-                tags=self.tag,
-                width=self.thick,
-                fill=self.color,
-                style=ARC )
-        )
-
-
+        Istanzia una porta OR.
 
-    def draw_top( self, xa_delta, ya_c, ra, theta, delta ):
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del centro della porta
+        @type x: dimensione normalizzata 0..1
+        @param tags: tag dei gruppi a cui appartiene la porta
+        @param n: numero progressivo della porta, se None il successivo all'ultimo
         """
-        Disegna i due archi per la punta della porta
-
-        Il metodo non restituisce nulla, inserisce gli oggetti widget
-        nella lista self.arcs
-        
-        @param xa_delta: offset tra il centro orizzontale della porta, e i centri delle circonferenze
-        @param ya_c: coordinata verticale dei centri delle circonferenze
-        @param ra: raggio degli archi
-        @param theta: angolo formato tra il segmento che congiunge il vertice inferiore della linea
-        sinistra (che è anche vertice superiore dell'arco sinistro) con il centro
-        della circonferenza per l'arco sinsitro, e l'asse orizzontale
-        @param delta: angolo formato tra il segmento che congiunge il vertice inferiore degli archi
-        con il centro della circonferenza per l'arco sinsitro, e l'asse verticale
-        """
-
-        y0      = self.pla.nor_to_abs( ya_c - ra )
-        y1      = self.pla.nor_to_abs( ya_c + ra )
-        r       = self.pla.nor_to_abs( ra )
-        alfa    = pi / 2 - theta - delta
-
-        xc      = self.pla.nor_to_abs( self.x + xa_delta )
-        bb      = ( xc - r, y0, xc + r, y1 )
-        t0      = self._rad_to_deg(  pi + theta )
-        t1      = self._rad_to_deg( alfa )
-
-        self.arcs.append( self.pla.canvas.create_arc(
-                bb,
-                start=t0,
-                extent=t1,
-                tags=self.tag,
-                width=self.thick,
-                fill=self.color,
-                style=ARC )
-        )
-
-        xc      = self.pla.nor_to_abs( self.x - xa_delta )
-        bb      = ( xc - r, y0, xc + r, y1 )
-        t0      = self._rad_to_deg( 3 * pi / 2 + delta )
-        self.arcs.append( self.pla.canvas.create_arc(
-                bb,
-                start=t0,
-                extent=t1,
-                tags=self.tag,
-                width=self.thick,
-                fill=self.color,
-                style=ARC )
-        )
+        self.y_or   = pla.layout.or_y
+        self.tag    = self.name + str( self.number( pla, self.name, n ) )
+        self.tags   = ( self.tag, ) + tuple( tags )
 
+        items       = self.stamp( pla, x, self.y_or, self.tags )
+        self.lines  = items[ : 2 ]
+        self.arcs   = items[ 2 : ]
+        self._pins( pla, x )
 
 
-    def __init__( self, pla, x ):
+    def _pins( self, pla, x ):
         """
-        Istanzia una porta OR.
+        Calcola la posizione della porta e dei suoi pin.
 
         @param pla: il simulatore
         @type pla: Pla
         @param x: coordinata orizzontale del centro della porta
-        @type x: dimensione normalizzata 0..1
         """
+        pins        = self.shape( pla )[ 1 ]
         self.x      = x
-        self.tag    = self.name + str( Or.count )
-        self.lines  = []
-        self.arcs   = []
-        self.pla    = pla
-
-        self.size   *= self.adjust
-        half_w      = 0.5 * self.size / self.elong
-        half_h      = 0.5 * self.size
-        xa_0        = x - half_w
-        xa_2        = x + half_w
-        ya_0        = self.y_or - half_h
-        ya_2        = ya_0 + self.line_s * self.size
-
-        ra          = self.r_bottom * self.size
-        theta       = asin( half_w / ra )
-        h_top       = ra * cos( theta )
-        self.y_in   = ya_0 + ( ra - h_top )
-        self.y_out  = ya_0 + self.size / self.adjust
-
-
-        self.draw_lines( xa_0, xa_2, ya_0, ya_2 )
-        self.draw_bottom( ra, theta )
-
-        ra          = self.r_top * self.size
-        ya_delta    = self.top_sharp * self.size
-        ya_c        = ya_2 - ya_delta
-        theta       = asin( ya_delta / ra )
-        xa_delta    = ra * cos( theta ) - half_w
-        delta       = asin( xa_delta / ra )
+        self.y_in   = self.y_or + pins[ 'y_in' ]
+        self.y_out  = self.y_or + pins[ 'y_out' ]
 
-        self.draw_top( xa_delta, ya_c, ra, theta, delta )
 
-        Or.count  += 1
+    def move( self, pla, x ):
+        """
+        Sposta la porta in una nuova posizione del layout corrente, riutilizzandone gli oggetti grafici.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del nuovo centro della porta
+        """
+        self.y_or   = pla.layout.or_y
+        self.restamp( pla, self.lines + self.arcs, x, self.y_or )
+        self._pins( pla, x )
 
 
 
@@ -444,9 +576,8 @@ class And( Port ):
         - poligonale con due linee orizzontali parallele e una verticale
         - arco di cerchio con centro sull'asse, per la sua parte anteriore
 
-    @ivar count: numero di porte AND correntemente istanziate
     @cvar name: prefisso della porta AND
-    @ivar x_and: coordinata orizzontale del centro della porta AND
+    @ivar x_and: coordinata orizzontale del centro della porta AND, dal layout del simulatore
     @type x_and: dimensione normalizzata 0..1
     @cvar line_s: dimensione delle linee costituenti la porta
     @type line_s: frazione della dimensione totale della porta
@@ -455,8 +586,12 @@ class And( Port ):
     @type locked: boolean
     @ivar text: area di testo dove viene visualizzato lo I{status} della porta
     @type text: Tkinter.Canvas object ID
+    @ivar shown: valore visualizzato in I{text}, None se il testo è nascosto
+    @cvar text_tag: tag comune dei testi di tutte le porte AND
     @ivar tag: tag dell'oggetto grafico delineante la porta
     @type tag: Tkinter widget tag
+    @ivar lines: spezzata della porta, o il suo contorno completo nel disegno composito
+    @ivar arc: arco della parte anteriore, None nel disegno composito
     @ivar y: coordinata verticale del centro della porta
     @type y: dimensione normalizzata 0..1
     @ivar x_in: coordinata orizzontale del pin di ingresso della porta
@@ -465,16 +600,18 @@ class And( Port ):
     @type x_out: dimensione normalizzata 0..1
     """
 
-    count   = 0
     name    = 'and_'
-    x_and   = 0.            # posizione orizzontale del centro della AND
     line_s  = 0.6           # dimensione delle linee, come frazione della dimensione totale
     status  = 0             # stato logico della porta
     locked  = False         # indicante se la porta e` inattiva
     text    = None          # area di testo dove viene visualizzato lo status
+    shown   = None          # valore visualizzato, None se il testo e` nascosto
+    text_tag = 'and_text'   # tag comune dei testi
+    locked_tag = 'and_locked'   # tag comune dei testi delle porte disattivate
+    parts   = ( 'lines', 'arc', 'text' )
 
 
-    def __init__( self, pla, y ):
+    def __init__( self, pla, y, tags=(), n=None ):
         """
         Istanzia una porta AND.
 
@@ -482,59 +619,86 @@ class And( Port ):
         @type pla: Pla
         @param y: coordinata verticale del centro della porta
         @type y: dimensione normalizzata 0..1
+        @param tags: tag dei gruppi a cui appartiene la porta
+        @param n: numero progressivo della porta, se None il successivo all'ultimo
         """
-        cv          = pla.canvas
+        self._pins( pla, y )
 
-        self.y      = y
-        self.x_in   = self.x_and - 0.5 * self.size
-        self.x_out  = self.x_and + 0.5 * self.size
+        self.tag    = self.name + str( self.number( pla, self.name, n ) )
+        tags        = tuple( tags )
 
-        x0          = pla.nor_to_abs( self.x_in )
-        x1          = x0 + pla.nor_to_abs( self.line_s * self.size )
+        items       = self.stamp( pla, self.x_and, y, ( self.tag, ) + tags )
+        self.lines  = items[ 0 ]
+        self.arc    = items[ 1 ] if len( items ) > 1 else None
 
-        r           = ( 1 - self.line_s ) * self.size
+        self.text   = pla.canvas.create_text(
+                pla.nor_to_abs( self.x_and ),
+                pla.nor_to_abs( self.y ),
+                state=HIDDEN,
+                text='0',
+                tags=( self.text_tag, ) + tags
+        )
 
-        y0          = pla.nor_to_abs( y - r )
-        y1          = pla.nor_to_abs( y + r )
 
-        t           = self.name + str( And.count )
-        self.tag    = t
+    def _pins( self, pla, y ):
+        """
+        Calcola la posizione della porta e dei suoi pin.
 
-        lines       = ( x1, y0, x0, y0, x0, y1, x1, y1 )
-        self.lines  = cv.create_line(
-                *lines,
-                width=self.thick,
-                tags=t,
-                fill=self.color
-        )
+        @param pla: il simulatore
+        @type pla: Pla
+        @param y: coordinata verticale del centro della porta
+        """
+        pins        = self.shape( pla )[ 1 ]
+        self.x_and  = pla.layout.and_x
+        self.y      = y
+        self.x_in   = self.x_and + pins[ 'x_in' ]
+        self.x_out  = self.x_and + pins[ 'x_out' ]
 
-        r_abs       = pla.nor_to_abs( r )
 
-        bb          = ( x1 - r_abs, y0, x1 + r_abs, y1 )
-        self.arc    = pla.canvas.create_arc(
-                bb,
-                start=270,
-                extent=180,
-                tags=t,
-                width=self.thick,
-                fill=self.color,
-                style=ARC
-        )
+    def move( self, pla, y ):
+        """
+        Sposta la porta in una nuova posizione del layout corrente, riutilizzandone gli oggetti grafici.
 
-        self.text   = pla.canvas.create_text(
-                pla.nor_to_abs( self.x_and ),
-                pla.nor_to_abs( self.y ),
-                state=HIDDEN,
-                text='0'
-        )
+        @param pla: il simulatore
+        @type pla: Pla
+        @param y: coordinata verticale del nuovo centro della porta
+        """
+        items       = [ i for i in ( self.lines, self.arc ) if i is not None ]
+        self._pins( pla, y )
+        self.restamp( pla, items, self.x_and, y )
+        pla.canvas.coords( self.text, pla.nor_to_abs( self.x_and ), pla.nor_to_abs( y ) )
 
-        And.count  += 1
+
+    @classmethod
+    def _shape( cls, scale, size ):
+        """
+        Calcola la sagoma della porta AND: la spezzata con le due linee orizzontali e quella verticale,
+        e l'arco della parte anteriore.
+
+        @param scale: fattore di conversione da coordinate normalizzate a pixel
+        @param size: dimensione della porta
+        @type size: dimensione normalizzata 0..1
+        """
+        x0          = - 0.5 * size
+        x1          = x0 + cls.line_s * size
+        r           = ( 1 - cls.line_s ) * size
+
+        lines       = ( x1, - r, x0, - r, x0, r, x1, r )
+        if cls.composite:
+            outline = lines + tuple( cls._arc( x1, 0, r, 3 * pi / 2, pi ) )
+            items   = [ cls._item( 'line', outline, scale, fill=cls.color ) ]
+        else:
+            items   = [ cls._item( 'line', lines, scale, fill=cls.color ),
+                        cls._item( 'arc', ( x1 - r, - r, x1 + r, r ), scale,
+                                start=270, extent=180, fill=cls.color, style=ARC ) ]
+        return items, { 'x_in': x0, 'x_out': - x0 }
 
 
 
     def value( self, pla, status ):
         """
-        Aggiorna I{status} e I{text} della porta in base al valore indicato.
+        Aggiorna I{status} e I{text} della porta in base al valore indicato; il testo viene
+        riconfigurato solo se cambia.
 
         @param pla: il simulatore
         @type pla: Pla
@@ -542,10 +706,25 @@ class And( Port ):
         """
         if self.locked:
             return
-        t   = 1 if status   else 0
-        pla.canvas.itemconfigure( self.text, text=str( t ) )
-        pla.canvas.itemconfigure( self.text, state=NORMAL )
         self.status = status
+        t   = 1 if status   else 0
+        if self.shown == str( t ):
+            return
+        pla.canvas.itemconfigure( self.text, text=str( t ), state=NORMAL )
+        self.shown  = str( t )
+
+
+    def hide( self, pla ):
+        """
+        Nasconde il testo dello I{status}, se visualizzato.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        """
+        if self.shown is None:
+            return
+        pla.canvas.itemconfigure( self.text, text='0', state=HIDDEN )
+        self.shown  = None
 
 
     def disable( self, pla ):
@@ -555,9 +734,10 @@ class And( Port ):
         @param pla: il simulatore
         @type pla: Pla
         """
+        if not self.locked:
+            pla.canvas.addtag_withtag( self.locked_tag, self.text )
         self.locked = True
-        pla.canvas.itemconfigure( self.text, text='0' )
-        pla.canvas.itemconfigure( self.text, state=HIDDEN )
+        self.hide( pla )
 
     def reset( self, pla ):
         """
@@ -566,12 +746,52 @@ class And( Port ):
         @param pla: il simulatore
         @type pla: Pla
         """
+        if self.locked:
+            pla.canvas.dtag( self.text, self.locked_tag )
         self.locked = False
-        pla.canvas.itemconfigure( self.text, text='0' )
-        pla.canvas.itemconfigure( self.text, state=HIDDEN )
+        self.hide( pla )
         self.status = 0
 
 
+    @staticmethod
+    def reset_all( pla, gates, locked=False ):
+        """
+        Resetta un insieme di porte AND, nascondendone i testi con una sola chiamata al canvas.
+
+        I testi delle porte disattivate portano il tag comune I{locked_tag}, aggiunto o rimosso
+        per identificativo dell'oggetto grafico: disattivare molte righe costa così una chiamata
+        per riga più una sola ricerca per tag, invece di un'espressione di tag con un termine per
+        riga da confrontare con ogni oggetto del canvas.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param gates: le porte da resettare
+        @type gates: iterabile di And
+        @param locked: se True le porte vengono anche disattivate
+        """
+        cv      = pla.canvas
+        gates   = list( gates )
+        for g in gates:
+            if g.locked != locked:
+                if locked:
+                    cv.addtag_withtag( And.locked_tag, g.text )
+                else:
+                    cv.dtag( g.text, And.locked_tag )
+        shown   = [ g for g in gates if g.shown is not None ]
+        if shown:
+            if locked:
+                cv.itemconfigure( And.locked_tag, text='0', state=HIDDEN )
+            elif len( gates ) == len( pla.g_and ):
+                cv.itemconfigure( And.text_tag, text='0', state=HIDDEN )
+            else:
+                for g in shown:
+                    cv.itemconfigure( g.text, text='0', state=HIDDEN )
+        for g in gates:
+            g.locked    = locked
+            g.shown     = None
+            g.status    = 0
+
+
 
     def pin_in( self ):
         """
@@ -602,7 +822,12 @@ class Fuse( Component ):
     composto dall'attributo I{name}, più un suffisso specificato come argomento, ed è conservato
     nell'attributo I{category}.
 
-    @ivar count: numero di fusibili correntemente istanziati per ogni categoria
+    Ogni fusibile possiede per tutta la sua vita due oggetti grafici: un cerchio, pieno quando il
+    fusibile è collegato e del colore di sfondo quando è interrotto, e un arco visibile solo quando
+    il fusibile è interrotto. Un cambio di stato modifica questi oggetti senza crearne di nuovi;
+    i tag comuni I{dot_tag} e I{arc_tag} permettono di cambiare lo stato di tutti i fusibili con
+    una sola chiamata per tag (vedi I{set_all}).
+
     @cvar name: prefisso del fusibile
     @ivar status: stato del fusibile (è I{False} quando esso risulta interrotto)
     @type status: boolean
@@ -611,8 +836,14 @@ class Fuse( Component ):
     @type size: dimensione normalizzata 0..1
     @cvar thick: spessore dei contorni di un fusibile
     @cvar color: colore dei bordi di un fusibile
+    @cvar dot_tag: tag comune dei cerchi di tutti i fusibili
+    @cvar arc_tag: tag comune degli archi di tutti i fusibili
     @ivar tag: tag dell'oggetto grafico delineante la porta
     @type tag: Tkinter widget tag
+    @ivar blob: cerchio del fusibile
+    @type blob: Tkinter.Canvas object ID
+    @ivar arc: arco del fusibile interrotto
+    @type arc: Tkinter.Canvas object ID
     @ivar y: coordinata verticale del centro del fusibile
     @type y: dimensione normalizzata 0..1
     @ivar x_in: coordinata orizzontale del pin di ingresso del fusibile
@@ -621,16 +852,18 @@ class Fuse( Component ):
     @type x_out: dimensione normalizzata 0..1
     """
 
-    count       = {}        # conteggio totale dei fusibili per ogni loro categoria
     name        = 'fuse_'
     category    = ''        # nome completo del componente
     status      = True      # False quando il fusibile e` interrotto
     size        = 0.009     # dimensione complessiva in coordinate normalizzate
     thick       = 1         # spessore dei contorni
     color       = 'black'   # colore dei bordi
+    parts       = ( 'blob', 'arc' )
+    dot_tag     = 'fuse_dot'
+    arc_tag     = 'fuse_arc'
 
 
-    def __init__( self, pla, x, y, suffix='' ):
+    def __init__( self, pla, x, y, suffix='', tags=(), n=None ):
         """
         Istanzia un fusibile.
 
@@ -641,30 +874,116 @@ class Fuse( Component ):
         @param y: coordinata verticale del centro del fusibile
         @type y: dimensione normalizzata 0..1
         @param suffix: suffisso indicante la categoria di appartenenza del fusibile
+        @param tags: tag dei gruppi a cui appartiene il fusibile
+        @param n: numero progressivo del fusibile nella sua categoria, se None il successivo all'ultimo
         """
         self.category   = self.name + suffix
         self.center     = ( x, y )
 
-        if self.category not in Fuse.count.keys():
-            Fuse.count[ self.category ] = 0
+        self.tag        = self.category + str( self.number( pla, self.category, n ) )
+
+        self.circ   = self._bbox( pla, x, y )
+        self.blob   = pla.canvas.create_oval(
+            *self.circ,
+            tags=( self.tag, self.dot_tag ) + tuple( tags ),
+            width=self.thick,
+            outline=self.color,
+            fill=self.color
+        )
+        self.arc    = pla.canvas.create_arc(
+            self.circ,
+            start=0,
+            extent=180,
+            tags=( self.tag, self.arc_tag ) + tuple( tags ),
+            width=self.thick,
+            fill=self.color,
+            style=ARC,
+            state=HIDDEN
+        )
+
+        r           = 0.5 * self.size * pla.unit
+        self.y      = y
+        self.x_in   = x - r
+        self.x_out  = x + r
 
-        self.tag        = self.category + str( Fuse.count[ self.category ] )
 
-        r           = 0.5 * self.size
 
-        x0          = pla.nor_to_abs( x - r )
-        x1          = pla.nor_to_abs( x + r )
-        y0          = pla.nor_to_abs( y - r )
-        y1          = pla.nor_to_abs( y + r )
+    def _bbox( self, pla, x, y ):
+        """
+        Calcola il rettangolo che circoscrive il cerchio del fusibile.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del centro del fusibile
+        @param y: coordinata verticale del centro del fusibile
+        @return: coordinate assolute x0, y0, x1, y1 [pixel]
+        """
+        r           = 0.5 * self.size * pla.unit
+        return ( pla.nor_to_abs( x - r ), pla.nor_to_abs( y - r ),
+                 pla.nor_to_abs( x + r ), pla.nor_to_abs( y + r ) )
+
+
+    def place( self, pla, x, y, status, tags=() ):
+        """
+        Sposta il fusibile in una nuova posizione, assegnandogli stato e tag dei gruppi.
+        Permette di riutilizzare gli oggetti grafici di un fusibile per rappresentarne un altro.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del nuovo centro del fusibile
+        @type x: dimensione normalizzata 0..1
+        @param y: coordinata verticale del nuovo centro del fusibile
+        @type y: dimensione normalizzata 0..1
+        @param status: stato del fusibile
+        @param tags: tag dei gruppi a cui appartiene il fusibile
+        """
+        status      = bool( status )
+        self.move( pla, x, y )
+        self.status = status
 
-        self.circ   = ( x0, y0, x1, y1 )
-        self._fuse_on( pla )
+        tags        = tuple( tags )
+        if status:
+            pla.canvas.itemconfigure( self.blob, tags=( self.tag, self.dot_tag ) + tags,
+                    outline=self.color, fill=self.color )
+            pla.canvas.itemconfigure( self.arc, tags=( self.tag, self.arc_tag ) + tags,
+                    state=HIDDEN )
+        else:
+            pla.canvas.itemconfigure( self.blob, tags=( self.tag, self.dot_tag ) + tags,
+                    outline='', fill=pla.background )
+            pla.canvas.itemconfigure( self.arc, tags=( self.tag, self.arc_tag ) + tags,
+                    state=NORMAL )
 
+
+    def move( self, pla, x, y ):
+        """
+        Sposta il fusibile in una nuova posizione, senza modificarne stato e tag.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del nuovo centro del fusibile
+        @type x: dimensione normalizzata 0..1
+        @param y: coordinata verticale del nuovo centro del fusibile
+        @type y: dimensione normalizzata 0..1
+        """
+        r           = 0.5 * self.size * pla.unit
+        self.center = ( x, y )
         self.y      = y
         self.x_in   = x - r
         self.x_out  = x + r
+        self.circ   = self._bbox( pla, x, y )
+        pla.canvas.coords( self.blob, *self.circ )
+        pla.canvas.coords( self.arc, *self.circ )
 
-        Fuse.count[ self.category ] += 1
+
+    def park( self, pla ):
+        """
+        Sposta gli oggetti grafici del fusibile fuori dall'area disegnata, in attesa di riutilizzo.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        """
+        pla.canvas.coords( self.blob, -2, -2, -1, -1 )
+        pla.canvas.coords( self.arc, -2, -2, -1, -1 )
 
 
 
@@ -675,31 +994,39 @@ class Fuse( Component ):
         @param pla: il simulatore
         @type pla: Pla
         """
-        self.blob   = pla.canvas.create_oval(
-            *self.circ,
-            tags=self.tag,
-            width=self.thick,
-            outline=self.color,
-            fill=self.color
-        )
+        pla.canvas.itemconfigure( self.blob, outline=self.color, fill=self.color )
+        pla.canvas.itemconfigure( self.arc, state=HIDDEN )
 
 
     def _fuse_off( self, pla ):
         """
         Modifica l'aspetto visivo del fusibile in modo da mostrarlo interrotto.
+        Il cerchio assume il colore di sfondo e nasconde il tratto della linea di riga sotto
+        al fusibile.
 
         @param pla: il simulatore
         @type pla: Pla
         """
-        self.blob   = pla.canvas.create_arc(
-            self.circ,
-            start=0,
-            extent=180,
-            tags=self.tag,
-            width=self.thick,
-            fill=self.color,
-            style=ARC
-        )
+        pla.canvas.itemconfigure( self.blob, outline='', fill=pla.background )
+        pla.canvas.itemconfigure( self.arc, state=NORMAL )
+
+
+    def set( self, pla, status ):
+        """
+        Porta il fusibile nello stato indicato, se diverso da quello attuale.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param status: nuovo stato del fusibile
+        """
+        status  = bool( status )
+        if status == self.status:
+            return
+        if status:
+            self._fuse_on( pla )
+        else:
+            self._fuse_off( pla )
+        self.status = status
 
 
     def toggle( self, pla ):
@@ -709,13 +1036,7 @@ class Fuse( Component ):
         @param pla: il simulatore
         @type pla: Pla
         """
-        pla.canvas.delete( self.tag )
-        if self.status:
-            self._fuse_off( pla )
-            self.status = False
-        else:
-            self._fuse_on( pla )
-            self.status = True
+        self.set( pla, not self.status )
 
 
     def deset( self, pla ):
@@ -725,10 +1046,7 @@ class Fuse( Component ):
         @param pla: il simulatore
         @type pla: Pla
         """
-        if self.status:
-            pla.canvas.delete( self.tag )
-            self._fuse_off( pla )
-            self.status = False
+        self.set( pla, False )
 
     def reset( self, pla ):
         """
@@ -737,9 +1055,33 @@ class Fuse( Component ):
         @param pla: il simulatore
         @type pla: Pla
         """
-        if not self.status:
-            self._fuse_on( pla )
-            self.status = True
+        self.set( pla, True )
+
+
+    @staticmethod
+    def set_all( pla, status, fuses, tag=None ):
+        """
+        Porta un insieme di fusibili nello stato indicato, con una chiamata al canvas per
+        ciascuno dei tag comuni.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param status: nuovo stato dei fusibili
+        @param fuses: i fusibili da modificare
+        @type fuses: iterabile di Fuse
+        @param tag: tag del gruppo che comprende i fusibili, se None tutti i fusibili del simulatore
+        """
+        status  = bool( status )
+        dot     = Fuse.dot_tag if tag is None else '(%s)&&%s' % ( tag, Fuse.dot_tag )
+        arc     = Fuse.arc_tag if tag is None else '(%s)&&%s' % ( tag, Fuse.arc_tag )
+        if status:
+            pla.canvas.itemconfigure( dot, outline=Fuse.color, fill=Fuse.color )
+            pla.canvas.itemconfigure( arc, state=HIDDEN )
+        else:
+            pla.canvas.itemconfigure( dot, outline='', fill=pla.background )
+            pla.canvas.itemconfigure( arc, state=NORMAL )
+        for f in fuses:
+            f.status = status
 
 
     def pin_in( self ):
@@ -773,13 +1115,15 @@ class Wire( Component ):
 
     @cvar thick: spessore della linea del filo di collegamento
     @cvar color: colore della linea del filo di collegamento
+    @cvar tag: tag comune di tutti i fili
     """
 
     thick   = 1             # spessore della linea
     color   = 'black'       # colore della linea
+    tag     = 'wire'        # tag comune dei fili
 
     
-    def __init__( self, pla, c_from, c_to, placement=( 'pin', 'pin' ) ):
+    def __init__( self, pla, c_from, c_to, placement=( 'pin', 'pin' ), tags=() ):
         """
         Istanzia un filo di collegamento.
 
@@ -791,6 +1135,7 @@ class Wire( Component ):
         @type c_to: Component
         @param placement: indica se il collegamento va effettuato al pin del componente (default),
         o al suo centro
+        @param tags: tag dei gruppi a cui appartiene il filo
         """
         if placement[ 0 ] == 'pin':
             x0  = pla.nor_to_abs( c_from.pin_out()[ 0 ] )
@@ -805,7 +1150,24 @@ class Wire( Component ):
             x1  = pla.nor_to_abs( c_to.center[ 0 ] )
             y1  = pla.nor_to_abs( c_to.center[ 1 ] )
 
-        pla.canvas.create_line( x0, y0, x1, y1, width=self.thick, fill=self.color )
+        Wire.line( pla, ( x0, y0, x1, y1 ), tags )
+
+
+    @staticmethod
+    def line( pla, coords, tags=() ):
+        """
+        Disegna un collegamento come un'unica spezzata, date le coordinate dei suoi vertici.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param coords: coordinate assolute x0, y0, x1, y1, ... dei vertici [pixel]
+        @param tags: tag Tkinter da assegnare alla linea, oltre a I{tag}
+        @return: l'identificativo della linea sul canvas
+        """
+        if isinstance( tags, str ):
+            tags    = ( tags, )
+        return pla.canvas.create_line( *coords, width=Wire.thick, fill=Wire.color,
+                tags=( Wire.tag, ) + tuple( tags ) )
 
 
 
@@ -826,22 +1188,31 @@ class InPin( Component ):
 
     @ivar x: coordinata orizzontale del centro del pin di input
     @type x: dimensione normalizzata 0..1
-    @ivar y_in: coordinata verticale del centro del pin di input
+    @ivar y_in: coordinata verticale del centro del pin di input, dal layout del simulatore
     @type y_in: dimensione normalizzata 0..1
     @ivar y_lab: fattore di posizionamento della label nella finestra
     @type y_lab: pixel
     @ivar label: area di testo dove viene visualizzata l'etichetta dell'input
     @type label: Tkinter.Canvas object ID
+    @ivar window: oggetto grafico che contiene il pulsante
+    @type window: Tkinter.Canvas object ID
+    @ivar caption: testo corrente dell'etichetta
+    @cvar label_tag: tag comune delle etichette di tutti gli input
+    @ivar tags: tag dei gruppi a cui appartiene il pin
+    @ivar state: stato corrente del pulsante, NORMAL o DISABLED
     @ivar v: valore dello stato logico del pin
     @type v: Tkinter.IntVar
     """
 
-    y_in    = 0.            # altezza del centro del pin
     label   = None          # testo dove viene visualizzata l'etichetta dell'input
+    caption = ''            # testo corrente dell'etichetta
+    state   = NORMAL        # stato corrente del pulsante
     y_lab   = 540.          # fattore di posizionamento della label nella finestra
+    label_tag = 'in_label'  # tag comune delle etichette
+    parts   = ( 'window', 'label' )
 
 
-    def __init__( self, pla, x, v ):
+    def __init__( self, pla, x, v, tags=(), command=None ):
         """
         Istanzia un pin di ingresso.
 
@@ -850,30 +1221,61 @@ class InPin( Component ):
         @param x: coordinata orizzontale del punto di uscita del pin
         @param v: valore dello stato logico del pin
         @type v: Tkinter.IntVar
+        @param tags: tag dei gruppi a cui appartiene il pin
+        @param command: funzione chiamata alla pressione del pulsante, se None I{toggle}
         """
         self.var    = v
         self.x      = x
-        x0          = pla.nor_to_abs( x )
-        y0          = pla.nor_to_abs( self.y_in )
+        self.tags   = tuple( tags )
+        ( x0, y0 ), label   = self._anchors( pla )
         self.button = Button(
                         pla.root,
                         height=1,
                         width=2,
                         textvariable=v,
                         disabledforeground='#f0f0f0',   # non funziona!
-                        command=self.toggle
+                        command=command or self.toggle
         ) 
-        b           = pla.canvas.create_window(
+        self.window = pla.canvas.create_window(
                 x0,
                 y0,
-                window=self.button
+                window=self.button,
+                tags=self.tags
         )
-        yd  = pla.grid_delta * self.y_lab / pla.size[ 1 ]
         self.label  = pla.canvas.create_text(
-                x0,
-                y0 - pla.nor_to_abs( yd ),
-                text=''
+                *label,
+                text='',
+                tags=( self.label_tag, ) + self.tags
         )
+
+
+    def _anchors( self, pla ):
+        """
+        Calcola la posizione del pulsante e dell'etichetta del pin.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @return: coppia di coordinate assolute (pulsante, etichetta) [pixel]
+        """
+        self.y_in   = pla.layout.in_y
+        x0          = pla.nor_to_abs( self.x )
+        y0          = pla.nor_to_abs( self.y_in )
+        yd          = pla.grid_delta * self.y_lab / pla.size[ 1 ]
+        return ( x0, y0 ), ( x0, y0 - pla.nor_to_abs( yd ) )
+
+
+    def move( self, pla, x ):
+        """
+        Sposta il pin in una nuova posizione del layout corrente, riutilizzandone gli oggetti grafici.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del nuovo centro del pin
+        """
+        self.x      = x
+        button, label   = self._anchors( pla )
+        pla.canvas.coords( self.window, *button )
+        pla.canvas.coords( self.label, *label )
     
 
     def set_label( self, pla, t ):
@@ -884,7 +1286,10 @@ class InPin( Component ):
         @type pla: Pla
         @param t: stringa della nuova etichetta dell'input
         """
+        if t == self.caption:
+            return
         pla.canvas.itemconfigure( self.label, text=t )
+        self.caption    = t
 
 
     def reset_label( self, pla ):
@@ -894,7 +1299,7 @@ class InPin( Component ):
         @param pla: il simulatore
         @type pla: Pla
         """
-        pla.canvas.itemconfigure( self.label, text='' )
+        self.set_label( pla, '' )
 
 
     def toggle( self ):
@@ -907,12 +1312,24 @@ class InPin( Component ):
             self.var.set( 1 )
 
 
+    def _state( self, state ):
+        """
+        Porta il pulsante nello stato indicato, se diverso da quello attuale.
+
+        @param state: nuovo stato del pulsante, NORMAL o DISABLED
+        """
+        if state == self.state:
+            return
+        self.button.configure( state=state )
+        self.state  = state
+
+
     def enable( self ):
         """
         Abilita il pin.
         """
         self.var.set( 0 )
-        self.button.configure( state=NORMAL )
+        self._state( NORMAL )
 	
 
     def disable( self ):
@@ -920,19 +1337,39 @@ class InPin( Component ):
         Disabilita il pin.
         """
         self.var.set( 0 )
-        self.button.configure( state=DISABLED )
+        self._state( DISABLED )
 
 
-    def reset( self, pla ):
+    def reset( self, pla, t='' ):
         """
         Resetta il pin di input al suo stato iniziale.
 
         @param pla: il simulatore
         @type pla: Pla
+        @param t: etichetta dell'input dopo il reset
         """
         self.var.set( 0 )
-        self.button.configure( state=NORMAL )
-        self.reset_label( pla )
+        self._state( NORMAL )
+        self.set_label( pla, t )
+
+
+    @staticmethod
+    def reset_all( pla, pins ):
+        """
+        Resetta tutti i pin di input, con una sola chiamata al canvas per le etichette.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param pins: tutti i pin di input del simulatore
+        @type pins: iterabile di InPin
+        """
+        pins    = list( pins )
+        if any( p.caption for p in pins ):
+            pla.canvas.itemconfigure( InPin.label_tag, text='' )
+        for p in pins:
+            p.var.set( 0 )
+            p._state( NORMAL )
+            p.caption   = ''
 
 
 
@@ -957,7 +1394,7 @@ class InPin( Component ):
         x2	= x1
         y2	= pla.nor_to_abs( yc )
 
-        pla.canvas.create_line( x0, y0, x1, y1, x2, y2, width=Wire.thick, fill=Wire.color )
+        Wire.line( pla, ( x0, y0, x1, y1, x2, y2 ), self.tags )
     	
     	
     def pin_out( self ):
@@ -980,7 +1417,7 @@ class OutPin( Component ):
     Il pin viene rappresentato da due cerchi concentrici.
 
     @param x: coordinata orizzontale del punto di uscita del pin
-    @ivar y_in: coordinata verticale del centro del pin di output
+    @ivar y_in: coordinata verticale del centro del pin di output, dal layout del simulatore
     @type y_in: dimensione normalizzata 0..1
     @cvar size: grandezza complessiva di un pin
     @type size: dimensione normalizzata 0..1
@@ -990,19 +1427,27 @@ class OutPin( Component ):
     @type locked: boolean
     @ivar text: area di testo dove viene visualizzato lo stato del pin
     @type text: Tkinter.Canvas object ID
+    @ivar shown: valore visualizzato in I{text}, None se il testo è nascosto
     @ivar label: area di testo dove viene visualizzata l'etichetta dell'output
     @type label: Tkinter.Canvas object ID
+    @ivar caption: testo corrente dell'etichetta
+    @cvar text_tag: tag comune dei testi di stato di tutti gli output
+    @cvar label_tag: tag comune delle etichette di tutti gli output
     """
-    y_in    = 0.                # coordinata verticale del centro del pin di output
     size    = Port.size         # grandezza complessiva di un pin
     thick   = 1                 #
     color   = 'black'           #
     locked  = False             # indica se il pin e` inattivo
     text    = None              # testo dove viene visualizzato lo stato del pin
+    shown   = None              # valore visualizzato, None se il testo e` nascosto
     label   = None              # testo dove viene visualizzata l'etichetta
+    caption = ''                # testo corrente dell'etichetta
+    text_tag    = 'out_text'    # tag comune dei testi di stato
+    label_tag   = 'out_label'   # tag comune delle etichette
+    parts       = ( 'circ', 'circ1', 'text', 'label' )
 
 
-    def __init__( self, pla, x ):
+    def __init__( self, pla, x, tags=() ):
         """
         Istanzia un pin di ingresso.
 
@@ -1010,55 +1455,82 @@ class OutPin( Component ):
         @type pla: Pla
         @param x: coordinata orizzontale del punto di uscita del pin
         @type x: dimensione normalizzata 0..1
+        @param tags: tag dei gruppi a cui appartiene il pin
         """
-        r           = 0.5 * self.size
-        r1          = 0.8 * r
-        self.x	    = x
-        
-        self.y      = self.y_in + r
-
-        x0          = pla.nor_to_abs( x - r )
-        x1          = pla.nor_to_abs( x + r )
-        y0          = pla.nor_to_abs( self.y - r )
-        y1          = pla.nor_to_abs( self.y + r )
-
-        circ	    = ( x0, y0, x1, y1 )
+        tags        = tuple( tags )
+        circ, circ1, text, label    = self._geometry( pla, x )
 
         self.circ   = pla.canvas.create_oval(
                 *circ,
                 width=self.thick,
                 outline=self.color,
-                fill=''
+                fill='',
+                tags=tags
         )
-        
-
-        x0          = pla.nor_to_abs( x - r1 )
-        x1          = pla.nor_to_abs( x + r1 )
-        y0          = pla.nor_to_abs( self.y - r1 )
-        y1          = pla.nor_to_abs( self.y + r1 )
-
-        circ1	    = ( x0, y0, x1, y1 )
 
         self.circ1  = pla.canvas.create_oval(
                 *circ1,
                 width=self.thick,
                 outline=self.color,
-                fill=''
+                fill='',
+                tags=tags
         )
 
         self.text   = pla.canvas.create_text(
-                pla.nor_to_abs( self.x ),
-                pla.nor_to_abs( self.y ),
+                *text,
                 state=HIDDEN,
-                text='0'
+                text='0',
+                tags=( self.text_tag, ) + tags
         )
         self.label  = pla.canvas.create_text(
-                pla.nor_to_abs( self.x ),
-                y0 + pla.nor_to_abs( 1.3 * pla.grid_delta ),
-                text=''
+                *label,
+                text='',
+                tags=( self.label_tag, ) + tags
         )
 
 
+    def _geometry( self, pla, x ):
+        """
+        Calcola la posizione del pin e le coordinate dei suoi oggetti grafici.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del centro del pin
+        @return: coordinate assolute dei due cerchi, del testo di stato e dell'etichetta [pixel]
+        """
+        r           = 0.5 * self.size * pla.unit
+        r1          = 0.8 * r
+        self.x	    = x
+        self.y_in   = pla.layout.out_y
+        self.y      = self.y_in + r
+
+        x0          = pla.nor_to_abs( x - r )
+        x1          = pla.nor_to_abs( x + r )
+        y0          = pla.nor_to_abs( self.y - r )
+        y1          = pla.nor_to_abs( self.y + r )
+        circ	    = ( x0, y0, x1, y1 )
+
+        circ1       = ( pla.nor_to_abs( x - r1 ), pla.nor_to_abs( self.y - r1 ),
+                        pla.nor_to_abs( x + r1 ), pla.nor_to_abs( self.y + r1 ) )
+
+        text        = ( pla.nor_to_abs( self.x ), pla.nor_to_abs( self.y ) )
+        label       = ( pla.nor_to_abs( self.x ), circ1[ 1 ] + pla.nor_to_abs( 1.3 * pla.grid_delta ) )
+        return circ, circ1, text, label
+
+
+    def move( self, pla, x ):
+        """
+        Sposta il pin in una nuova posizione del layout corrente, riutilizzandone gli oggetti grafici.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param x: coordinata orizzontale del nuovo centro del pin
+        """
+        for item, xy in zip( ( self.circ, self.circ1, self.text, self.label ),
+                             self._geometry( pla, x ) ):
+            pla.canvas.coords( item, *xy )
+
+
     def set_label( self, pla, t ):
         """
         Setta l'etichetta dell'output con la stringa passata come parametro.
@@ -1067,7 +1539,10 @@ class OutPin( Component ):
         @type pla: Pla
         @param t: stringa della nuova etichetta del pin
         """
+        if t == self.caption:
+            return
         pla.canvas.itemconfigure( self.label, text=t )
+        self.caption    = t
 
 
     def reset_label( self, pla ):
@@ -1077,12 +1552,12 @@ class OutPin( Component ):
         @param pla: il simulatore
         @type pla: Pla
         """
-        pla.canvas.itemconfigure( self.label, text='' )
+        self.set_label( pla, '' )
 
 
     def value( self, pla, status ):
         """
-        Aggiorna I{text} del pin in base al valore di stato indicato.
+        Aggiorna I{text} del pin in base al valore di stato indicato, solo se cambia.
 
         @param pla: il simulatore
         @type pla: Pla
@@ -1091,8 +1566,23 @@ class OutPin( Component ):
         if self.locked:
             return
         t   = 1 if status else 0
-        pla.canvas.itemconfigure( self.text, text=str( t ) )
-        pla.canvas.itemconfigure( self.text, state=NORMAL )
+        if self.shown == str( t ):
+            return
+        pla.canvas.itemconfigure( self.text, text=str( t ), state=NORMAL )
+        self.shown  = str( t )
+
+
+    def hide( self, pla ):
+        """
+        Nasconde il testo dello stato, se visualizzato.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        """
+        if self.shown is None:
+            return
+        pla.canvas.itemconfigure( self.text, text='0', state=HIDDEN )
+        self.shown  = None
 
 
     def disable( self, pla ):
@@ -1103,21 +1593,42 @@ class OutPin( Component ):
         @type pla: Pla
         """
         self.locked = True
-        pla.canvas.itemconfigure( self.text, text='0' )
-        pla.canvas.itemconfigure( self.text, state=HIDDEN )
+        self.hide( pla )
 
 
-    def reset( self, pla ):
+    def reset( self, pla, t='' ):
         """
         Resetta il pin di output al suo stato iniziale.
 
         @param pla: il simulatore
         @type pla: Pla
+        @param t: etichetta dell'output dopo il reset
         """
         self.locked = False
-        pla.canvas.itemconfigure( self.text, text='0' )
-        pla.canvas.itemconfigure( self.text, state=HIDDEN )
-        self.reset_label( pla )
+        self.hide( pla )
+        self.set_label( pla, t )
+
+
+    @staticmethod
+    def reset_all( pla, pins ):
+        """
+        Resetta tutti i pin di output, con una chiamata al canvas per i testi di stato e una per
+        le etichette.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        @param pins: tutti i pin di output del simulatore
+        @type pins: iterabile di OutPin
+        """
+        pins    = list( pins )
+        if any( p.shown is not None for p in pins ):
+            pla.canvas.itemconfigure( OutPin.text_tag, text='0', state=HIDDEN )
+        if any( p.caption for p in pins ):
+            pla.canvas.itemconfigure( OutPin.label_tag, text='' )
+        for p in pins:
+            p.locked    = False
+            p.shown     = None
+            p.caption   = ''
 
 
     def pin_in( self ):
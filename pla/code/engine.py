@@ -0,0 +1,510 @@
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: engine.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Motori di valutazione della parte logica del PLA.
+
+Un motore riceve le due matrici di connessione, nello stesso formato di Circuit.and_matrix e
+Circuit.or_matrix, e calcola l'uscita delle porte AND e OR per uno o più vettori di ingresso.
+La colonna 2k della matrice IN-AND corrisponde all'ingresso k negato (uscita della porta NOT),
+la colonna 2k+1 all'ingresso k diretto.
+
+Una porta AND vale 1 se ha almeno un fusibile collegato e tutti i letterali collegati valgono 1;
+una porta OR vale 1 se almeno una delle AND collegate vale 1.
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+
+@var sparse_density: densità dei fusibili collegati sotto la quale make_engine sceglie il motore sparso
+"""
+
+from numpy      import asarray, zeros, ones, empty, concatenate, dot, flatnonzero, count_nonzero, packbits
+from numpy      import logical_and, logical_or, int32, intp, prod
+from binascii   import hexlify
+from bisect     import bisect_left
+
+sparse_density  = 0.1                   # densità sotto cui conviene il formato CSR
+
+
+class Engine( object ):
+    """
+    Classe astratta dei motori di valutazione.
+
+    I metodi I{ands}, I{outs} e I{run} accettano sia un singolo vettore di ingresso (array 1-D
+    di lunghezza n_inputs), sia un blocco di vettori (array 2-D di forma n_vettori x n_inputs),
+    e restituiscono array di booleani con la stessa dimensionalità.
+
+    I metodi I{first_mismatch}, I{fault_sim} e I{sequence} sono realizzati a partire da I{run};
+    le sottoclassi possono ridefinirli con algoritmi più efficienti.
+
+    @ivar n_inputs: numero di ingressi
+    @ivar n_outputs: numero di uscite
+    @ivar n_and: numero di porte AND
+    @ivar and_matrix: matrice di connessione tra ingressi e porte AND, come array di booleani
+    @ivar or_matrix: matrice di connessione tra porte AND e OR, come array di booleani
+    @cvar chunk: numero di vettori valutati per blocco nelle ricerche con uscita anticipata
+    """
+
+    n_inputs    = 0
+    n_outputs   = 0
+    n_and       = 0
+    and_matrix  = None
+    or_matrix   = None
+    chunk       = 4096
+
+
+    def __init__( self, and_matrix, or_matrix ):
+        """
+        Inizializza le dimensioni comuni a tutti i motori.
+
+        @param and_matrix: matrice di connessione tra ingressi e porte AND
+        @param or_matrix: matrice di connessione tra porte AND e OR
+        """
+        self.and_matrix = asarray( and_matrix, dtype=bool )     # nessuna copia se già booleane
+        self.or_matrix  = asarray( or_matrix, dtype=bool )
+        self.n_and, c   = self.and_matrix.shape
+        self.n_inputs   = c // 2
+        self.n_outputs  = self.or_matrix.shape[ 1 ]
+
+
+    def ands( self, x ):
+        """
+        Calcola le uscite delle porte AND.
+
+        @param x: vettore o blocco di vettori di ingresso
+        @return: uscite delle porte AND
+        """
+        raise NotImplementedError
+
+
+    def outs( self, a ):
+        """
+        Calcola le uscite delle porte OR a partire da quelle delle porte AND.
+
+        @param a: uscite delle porte AND, per uno o più vettori
+        @return: uscite del PLA
+        """
+        raise NotImplementedError
+
+
+    def run( self, x ):
+        """
+        Calcola le uscite del PLA.
+
+        @param x: vettore o blocco di vettori di ingresso
+        @return: uscite del PLA
+        """
+        return self.outs( self.ands( x ) )
+
+
+    def first_mismatch( self, x, expected ):
+        """
+        Cerca il primo vettore per cui le uscite differiscono da quelle attese.
+        I vettori vengono valutati a blocchi di I{chunk}, fermandosi al primo blocco con un errore.
+
+        @param x: blocco di vettori di ingresso
+        @param expected: blocco delle uscite attese
+        @return: indice del primo vettore errato, -1 se tutte le uscite coincidono
+        """
+        x           = asarray( x )
+        expected    = asarray( expected ) != 0
+        for i in range( 0, len( x ), self.chunk ):
+            j       = i + self.chunk
+            bad     = ( self.run( x[ i : j ] ) != expected[ i : j ] ).any( axis=1 )
+            if bad.any():
+                return i + int( bad.argmax() )
+        return -1
+
+
+    def fault_sim( self, x ):
+        """
+        Simula i guasti di singolo fusibile, cioè un fusibile nello stato opposto a quello
+        programmato. I guasti sono numerati riga per riga, prima nella matrice IN-AND e poi
+        nella matrice AND-OR.
+
+        @param x: blocco di vettori di ingresso
+        @return: per ogni guasto, l'indice del primo vettore che lo rileva, -1 se non rilevato
+        """
+        good        = self.run( x )
+        n_in        = self.and_matrix.size
+        det         = -ones( n_in + self.or_matrix.size, dtype=intp )
+        for f in range( len( det ) ):
+            a       = self.and_matrix.copy()
+            o       = self.or_matrix.copy()
+            m, k    = ( a, f ) if f < n_in else ( o, f - n_in )
+            m.flat[ k ] = not m.flat[ k ]
+            det[ f ] = self.__class__( a, o ).first_mismatch( x, good )
+        return det
+
+
+    def sequence( self, x, feedback ):
+        """
+        Simula un circuito sequenziale, riportando a ogni ciclo alcune uscite sugli ingressi,
+        come per i flip-flop della libreria.
+
+        @param x: blocco di vettori di ingresso, uno per ciclo; gli ingressi retroazionati sono
+        letti solo al primo ciclo, di cui fissano lo stato iniziale
+        @param feedback: lista di coppie (uscita, ingresso)
+        @return: blocco delle uscite, una riga per ciclo
+        """
+        x           = asarray( x ) != 0
+        o           = zeros( ( len( x ), self.n_outputs ), dtype=bool )
+        for t in range( len( x ) ):
+            v       = x[ t ].copy()
+            if t:
+                for c, k in feedback:
+                    v[ k ] = o[ t - 1, c ]
+            o[ t ]  = self.run( v )
+        return o
+
+
+
+# ======================================================================================================= #
+
+
+
+class DenseEngine( Engine ):
+    """
+    Motore di valutazione denso.
+
+    I letterali falsi di ogni vettore vengono contati per ciascuna riga con un prodotto matriciale:
+    il costo è proporzionale a n_and * 2 * n_inputs per vettore, indipendentemente da quanti
+    fusibili risultino collegati.
+
+    @ivar and_t: trasposta della matrice IN-AND
+    @ivar or_m: matrice AND-OR
+    @ivar live: righe con almeno un fusibile collegato
+    """
+
+    def __init__( self, and_matrix, or_matrix ):
+        """
+        Istanzia il motore denso.
+
+        @param and_matrix: matrice di connessione tra ingressi e porte AND
+        @param or_matrix: matrice di connessione tra porte AND e OR
+        """
+        Engine.__init__( self, and_matrix, or_matrix )
+        self.and_t      = self.and_matrix.T.astype( int32 )
+        self.or_m       = self.or_matrix.astype( int32 )
+        self.live       = self.and_matrix.any( axis=1 )
+
+
+    def ands( self, x ):
+        x       = asarray( x ) != 0
+        lit     = empty( x.shape[ : -1 ] + ( 2 * self.n_inputs, ), dtype=int32 )
+        lit[ ..., 0 : : 2 ] = x                 # letterale negato falso quando x vale 1
+        lit[ ..., 1 : : 2 ] = ~x
+        return ( dot( lit, self.and_t ) == 0 ) & self.live
+
+
+    def outs( self, a ):
+        a       = ( asarray( a ) != 0 ).astype( int32 )
+        return dot( a, self.or_m ) > 0
+
+
+
+# ======================================================================================================= #
+
+
+
+class SparseEngine( Engine ):
+    """
+    Motore di valutazione sparso, in formato CSR (I{compressed sparse row}).
+
+    Ogni riga AND è memorizzata come lista di letterali (ingresso, polarità), ogni uscita come
+    lista delle righe AND collegate. Il costo è proporzionale al numero di fusibili collegati.
+
+    @ivar and_ptr: inizio della lista di letterali di ogni riga, di lunghezza n_and + 1
+    @ivar and_in: ingresso di ogni letterale
+    @ivar and_pol: polarità di ogni letterale (True se diretto, False se negato)
+    @ivar or_ptr: inizio della lista di righe di ogni uscita, di lunghezza n_outputs + 1
+    @ivar or_rows: riga AND di ogni collegamento delle uscite
+    """
+
+    def __init__( self, and_matrix, or_matrix ):
+        """
+        Istanzia il motore sparso.
+
+        @param and_matrix: matrice di connessione tra ingressi e porte AND
+        @param or_matrix: matrice di connessione tra porte AND e OR
+        """
+        Engine.__init__( self, and_matrix, or_matrix )
+        self.and_ptr, cols      = _csr( self.and_matrix )
+        self.and_in     = cols // 2
+        self.and_pol    = ( cols % 2 ) == 1
+        self.or_ptr, self.or_rows   = _csr( self.or_matrix.T )
+
+
+    def ands( self, x ):
+        x       = asarray( x ) != 0
+        return _reduce_rows( logical_and, x[ ..., self.and_in ] == self.and_pol, self.and_ptr )
+
+
+    def outs( self, a ):
+        a       = asarray( a ) != 0
+        return _reduce_rows( logical_or, a[ ..., self.or_rows ], self.or_ptr )
+
+
+
+def _csr( m ):
+    """
+    Converte una matrice booleana in formato CSR.
+
+    @param m: matrice booleana
+    @return: coppia (puntatori di inizio riga, indici di colonna)
+    """
+    ptr         = zeros( m.shape[ 0 ] + 1, dtype=intp )
+    ptr[ 1 : ]  = m.sum( axis=1 ).cumsum()
+    return ptr, m.nonzero()[ 1 ]
+
+
+def _reduce_rows( op, v, ptr ):
+    """
+    Riduce i valori di ogni riga CSR lungo l'ultimo asse; le righe vuote valgono False.
+
+    @param op: ufunc di riduzione (logical_and o logical_or)
+    @param v: valori dei collegamenti, con ultimo asse lungo quanto il numero di collegamenti
+    @param ptr: puntatori di inizio riga
+    """
+    n           = len( ptr ) - 1
+    r           = zeros( v.shape[ : -1 ] + ( n, ), dtype=bool )
+    live        = flatnonzero( ptr[ 1 : ] > ptr[ : -1 ] )
+    if len( live ):
+        r[ ..., live ] = op.reduceat( v, ptr[ live ], axis=-1 )
+    return r
+
+
+
+# ======================================================================================================= #
+
+
+
+class MaskEngine( Engine ):
+    """
+    Motore di valutazione a maschere di bit, per la simulazione di un singolo vettore.
+
+    Un vettore di ingresso è un intero Python, con il bit k uguale al valore dell'ingresso k.
+    Ogni riga AND è precalcolata come coppia di maschere (I{care}, I{value}) e vale 1 se
+    C{( x & care ) == value}; ogni uscita è la maschera delle righe AND collegate, da confrontare
+    con l'insieme di bit delle righe attive. Gli interi Python hanno precisione arbitraria, quindi
+    il costo per vettore dipende dal numero di righe e quasi per nulla dal numero di ingressi,
+    senza passare da NumPy a ogni chiamata.
+
+    Con I{set_fuse} il cambio di un fusibile aggiorna solo le maschere della riga o dell'uscita
+    interessata, senza ricostruire il motore.
+
+    @ivar rows: coppie (care, value) delle righe AND che possono valere 1
+    @ivar row_ids: indice di riga AND di ciascuna coppia in I{rows}
+    @ivar out_masks: maschere delle righe AND collegate a ciascuna uscita
+    """
+
+    def __init__( self, and_matrix, or_matrix ):
+        """
+        Istanzia il motore a maschere di bit.
+
+        @param and_matrix: matrice di connessione tra ingressi e porte AND
+        @param or_matrix: matrice di connessione tra porte AND e OR
+        """
+        Engine.__init__( self, and_matrix, or_matrix )
+        neg             = self.and_matrix[ :, 0 : : 2 ]
+        pos             = self.and_matrix[ :, 1 : : 2 ]
+        care            = _masks( neg | pos )
+        value           = _masks( pos )
+
+        # le righe vuote, o con un ingresso collegato in entrambe le polarità, valgono sempre 0
+        ok              = ( neg | pos ).any( axis=1 ) & ~( neg & pos ).any( axis=1 )
+        self.row_ids    = flatnonzero( ok ).tolist()
+        self.rows       = [ ( care[ r ], value[ r ] ) for r in self.row_ids ]
+        self.out_masks  = _masks( self.or_matrix.T )
+
+
+    def step_ands( self, x ):
+        """
+        Calcola l'insieme delle righe AND attive per un singolo vettore.
+
+        @param x: vettore di ingresso
+        @type x: int
+        @return: intero con il bit r uguale all'uscita della porta AND r
+        """
+        a       = 0
+        for r, ( care, value ) in zip( self.row_ids, self.rows ):
+            if ( x & care ) == value:
+                a   |= 1 << r
+        return a
+
+
+    def step_outs( self, a ):
+        """
+        Calcola le uscite per un singolo insieme di righe AND attive.
+
+        @param a: intero con il bit r uguale all'uscita della porta AND r
+        @return: intero con il bit c uguale all'uscita c
+        """
+        o       = 0
+        for c, m in enumerate( self.out_masks ):
+            if a & m:
+                o   |= 1 << c
+        return o
+
+
+    def step( self, x ):
+        """
+        Calcola le uscite del PLA per un singolo vettore.
+
+        @param x: vettore di ingresso
+        @type x: int
+        @return: intero con il bit c uguale all'uscita c
+        """
+        return self.step_outs( self.step_ands( x ) )
+
+
+    def set_fuse( self, plane, r, c, v ):
+        """
+        Cambia lo stato di un fusibile, aggiornando solo le maschere interessate: quelle della
+        riga AND per la matrice IN-AND, quella dell'uscita per la matrice AND-OR.
+
+        @param plane: 'in' per la matrice IN-AND, 'out' per la matrice AND-OR
+        @param r: riga del fusibile
+        @param c: colonna del fusibile
+        @param v: nuovo stato del fusibile
+        """
+        if plane == 'out':
+            self.or_matrix[ r, c ]  = v
+            if v:
+                self.out_masks[ c ] |= 1 << r
+            else:
+                self.out_masks[ c ] &= ~( 1 << r )
+            return
+
+        self.and_matrix[ r, c ] = v
+        neg             = self.and_matrix[ r, 0 : : 2 ]
+        pos             = self.and_matrix[ r, 1 : : 2 ]
+        i               = bisect_left( self.row_ids, r )
+        present         = i < len( self.row_ids ) and self.row_ids[ i ] == r
+        if ( neg | pos ).any() and not ( neg & pos ).any():
+            m           = ( _masks( neg | pos ), _masks( pos ) )
+            if present:
+                self.rows[ i ]  = m
+            else:
+                self.row_ids.insert( i, r )
+                self.rows.insert( i, m )
+        elif present:
+            del self.row_ids[ i ]
+            del self.rows[ i ]
+
+
+    def ands( self, x ):
+        x       = asarray( x ) != 0
+        r       = zeros( x.shape[ : -1 ] + ( self.n_and, ), dtype=bool )
+        for i, v in _vectors( x ):
+            r[ i ] = _bits( self.step_ands( _masks( v ) ), self.n_and )
+        return r
+
+
+    def outs( self, a ):
+        a       = asarray( a ) != 0
+        r       = zeros( a.shape[ : -1 ] + ( self.n_outputs, ), dtype=bool )
+        for i, v in _vectors( a ):
+            r[ i ] = _bits( self.step_outs( _masks( v ) ), self.n_outputs )
+        return r
+
+
+
+def _masks( m ):
+    """
+    Converte un vettore di booleani in un intero, o una matrice in una lista di interi (uno per
+    riga); l'elemento di indice k diventa il bit k. Le righe di lunghezza 0 danno l'intero 0.
+
+    @param m: vettore o matrice di booleani
+    """
+    m           = asarray( m ) != 0
+    rows        = _block( m )[ :, : : -1 ]
+    pad         = -rows.shape[ 1 ] % 8
+    if pad:
+        rows    = concatenate( ( zeros( ( rows.shape[ 0 ], pad ), dtype=bool ), rows ), axis=1 )
+    b           = packbits( rows, axis=1 )
+    r           = [ int( hexlify( v.tobytes() ) or b'0', 16 ) for v in b ]
+    if m.ndim == 1:
+        return r[ 0 ]
+    return r
+
+
+def _block( x ):
+    """
+    Riporta un vettore o un blocco di vettori alla forma 2-D n_vettori x lunghezza. A differenza
+    di C{reshape( ( -1, n ) )} funziona anche per vettori di lunghezza 0, cioè con zero ingressi,
+    porte AND o uscite.
+
+    @param x: array di almeno una dimensione
+    """
+    return x.reshape( ( int( prod( x.shape[ : -1 ] ) ), x.shape[ -1 ] ) )
+
+
+def _bits( v, n ):
+    """
+    Converte un intero nel vettore di booleani dei suoi n bit meno significativi.
+
+    @param v: intero da convertire
+    @param n: numero di bit
+    """
+    b           = bin( v )[ 2 : ].zfill( n )[ : : -1 ]
+    return asarray( bytearray( b[ : n ].encode( 'ascii' ) ) ) == ord( '1' )
+
+
+def _vectors( x ):
+    """
+    Itera sui vettori di un array 1-D o 2-D, restituendo coppie (indice, vettore).
+
+    @param x: vettore o blocco di vettori
+    """
+    if x.ndim == 1:
+        return [ ( Ellipsis, x ) ]
+    return enumerate( x )
+
+
+
+# ======================================================================================================= #
+
+
+
+def density( and_matrix ):
+    """
+    Calcola la frazione di fusibili collegati nella matrice IN-AND.
+
+    @param and_matrix: matrice di connessione tra ingressi e porte AND
+    """
+    m   = asarray( and_matrix )
+    if not m.size:
+        return 0.
+    return float( count_nonzero( m ) ) / m.size
+
+
+def make_engine( and_matrix, or_matrix, sparse=None, single=False, jit=False ):
+    """
+    Crea il motore di valutazione più adatto alle matrici indicate.
+
+    @param and_matrix: matrice di connessione tra ingressi e porte AND
+    @param or_matrix: matrice di connessione tra porte AND e OR
+    @param sparse: forza la scelta del motore sparso (True) o denso (False); se None la scelta
+    dipende dalla densità dei fusibili collegati
+    @param single: se True il motore verrà usato per un singolo vettore alla volta, e viene
+    scelto il motore a maschere di bit
+    @param jit: se True e Numba è installato viene scelto il motore compilato di kernels.JitEngine;
+    in assenza di Numba si ricade sui motori NumPy
+    @rtype: Engine
+    """
+    if jit:
+        import kernels
+        if kernels.available:
+            return kernels.JitEngine( and_matrix, or_matrix )
+    if single:
+        return MaskEngine( and_matrix, or_matrix )
+    if sparse is None:
+        sparse  = density( and_matrix ) < sparse_density
+    if sparse:
+        return SparseEngine( and_matrix, or_matrix )
+    return DenseEngine( and_matrix, or_matrix )
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: kernels.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Nuclei di simulazione compilati con Numba.
+
+Il modulo è opzionale: se Numba non è installato I{available} vale False, le funzioni restano
+codice Python puro, e engine.make_engine ricade sui motori NumPy.
+
+I nuclei lavorano sulle matrici di connessione come array di booleani e sui vettori di ingresso
+come blocchi n_vettori x n_inputs. A differenza delle operazioni NumPy su interi array, i cicli
+compilati possono fermarsi al primo letterale falso di una riga, alla prima riga attiva di
+un'uscita, o al primo vettore che rileva un errore.
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+
+@var available: vale True se Numba è installato
+"""
+
+from numpy      import asarray, zeros, ones, intp
+from engine     import Engine, _block
+
+try:
+    from numba  import njit
+except ImportError:
+    njit        = None
+
+available       = njit is not None
+
+
+def _jit( f ):
+    """
+    Compila una funzione con Numba, se disponibile, senza trattenere il GIL.
+
+    @param f: funzione da compilare
+    """
+    if not available:
+        return f
+    return njit( nogil=True, cache=True )( f )
+
+
+# ------------------------------------------------------------------------------------------------------- #
+#   nuclei
+# ------------------------------------------------------------------------------------------------------- #
+
+@_jit
+def _and_row( and_m, r, x ):
+    live    = False
+    for k in range( x.shape[ 0 ] ):
+        if and_m[ r, 2 * k ]:
+            if x[ k ]:
+                return False
+            live    = True
+        if and_m[ r, 2 * k + 1 ]:
+            if not x[ k ]:
+                return False
+            live    = True
+    return live
+
+
+@_jit
+def _or_col( or_m, c, a ):
+    for r in range( a.shape[ 0 ] ):
+        if a[ r ] and or_m[ r, c ]:
+            return True
+    return False
+
+
+@_jit
+def _eval( and_m, or_m, x, a, o ):
+    for r in range( and_m.shape[ 0 ] ):
+        a[ r ]  = _and_row( and_m, r, x )
+    for c in range( or_m.shape[ 1 ] ):
+        o[ c ]  = _or_col( or_m, c, a )
+
+
+@_jit
+def and_plane( and_m, x, out ):
+    """
+    Calcola le uscite delle porte AND per un blocco di vettori.
+    """
+    for v in range( x.shape[ 0 ] ):
+        for r in range( and_m.shape[ 0 ] ):
+            out[ v, r ] = _and_row( and_m, r, x[ v ] )
+
+
+@_jit
+def or_plane( or_m, a, out ):
+    """
+    Calcola le uscite delle porte OR per un blocco di uscite delle porte AND.
+    """
+    for v in range( a.shape[ 0 ] ):
+        for c in range( or_m.shape[ 1 ] ):
+            out[ v, c ] = _or_col( or_m, c, a[ v ] )
+
+
+@_jit
+def first_mismatch( and_m, or_m, x, expected ):
+    """
+    Restituisce l'indice del primo vettore con uscite diverse da quelle attese, -1 se nessuno.
+    """
+    a       = zeros( and_m.shape[ 0 ], dtype=and_m.dtype )
+    o       = zeros( or_m.shape[ 1 ], dtype=or_m.dtype )
+    for v in range( x.shape[ 0 ] ):
+        _eval( and_m, or_m, x[ v ], a, o )
+        for c in range( o.shape[ 0 ] ):
+            if o[ c ] != expected[ v, c ]:
+                return v
+    return -1
+
+
+@_jit
+def fault_sim( and_m, or_m, x, good, det ):
+    """
+    Simula i guasti di singolo fusibile; per ogni guasto scrive in I{det} l'indice del primo
+    vettore che lo rileva, -1 se nessuno. Le matrici vengono modificate e poi ripristinate.
+    """
+    n_in    = and_m.shape[ 0 ] * and_m.shape[ 1 ]
+    n_c     = and_m.shape[ 1 ]
+    n_o     = or_m.shape[ 1 ]
+    for f in range( det.shape[ 0 ] ):
+        if f < n_in:
+            r, c            = f // n_c, f % n_c
+            and_m[ r, c ]   = not and_m[ r, c ]
+            det[ f ]        = first_mismatch( and_m, or_m, x, good )
+            and_m[ r, c ]   = not and_m[ r, c ]
+        else:
+            r, c            = ( f - n_in ) // n_o, ( f - n_in ) % n_o
+            or_m[ r, c ]    = not or_m[ r, c ]
+            det[ f ]        = first_mismatch( and_m, or_m, x, good )
+            or_m[ r, c ]    = not or_m[ r, c ]
+
+
+@_jit
+def sequence( and_m, or_m, x, fb_out, fb_in, out ):
+    """
+    Simula un circuito sequenziale per x.shape[0] cicli, riportando le uscite fb_out sugli
+    ingressi fb_in.
+    """
+    a       = zeros( and_m.shape[ 0 ], dtype=and_m.dtype )
+    v       = x[ 0 ].copy()
+    for t in range( x.shape[ 0 ] ):
+        if t:
+            v[ : ]  = x[ t ]
+            for j in range( fb_out.shape[ 0 ] ):
+                v[ fb_in[ j ] ] = out[ t - 1, fb_out[ j ] ]
+        _eval( and_m, or_m, v, a, out[ t ] )
+
+
+
+# ======================================================================================================= #
+
+
+
+class JitEngine( Engine ):
+    """
+    Motore di valutazione basato sui nuclei compilati.
+
+    La prima chiamata di ogni nucleo ne provoca la compilazione; Numba conserva il codice
+    compilato su disco per le esecuzioni successive.
+    """
+
+    def ands( self, x ):
+        x       = asarray( x ) != 0
+        x2      = _block( x )
+        out     = zeros( ( len( x2 ), self.n_and ), dtype=bool )
+        and_plane( self.and_matrix, x2, out )
+        return out.reshape( x.shape[ : -1 ] + ( self.n_and, ) )
+
+
+    def outs( self, a ):
+        a       = asarray( a ) != 0
+        a2      = _block( a )
+        out     = zeros( ( len( a2 ), self.n_outputs ), dtype=bool )
+        or_plane( self.or_matrix, a2, out )
+        return out.reshape( a.shape[ : -1 ] + ( self.n_outputs, ) )
+
+
+    def first_mismatch( self, x, expected ):
+        return first_mismatch( self.and_matrix, self.or_matrix,
+                asarray( x ) != 0, asarray( expected ) != 0 )
+
+
+    def fault_sim( self, x ):
+        x       = asarray( x ) != 0
+        det     = -ones( self.and_matrix.size + self.or_matrix.size, dtype=intp )
+        fault_sim( self.and_matrix.copy(), self.or_matrix.copy(), x, self.run( x ), det )
+        return det
+
+
+    def sequence( self, x, feedback ):
+        x       = asarray( x ) != 0
+        out     = zeros( ( len( x ), self.n_outputs ), dtype=bool )
+        fb      = asarray( feedback, dtype=intp ).reshape( ( -1, 2 ) )
+        sequence( self.and_matrix, self.or_matrix, x, fb[ :, 0 ].copy(), fb[ :, 1 ].copy(), out )
+        return out
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: layout.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Calcolo del layout del simulatore.
+
+Tutti i componenti del PLA sono disposti su un reticolo regolare: le porte AND e le righe di fusibili
+in verticale, le porte NOT, i pin di input, le porte OR, i pin di output e le colonne di fusibili in
+orizzontale. La classe Layout calcola le coordinate di tutti i componenti come NumPy array, ciascuno
+in una sola operazione a partire dall'origine e dal passo di griglia: non c'è accumulo di errori di
+arrotondamento, e le stesse coordinate servono al disegno, alla selezione dei fusibili con il mouse
+e a chi voglia esportare la geometria del circuito.
+
+Le coordinate sono conservate in forma normalizzata, come nel resto del simulatore, e convertite in
+pixel da I{rescale}, da richiamare quando cambiano le dimensioni o l'ingrandimento della vista.
+Le posizioni dei pin dipendono anche dalle sagome delle porte, e sono calcolate a parte da I{set_pins}
+insieme agli estremi di tutti i collegamenti.
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+"""
+
+from numpy      import arange, asarray, column_stack, full
+
+
+class Layout( object ):
+    """
+    Coordinate di tutti i componenti di un PLA.
+
+    Gli array in coordinate normalizzate sono gli attributi elencati sotto, e per ciascuno il
+    dizionario I{px} contiene il corrispondente array in pixel, con lo stesso troncamento di
+    Pla.nor_to_abs.
+
+    @ivar d: passo di griglia
+    @type d: dimensione normalizzata 0..1
+    @ivar a_ratio: aspect ratio della finestra del simulatore
+    @ivar size: dimensioni in pixel del canvas, senza ingrandimento
+    @ivar and_y: coordinate verticali dei centri delle porte AND, e delle righe di fusibili
+    @ivar not_x: coordinate orizzontali dei centri delle porte NOT
+    @ivar in_x: coordinate orizzontali dei centri dei pin di input
+    @ivar or_x: coordinate orizzontali dei centri delle porte OR
+    @ivar out_x: coordinate orizzontali dei centri dei pin di output
+    @ivar fuse_x: coordinate orizzontali delle colonne di fusibili, per matrice ('in' oppure 'out')
+    @ivar and_x: coordinata orizzontale del centro delle porte AND
+    @ivar not_y: coordinata verticale del centro delle porte NOT
+    @ivar in_y: coordinata verticale del centro dei pin di input
+    @ivar or_y: coordinata verticale del centro delle porte OR
+    @ivar out_y: coordinata verticale del centro dei pin di output
+    @ivar origin: coordinata del primo elemento di ciascun reticolo ('and_y', 'fuse_in_x' e
+    'fuse_out_x'), il cui passo è I{d}
+    @ivar wires: vertici dei collegamenti, per nome del gruppo: array con una riga (x0, y0, x1, y1, ...)
+    per collegamento, vedi I{set_pins}
+    @ivar scale: fattore di conversione corrente da coordinate normalizzate a pixel
+    @ivar px: coordinate in pixel, per nome dell'array; i vertici dei collegamenti sono sotto
+    'wire_' seguito dal nome del gruppo
+    """
+
+    arrays  = ( 'and_y', 'not_x', 'in_x', 'or_x', 'out_x' )
+
+
+    def __init__( self, pla ):
+        """
+        Calcola il layout per le dimensioni correnti del simulatore.
+
+        @param pla: il simulatore, di cui vengono usati il numero di componenti e i parametri del layout
+        @type pla: Pla
+        """
+        n_in, n_out, n_and  = pla.n_inputs, pla.n_outputs, pla.n_and
+
+        l               = 2 * n_in + n_out + pla.l_and
+        h               = pla.upper_block + ( n_and - 1 ) + pla.lower_block + pla.l_or
+
+        self.a_ratio    = float( l ) / float( h )
+        self.size       = ( pla.x_size, pla.x_size / self.a_ratio )
+
+        d               = 1.0 / h
+        self.d          = d
+
+        self.not_y      = d * pla.upper_block
+        self.in_y       = 2 * d
+        self.or_y       = d * ( pla.upper_block + n_and + pla.l_or + 0.5 )
+        self.out_y      = d * ( pla.upper_block + n_and + pla.l_or + 1.5 )
+        self.and_x      = d * ( 2 * n_in + pla.l_and / 2 )
+
+        x_or            = d * ( 2 * n_in + pla.l_and )
+        self.and_y      = d * ( pla.upper_block + 1 + arange( n_and ) )
+        self.not_x      = d * ( 1 + 2 * arange( n_in ) )
+        self.in_x       = self.not_x + d
+        self.or_x       = x_or + d * arange( n_out )
+        self.out_x      = self.or_x
+        self.fuse_x     = { 'in': d * ( 1 + arange( 2 * n_in ) ), 'out': self.or_x }
+        self.origin     = { 'and_y': d * ( pla.upper_block + 1 ), 'fuse_in_x': d, 'fuse_out_x': x_or }
+        self.wires      = {}
+
+        self.rescale( self.size[ 1 ] * pla.zoom )
+
+
+
+    def rescale( self, scale ):
+        """
+        Ricalcola le coordinate in pixel.
+
+        @param scale: fattore di conversione da coordinate normalizzate a pixel, cioè l'altezza del
+        canvas moltiplicata per l'ingrandimento della vista
+        """
+        self.scale      = scale
+        self.px         = dict( ( k, self.pixels( getattr( self, k ) ) ) for k in self.arrays )
+        self.px[ 'fuse_in_x' ]  = self.pixels( self.fuse_x[ 'in' ] )
+        self.px[ 'fuse_out_x' ] = self.px[ 'or_x' ]
+        for k, a in self.wires.items():
+            self.px[ 'wire_' + k ]  = self.pixels( a )
+
+
+    def pixels( self, a ):
+        """
+        Converte in pixel un array di coordinate normalizzate.
+
+        @param a: coordinate normalizzate
+        @return: array di interi [pixel]
+        """
+        return ( self.scale * asarray( a ) ).astype( int )
+
+
+    def fuse_centers( self, plane ):
+        """
+        Restituisce i centri in pixel di tutti i fusibili di una matrice.
+
+        @param plane: 'in' per la matrice IN-AND, 'out' per la matrice AND-OR
+        @return: coppia di array (x, y) di dimensioni (righe, colonne)
+        """
+        x   = self.px[ 'fuse_%s_x' % plane ]
+        y   = self.px[ 'and_y' ]
+        return x[ None, : ].repeat( len( y ), 0 ), y[ :, None ].repeat( len( x ), 1 )
+
+
+
+    def index( self, axis, v, tol ):
+        """
+        Restituisce l'indice dell'elemento di un reticolo più vicino a un valore, calcolato
+        direttamente dall'origine e dal passo di griglia.
+
+        @param axis: il reticolo: 'and_y', 'fuse_in_x' oppure 'fuse_out_x'
+        @param v: il valore cercato
+        @type v: dimensione normalizzata 0..1
+        @param tol: distanza massima ammessa
+        @return: l'indice dell'elemento, o None se è fuori dal reticolo o dista più di I{tol}
+        """
+        x0  = self.origin[ axis ]
+        i   = int( round( ( v - x0 ) / self.d ) )
+        if 0 <= i < len( self.px[ axis ] ) and abs( x0 + i * self.d - v ) <= tol:
+            return i
+        return None
+
+
+
+    def set_pins( self, not_pins, and_pins, or_pins ):
+        """
+        Calcola i vertici di tutti i collegamenti, a partire dalle posizioni dei pin delle porte
+        relative al loro centro, come nelle sagome di component.Port:
+
+            - 'not': dai pin di input agli ingressi delle porte NOT, con un tratto orizzontale
+            - 'col_in': dalle uscite delle porte NOT (colonne pari) e dai pin di input (colonne
+              dispari) all'ultima riga della matrice IN-AND
+            - 'row_in': righe della matrice IN-AND, dal primo fusibile all'ingresso delle porte AND
+            - 'row_out': righe della matrice AND-OR, dall'uscita delle porte AND all'ultimo fusibile
+            - 'col_out': dalla prima riga della matrice AND-OR agli ingressi delle porte OR
+            - 'out': dalle uscite delle porte OR ai pin di output
+
+        @param not_pins: pin delle porte NOT, con chiavi 'y_in' e 'y_out'
+        @param and_pins: pin delle porte AND, con chiavi 'x_in' e 'x_out'
+        @param or_pins: pin delle porte OR, con chiavi 'y_in' e 'y_out'
+        """
+        d           = self.d
+        n_in, n_and = len( self.not_x ), len( self.and_y )
+        n_out       = len( self.or_x )
+        y_not       = ( self.not_y + not_pins[ 'y_in' ], self.not_y + not_pins[ 'y_out' ] )
+        x_and       = ( self.and_x + and_pins[ 'x_in' ], self.and_x + and_pins[ 'x_out' ] )
+        y_or        = ( self.or_y + or_pins[ 'y_in' ], self.or_y + or_pins[ 'y_out' ] )
+        y_last      = self.and_y[ -1 ] if n_and else 0.
+        y_first     = self.and_y[ 0 ] if n_and else 0.
+
+        x_col       = column_stack( ( self.not_x, self.in_x ) ).ravel()
+        y_col       = column_stack( ( full( n_in, y_not[ 1 ] ), full( n_in, self.in_y ) ) ).ravel()
+        x_in        = full( n_and, self.fuse_x[ 'in' ][ 0 ] if n_in else 0. )
+        x_out       = full( n_and, self.fuse_x[ 'out' ][ -1 ] if n_out else 0. )
+
+        self.wires  = {
+            'not':      column_stack( ( self.in_x, full( n_in, self.in_y + d ), self.not_x,
+                                        full( n_in, self.in_y + d ), self.not_x, full( n_in, y_not[ 0 ] ) ) ),
+            'col_in':   column_stack( ( x_col, y_col, self.fuse_x[ 'in' ], full( 2 * n_in, y_last ) ) ),
+            'row_in':   column_stack( ( x_in, self.and_y, full( n_and, x_and[ 0 ] ), self.and_y ) ),
+            'row_out':  column_stack( ( full( n_and, x_and[ 1 ] ), self.and_y, x_out, self.and_y ) ),
+            'col_out':  column_stack( ( self.or_x, full( n_out, y_first ), self.or_x,
+                                        full( n_out, y_or[ 0 ] ) ) ),
+            'out':      column_stack( ( self.or_x, full( n_out, y_or[ 1 ] ), self.out_x,
+                                        full( n_out, self.out_y ) ) ),
+        }
+        self.rescale( self.scale )
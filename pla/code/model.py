@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: model.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Modello logico del PLA, indipendente dall'interfaccia grafica.
+
+La classe PlaModel contiene tutto lo stato del simulatore come NumPy array: le due matrici di
+fusibili, nello stesso formato di Circuit, il vettore degli ingressi e le uscite delle porte AND e
+OR. Le operazioni del simulatore (caricamento di un circuito, collegamento o interruzione di tutti i
+fusibili, valutazione, cambio di un singolo fusibile o ingresso) modificano gli array e notificano
+il cambiamento agli osservatori registrati con I{subscribe}: la classe pla.Pla è uno di questi, e
+ridisegna solo la parte del circuito interessata dall'evento.
+
+Gli eventi notificati, con i loro argomenti, sono:
+    - 'fuse' (plane, r, c): cambio di un singolo fusibile
+    - 'fuses' (old_and, old_or): nuove matrici di fusibili, con le matrici precedenti
+    - 'fill' (status): tutti i fusibili collegati (True) o interrotti (False), ingressi azzerati
+    - 'load' (circ, old_and, old_or): caricamento di un circuito, con le matrici precedenti
+    - 'input' (k): cambio del valore di un ingresso
+    - 'run' (): nuove uscite delle porte AND e OR
+    - 'resize' (n_inputs, n_outputs, n_and): nuove dimensioni, con argomenti le precedenti
+
+Il modulo non richiede Tkinter, e può essere usato per simulazioni senza display.
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+"""
+
+from numpy      import asarray, empty, zeros, ones
+from engine     import MaskEngine
+
+
+def resized( a, shape, fill=None ):
+    """
+    Restituisce una copia di un array con nuove dimensioni, conservando la parte comune.
+
+    @param a: l'array originale
+    @param shape: le nuove dimensioni
+    @param fill: valore degli elementi aggiunti, se None l'array è di oggetti inizialmente vuoti
+    """
+    if fill is None:
+        b   = empty( shape, dtype=object )
+    else:
+        b   = ones( shape, dtype=a.dtype ) if fill else zeros( shape, dtype=a.dtype )
+    common  = tuple( slice( 0, min( m, n ) ) for m, n in zip( a.shape, shape ) )
+    b[ common ] = a[ common ]
+    return b
+
+
+def _flags( v, n ):
+    """
+    Converte un intero nella lista dei valori booleani dei suoi n bit meno significativi.
+
+    @param v: intero da convertire
+    @param n: numero di bit
+    """
+    b   = bin( v )[ 2 : ].zfill( n )[ : : -1 ]
+    return [ c == '1' for c in b[ : n ] ]
+
+
+
+class PlaModel( object ):
+    """
+    Stato logico di un PLA.
+
+    Dopo il caricamento di un circuito più piccolo del PLA, solo i primi ingressi, uscite e porte
+    AND sono attivi (vedi I{active}): gli ingressi non attivi valgono sempre 0, e le porte AND non
+    attive hanno uscita 0.
+
+    Il motore di valutazione (vedi I{engine}) viene conservato tra una valutazione e l'altra: il
+    cambio di un singolo fusibile ne aggiorna solo la riga o l'uscita interessata, mentre le
+    operazioni che cambiano molti fusibili lo invalidano, e viene ricostruito alla valutazione
+    successiva. La valutazione di un singolo vettore usa direttamente gli interi del motore a
+    maschere di bit, e per questo ingressi e uscite sono liste Python e non array NumPy.
+
+    @ivar n_inputs: numero di ingressi
+    @ivar n_outputs: numero di uscite
+    @ivar n_and: numero di porte AND
+    @ivar and_matrix: stato dei fusibili della matrice IN-AND, nel formato di Circuit
+    @ivar or_matrix: stato dei fusibili della matrice AND-OR, nel formato di Circuit
+    @ivar inputs: valori degli ingressi
+    @type inputs: lista di 0/1
+    @ivar ands: uscite delle porte AND all'ultima valutazione
+    @type ands: lista di bool
+    @ivar outs: uscite del PLA all'ultima valutazione
+    @type outs: lista di bool
+    @ivar active: numero di ingressi, uscite e porte AND attivi
+    @ivar circuit: l'ultimo circuito caricato, None dopo un reset
+    @type circuit: Circuit
+    @ivar listeners: gli osservatori registrati
+    """
+
+    def __init__( self, n_inputs, n_outputs, n_and ):
+        """
+        Inizializza il modello con tutti i fusibili collegati e gli ingressi a 0.
+
+        @param n_inputs: numero di ingressi
+        @param n_outputs: numero di uscite
+        @param n_and: numero di porte AND
+        """
+        self.n_inputs   = n_inputs
+        self.n_outputs  = n_outputs
+        self.n_and      = n_and
+        self.and_matrix = ones( ( n_and, 2 * n_inputs ), dtype=bool )
+        self.or_matrix  = ones( ( n_and, n_outputs ), dtype=bool )
+        self.inputs     = [ 0 ] * n_inputs
+        self.ands       = [ False ] * n_and
+        self.outs       = [ False ] * n_outputs
+        self.active     = ( n_inputs, n_outputs, n_and )
+        self.circuit    = None
+        self.listeners  = []
+        self._engine    = None
+
+
+# ------------------------------------------------------------------------------------------------------- #
+
+
+    def subscribe( self, f ):
+        """
+        Registra un osservatore dei cambiamenti del modello.
+
+        @param f: funzione chiamata con il nome dell'evento e i suoi argomenti
+        """
+        self.listeners.append( f )
+
+    def unsubscribe( self, f ):
+        """
+        Rimuove un osservatore registrato con I{subscribe}.
+
+        @param f: la funzione registrata
+        """
+        self.listeners.remove( f )
+
+    def notify( self, event, *args ):
+        """
+        Notifica un evento a tutti gli osservatori.
+
+        @param event: nome dell'evento
+        @param args: argomenti dell'evento
+        """
+        for f in list( self.listeners ):
+            f( event, *args )
+
+
+# ------------------------------------------------------------------------------------------------------- #
+
+
+    def fuse_matrices( self ):
+        """
+        Restituisce lo stato corrente dei fusibili nello stesso formato delle matrici di Circuit.
+
+        @return: coppia (and_matrix, or_matrix)
+        """
+        return self.and_matrix.astype( int ), self.or_matrix.astype( int )
+
+
+    def engine( self ):
+        """
+        Restituisce il motore di valutazione per lo stato corrente dei fusibili, creato alla prima
+        richiesta dopo ogni invalidazione.
+        Il modello valuta un vettore alla volta, pertanto viene usato il motore a maschere di bit,
+        costruito direttamente dalle matrici booleane del modello, senza copiarle.
+
+        @rtype: engine.MaskEngine
+        """
+        if self._engine is None:
+            self._engine    = MaskEngine( self.and_matrix, self.or_matrix )
+        return self._engine
+
+
+    def toggle( self, plane, r, c ):
+        """
+        Scambia lo stato di un fusibile.
+
+        @param plane: matrice del fusibile, 'in' per IN-AND oppure 'out' per AND-OR
+        @param r: riga del fusibile
+        @param c: colonna del fusibile
+        @return: il nuovo stato del fusibile
+        """
+        m           = self.and_matrix if plane == 'in' else self.or_matrix
+        m[ r, c ]   = not m[ r, c ]
+        if self._engine is not None:
+            self._engine.set_fuse( plane, r, c, m[ r, c ] )
+        self.notify( 'fuse', plane, r, c )
+        return m[ r, c ]
+
+
+    def set_fuses( self, and_matrix, or_matrix ):
+        """
+        Porta i fusibili nello stato indicato dalle matrici.
+
+        @param and_matrix: nuovo stato della matrice IN-AND
+        @param or_matrix: nuovo stato della matrice AND-OR
+        """
+        old             = ( self.and_matrix, self.or_matrix )
+        self.and_matrix = asarray( and_matrix ) != 0
+        self.or_matrix  = asarray( or_matrix ) != 0
+        self._engine    = None
+        self.notify( 'fuses', *old )
+
+
+    def fill( self, status ):
+        """
+        Riporta il modello allo stato iniziale, con i fusibili tutti nello stato indicato.
+
+        @param status: True per collegare tutti i fusibili, False per interromperli
+        """
+        self.and_matrix[ ... ]  = status
+        self.or_matrix[ ... ]   = status
+        self.inputs     = [ 0 ] * self.n_inputs
+        self.ands       = [ False ] * self.n_and
+        self.outs       = [ False ] * self.n_outputs
+        self.active     = ( self.n_inputs, self.n_outputs, self.n_and )
+        self.circuit    = None
+        self._engine    = None
+        self.notify( 'fill', bool( status ) )
+
+    def fuse_all( self ):
+        """
+        Riporta il modello allo stato iniziale, con i fusibili tutti non collegati.
+        """
+        self.fill( False )
+
+    def reset( self ):
+        """
+        Riporta il modello allo stato iniziale, con i fusibili tutti collegati.
+        """
+        self.fill( True )
+
+
+    def load( self, circ ):
+        """
+        Carica un circuito: i fusibili fuori dall'area del circuito vengono interrotti, e gli
+        ingressi, le uscite e le porte AND in eccesso disattivati.
+
+        @param circ: circuito da caricare
+        @type circ: Circuit
+        @return: False se il circuito è più grande del PLA
+        """
+        if circ.n_inputs > self.n_inputs:
+            print("non ci sono abbastanza input disponibili per caricare questo circuito")
+            return False
+
+        if circ.n_and > self.n_and:
+            print("non ci sono abbastanza porte AND disponibili per caricare questo circuito")
+            return False
+
+        if circ.n_outputs > self.n_outputs:
+            print("non ci sono abbastanza output disponibili per caricare questo circuito")
+            return False
+
+        old             = ( self.and_matrix, self.or_matrix )
+        self.and_matrix = zeros( old[ 0 ].shape, dtype=bool )
+        self.or_matrix  = zeros( old[ 1 ].shape, dtype=bool )
+        self.and_matrix[ : circ.n_and, : 2 * circ.n_inputs ]    = circ.and_matrix
+        self.or_matrix[ : circ.n_and, : circ.n_outputs ]        = circ.or_matrix
+        self.inputs     = [ 0 ] * self.n_inputs
+        self.ands       = [ False ] * self.n_and
+        self.outs       = [ False ] * self.n_outputs
+        self.active     = ( circ.n_inputs, circ.n_outputs, circ.n_and )
+        self.circuit    = circ
+        self._engine    = None
+        self.notify( 'load', circ, *old )
+        return True
+
+
+    def resize( self, n_inputs, n_outputs, n_and ):
+        """
+        Modifica le dimensioni del PLA. Lo stato dei fusibili comuni alle due dimensioni viene
+        conservato, quelli aggiunti sono collegati; ingressi e uscite vengono azzerati.
+
+        @param n_inputs: nuovo numero di ingressi
+        @param n_outputs: nuovo numero di uscite
+        @param n_and: nuovo numero di porte AND
+        """
+        old             = ( self.n_inputs, self.n_outputs, self.n_and )
+        self.n_inputs, self.n_outputs, self.n_and   = n_inputs, n_outputs, n_and
+        self.and_matrix = resized( self.and_matrix, ( n_and, 2 * n_inputs ), True )
+        self.or_matrix  = resized( self.or_matrix, ( n_and, n_outputs ), True )
+        self.inputs     = [ 0 ] * n_inputs
+        self.ands       = [ False ] * n_and
+        self.outs       = [ False ] * n_outputs
+        self.active     = ( n_inputs, n_outputs, n_and )
+        self.circuit    = None
+        self._engine    = None
+        self.notify( 'resize', *old )
+
+
+# ------------------------------------------------------------------------------------------------------- #
+
+
+    def set_input( self, k, v ):
+        """
+        Assegna il valore di un ingresso attivo.
+
+        @param k: indice dell'ingresso
+        @param v: nuovo valore, 0 oppure 1
+        """
+        v   = 1 if v else 0
+        if k >= self.active[ 0 ] or self.inputs[ k ] == v:
+            return
+        self.inputs[ k ]    = v
+        self.notify( 'input', k )
+
+    def toggle_input( self, k ):
+        """
+        Scambia il valore di un ingresso attivo.
+
+        @param k: indice dell'ingresso
+        """
+        self.set_input( k, not self.inputs[ k ] )
+
+
+    def run( self, e=None ):
+        """
+        Calcola le uscite delle porte AND e del PLA per i valori correnti degli ingressi.
+        Le porte AND non attive hanno uscita 0.
+
+        Con il motore conservato da I{engine} il vettore di ingresso è costruito come intero
+        direttamente dagli ingressi, e valutato con MaskEngine.step_ands e step_outs (vedi
+        MaskEngine.step) senza passare da NumPy; un motore indicato esplicitamente è invece
+        usato con l'interfaccia a blocchi ands/outs.
+
+        @param e: motore di valutazione da utilizzare, se None quello conservato da I{engine}
+        @type e: engine.Engine
+        @return: le uscite del PLA
+        """
+        if e is None:
+            e       = self.engine()
+            x       = 0
+            for k, v in enumerate( self.inputs ):
+                if v:
+                    x   |= 1 << k
+            a       = e.step_ands( x ) & ( ( 1 << self.active[ 2 ] ) - 1 )
+            self.ands   = _flags( a, self.n_and )
+            self.outs   = _flags( e.step_outs( a ), self.n_outputs )
+        else:
+            a       = asarray( e.ands( self.inputs ), dtype=bool ).copy()
+            a[ self.active[ 2 ] : ] = False
+            self.ands   = a.tolist()
+            self.outs   = asarray( e.outs( a ), dtype=bool ).tolist()
+        self.notify( 'run' )
+        return self.outs
@@ -0,0 +1,516 @@
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: parallel.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Valutazione parallela del PLA su grandi insiemi di vettori di ingresso.
+
+I vettori vengono impacchettati per bit: la riga k di un blocco impacchettato contiene il valore
+dell'ingresso k per 64 vettori in ogni parola uint64, e ogni porta AND o OR viene calcolata
+con operazioni bit a bit su intere righe. Le operazioni NumPy su array numerici rilasciano il GIL,
+quindi più thread possono valutare blocchi diversi in parallelo, condividendo le stesse matrici
+di connessione senza copie né serializzazione.
+
+Per la valutazione su più processi le matrici di connessione vengono pubblicate una sola volta in
+memoria condivisa (multiprocessing.shared_memory, oppure un file mappato in memoria dove questa non
+è disponibile), e ogni processo le collega senza copiarle.
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+
+@var chunk: numero di vettori per blocco, predefinito
+"""
+
+from multiprocessing        import cpu_count, Pool
+from multiprocessing.pool   import ThreadPool
+from numpy      import asarray, ascontiguousarray, zeros, arange, concatenate, packbits, unpackbits
+from numpy      import bitwise_and, bitwise_or, uint64, ndarray, memmap, dtype, prod
+from engine     import Engine, _csr, _block
+from tempfile   import mkstemp
+import atexit
+import os
+
+try:
+    from multiprocessing    import shared_memory
+except ImportError:
+    shared_memory   = None
+
+chunk           = 4096                  # multiplo di 64
+
+
+def pack( x ):
+    """
+    Impacchetta per bit un blocco di vettori.
+
+    @param x: blocco di vettori, di forma n_vettori x n
+    @return: array uint64 di forma n x ceil(n_vettori / 64)
+    """
+    x           = asarray( x ) != 0
+    t           = x.T
+    pad         = -t.shape[ 1 ] % 64
+    if pad:
+        t       = concatenate( ( t, zeros( ( t.shape[ 0 ], pad ), dtype=bool ) ), axis=1 )
+    return ascontiguousarray( packbits( t, axis=1, bitorder='little' ) ).view( '<u8' )
+
+
+def unpack( p, n ):
+    """
+    Operazione inversa di I{pack}.
+
+    @param p: array uint64 impacchettato, di forma righe x parole
+    @param n: numero di vettori
+    @return: blocco di vettori di forma n x righe
+    """
+    b           = unpackbits( ascontiguousarray( p, dtype='<u8' ).view( 'u1' ), axis=1,
+                    bitorder='little' )
+    return b[ :, : n ].T != 0
+
+
+def space( n_inputs, start, stop ):
+    """
+    Genera i vettori di ingresso di indice compreso tra I{start} e I{stop}, già impacchettati.
+    L'ordine dei vettori è quello di itertools.product: l'ingresso 0 è il bit più significativo.
+
+    @param n_inputs: numero di ingressi, al più 63
+    @param start: indice del primo vettore
+    @param stop: indice successivo all'ultimo vettore
+    """
+    i           = arange( start, stop, dtype=uint64 )
+    s           = ( n_inputs - 1 - arange( n_inputs, dtype=uint64 ) )[ :, None ]
+    return pack( ( ( i[ None, : ] >> s ) & uint64( 1 ) ).T )
+
+
+
+# ======================================================================================================= #
+
+
+
+class BitEngine( Engine ):
+    """
+    Motore di valutazione su vettori impacchettati per bit.
+
+    Le righe AND sono conservate in formato CSR come in engine.SparseEngine: per ogni blocco
+    si raccolgono le righe dei letterali collegati e le si riduce con un unico bitwise_and.reduceat,
+    quindi il lavoro di ogni blocco avviene in poche chiamate NumPy che non trattengono il GIL.
+
+    @ivar and_ptr: inizio della lista di letterali di ogni riga AND non vuota
+    @ivar and_cols: colonna della matrice IN-AND di ogni letterale
+    @ivar and_live: indici delle righe AND non vuote
+    @ivar or_ptr: inizio della lista di righe di ogni uscita non vuota
+    @ivar or_rows: riga AND di ogni collegamento delle uscite
+    @ivar or_live: indici delle uscite non vuote
+    """
+
+    def __init__( self, and_matrix, or_matrix ):
+        """
+        Istanzia il motore su vettori impacchettati.
+
+        @param and_matrix: matrice di connessione tra ingressi e porte AND
+        @param or_matrix: matrice di connessione tra porte AND e OR
+        """
+        Engine.__init__( self, and_matrix, or_matrix )
+        self.and_live   = self.and_matrix.any( axis=1 ).nonzero()[ 0 ]
+        ptr, self.and_cols  = _csr( self.and_matrix[ self.and_live ] )
+        self.and_ptr    = ptr[ : -1 ]
+        self.or_live    = self.or_matrix.any( axis=0 ).nonzero()[ 0 ]
+        ptr, self.or_rows   = _csr( self.or_matrix[ :, self.or_live ].T )
+        self.or_ptr     = ptr[ : -1 ]
+
+
+    def packed_ands( self, p ):
+        """
+        Calcola le uscite delle porte AND su vettori impacchettati.
+
+        @param p: ingressi impacchettati, di forma n_inputs x parole
+        @return: uscite impacchettate, di forma n_and x parole
+        """
+        lit     = zeros( ( 2 * self.n_inputs, p.shape[ 1 ] ), dtype=uint64 )
+        lit[ 0 : : 2 ] = ~p
+        lit[ 1 : : 2 ] = p
+        a       = zeros( ( self.n_and, p.shape[ 1 ] ), dtype=uint64 )
+        if len( self.and_live ):
+            a[ self.and_live ] = bitwise_and.reduceat( lit.take( self.and_cols, axis=0 ),
+                    self.and_ptr, axis=0 )
+        return a
+
+
+    def packed_outs( self, a ):
+        """
+        Calcola le uscite delle porte OR su uscite AND impacchettate.
+
+        @param a: uscite AND impacchettate, di forma n_and x parole
+        @return: uscite impacchettate, di forma n_outputs x parole
+        """
+        o       = zeros( ( self.n_outputs, a.shape[ 1 ] ), dtype=uint64 )
+        if len( self.or_live ):
+            o[ self.or_live ] = bitwise_or.reduceat( a.take( self.or_rows, axis=0 ),
+                    self.or_ptr, axis=0 )
+        return o
+
+
+    def ands( self, x ):
+        x       = asarray( x ) != 0
+        x2      = _block( x )
+        a       = unpack( self.packed_ands( pack( x2 ) ), len( x2 ) )
+        return a.reshape( x.shape[ : -1 ] + ( self.n_and, ) )
+
+
+    def outs( self, a ):
+        a       = asarray( a ) != 0
+        a2      = _block( a )
+        o       = unpack( self.packed_outs( pack( a2 ) ), len( a2 ) )
+        return o.reshape( a.shape[ : -1 ] + ( self.n_outputs, ) )
+
+
+    def run( self, x ):
+        x       = asarray( x ) != 0
+        x2      = _block( x )
+        o       = unpack( self.packed_outs( self.packed_ands( pack( x2 ) ) ), len( x2 ) )
+        return o.reshape( x.shape[ : -1 ] + ( self.n_outputs, ) )
+
+
+
+# ======================================================================================================= #
+
+
+
+class ThreadRunner( object ):
+    """
+    Valutazione a blocchi su un insieme di thread.
+
+    Tutti i thread condividono lo stesso BitEngine, e quindi la stessa memoria delle matrici di
+    connessione; ogni thread valuta blocchi di I{chunk} vettori.
+
+    @ivar engine: motore di valutazione condiviso
+    @type engine: BitEngine
+    @ivar workers: numero di thread
+    @ivar chunk: numero di vettori per blocco
+    """
+
+    def __init__( self, and_matrix, or_matrix, workers=None, chunk=chunk ):
+        """
+        Istanzia il gruppo di thread.
+
+        @param and_matrix: matrice di connessione tra ingressi e porte AND
+        @param or_matrix: matrice di connessione tra porte AND e OR
+        @param workers: numero di thread, se None pari al numero di processori
+        @param chunk: numero di vettori per blocco, arrotondato a un multiplo di 64
+        """
+        self.engine     = BitEngine( and_matrix, or_matrix )
+        self.workers    = workers or cpu_count()
+        self.chunk      = max( 64, chunk - chunk % 64 )
+        self.pool       = ThreadPool( self.workers )
+
+
+    def close( self ):
+        """
+        Termina i thread.
+        """
+        self.pool.close()
+        self.pool.join()
+
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc ):
+        self.close()
+
+
+    def _blocks( self, n ):
+        """
+        Suddivide n vettori in intervalli di I{chunk} vettori.
+        """
+        return [ ( i, min( i + self.chunk, n ) ) for i in range( 0, n, self.chunk ) ]
+
+
+    def run( self, x ):
+        """
+        Calcola le uscite del PLA per un blocco di vettori di ingresso.
+
+        @param x: blocco di vettori, di forma n_vettori x n_inputs
+        @return: blocco delle uscite, di forma n_vettori x n_outputs
+        """
+        x       = asarray( x ) != 0
+        e       = self.engine
+        f       = lambda b: e.packed_outs( e.packed_ands( pack( x[ b[ 0 ] : b[ 1 ] ] ) ) )
+        r       = self.pool.map( f, self._blocks( len( x ) ) )
+        o       = concatenate( r, axis=1 ) if r else zeros( ( e.n_outputs, 0 ), dtype=uint64 )
+        return unpack( o, len( x ) )
+
+
+    def truth_table( self, start=0, stop=None ):
+        """
+        Calcola le uscite del PLA per un intervallo dello spazio dei vettori di ingresso, nello
+        stesso ordine di itertools.product; i vettori sono generati direttamente impacchettati.
+
+        @param start: indice del primo vettore
+        @param stop: indice successivo all'ultimo vettore, se None 2^n_inputs
+        @return: uscite impacchettate, di forma n_outputs x parole
+        """
+        e       = self.engine
+        if stop is None:
+            stop = 1 << e.n_inputs
+        n       = stop - start
+        f       = lambda b: e.packed_outs( e.packed_ands( space( e.n_inputs, start + b[ 0 ],
+                    start + b[ 1 ] ) ) )
+        r       = self.pool.map( f, self._blocks( n ) )
+        return concatenate( r, axis=1 ) if r else zeros( ( e.n_outputs, 0 ), dtype=uint64 )
+
+
+
+# ======================================================================================================= #
+
+
+
+class SharedArrays( object ):
+    """
+    Insieme di array pubblicati in memoria condivisa.
+
+    Il processo che crea l'oggetto ne è il proprietario: copia gli array una sola volta nei
+    segmenti condivisi, e li rimuove con I{close}, all'uscita dal blocco I{with} o alla
+    terminazione dell'interprete. Se il proprietario termina in modo anomalo, i segmenti di
+    multiprocessing.shared_memory vengono rimossi dal resource tracker di multiprocessing;
+    i file temporanei usati in sua assenza restano invece nella directory temporanea.
+
+    Gli altri processi ricevono solo il I{descriptor}, una piccola struttura serializzabile, e
+    ottengono con I{attach} degli array NumPy che puntano agli stessi segmenti.
+
+    @ivar arrays: dizionario degli array condivisi, indicizzato per nome
+    @ivar descriptor: lista di tuple (nome, segmento, forma, dtype)
+    @ivar owner: True se l'oggetto ha creato i segmenti e li deve rimuovere
+    """
+
+    live        = set()                 # istanze proprietarie non ancora chiuse
+
+    def __init__( self, arrays=None, descriptor=None, kind=None ):
+        """
+        Pubblica un insieme di array, oppure si collega a un insieme già pubblicato.
+        Gli array vengono scritti direttamente nei segmenti, convertiti al tipo I{kind} durante la
+        copia: non viene creata alcuna copia intermedia, neppure per array non contigui.
+
+        @param arrays: dizionario degli array da pubblicare, indicizzato per nome
+        @param descriptor: descrittore di un insieme già pubblicato
+        @param kind: tipo degli elementi dei segmenti, se None quello di ciascun array
+        """
+        self.arrays     = {}
+        self.segments   = []
+        self.owner      = descriptor is None
+        if self.owner:
+            self.descriptor = []
+            for name in sorted( arrays ):
+                a       = asarray( arrays[ name ] )
+                seg, v  = self._create( a.shape, dtype( kind or a.dtype ) )
+                v[ ... ] = a
+                self.descriptor.append( ( name, self._name( seg ), a.shape, v.dtype.str ) )
+                self.arrays[ name ] = v
+            SharedArrays.live.add( self )
+        else:
+            self.descriptor = descriptor
+            for name, seg, shape, dt in descriptor:
+                self.arrays[ name ] = self._attach( seg, shape, dtype( dt ) )
+
+
+    @classmethod
+    def attach( cls, descriptor ):
+        """
+        Collega un insieme di array già pubblicato.
+
+        @param descriptor: descrittore restituito dal proprietario
+        @rtype: SharedArrays
+        """
+        return cls( descriptor=descriptor )
+
+
+    def _create( self, shape, dt ):
+        """
+        Crea un segmento per un array di forma e tipo indicati e ne restituisce una vista.
+        """
+        n       = max( 1, int( prod( shape ) ) * dt.itemsize )
+        if shared_memory is not None:
+            seg = shared_memory.SharedMemory( create=True, size=n )
+            self.segments.append( seg )
+            return seg, ndarray( shape, dtype=dt, buffer=seg.buf )
+        fd, path = mkstemp( prefix='pla_' )
+        os.close( fd )
+        self.segments.append( path )
+        return path, memmap( path, dtype=dt, mode='w+', shape=shape )
+
+
+    def _attach( self, seg, shape, dt ):
+        """
+        Collega un segmento esistente e ne restituisce una vista.
+        """
+        if shared_memory is not None:
+            try:
+                s   = shared_memory.SharedMemory( name=seg, track=False )
+            except TypeError:                   # Python < 3.13
+                s   = shared_memory.SharedMemory( name=seg )
+            self.segments.append( s )
+            return ndarray( shape, dtype=dt, buffer=s.buf )
+        return memmap( seg, dtype=dt, mode='r', shape=shape )
+
+
+    def _name( self, seg ):
+        """
+        Restituisce il nome con cui un segmento viene collegato dagli altri processi.
+        """
+        return seg.name if shared_memory is not None else seg
+
+
+    def __getitem__( self, name ):
+        return self.arrays[ name ]
+
+
+    def close( self ):
+        """
+        Rilascia i segmenti; il proprietario li rimuove anche dal sistema.
+        """
+        self.arrays     = {}
+        for seg in self.segments:
+            if isinstance( seg, str ):          # file mappato in memoria
+                if self.owner and os.path.exists( seg ):
+                    os.remove( seg )
+                continue
+            try:
+                seg.close()
+            except BufferError:                 # esistono ancora viste sul segmento
+                pass
+            if self.owner:
+                seg.unlink()
+        self.segments   = []
+        SharedArrays.live.discard( self )
+
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc ):
+        self.close()
+
+
+@atexit.register
+def _cleanup():
+    """
+    Rimuove i segmenti condivisi non ancora chiusi alla terminazione dell'interprete.
+    """
+    for s in list( SharedArrays.live ):
+        s.close()
+
+
+
+# ------------------------------------------------------------------------------------------------------- #
+
+
+_worker         = {}                    # stato di ciascun processo di lavoro
+
+
+def _init_worker( descriptor ):
+    """
+    Inizializza un processo di lavoro collegando le matrici di connessione condivise.
+
+    @param descriptor: descrittore delle matrici pubblicate dal processo principale
+    """
+    s   = SharedArrays.attach( descriptor )
+    _worker[ 'shared' ] = s
+    _worker[ 'engine' ] = BitEngine( s[ 'and_matrix' ], s[ 'or_matrix' ] )
+
+
+def _run_block( args ):
+    """
+    Valuta un blocco di vettori pubblicato in memoria condivisa.
+
+    @param args: tupla (descrittore del blocco, inizio, fine)
+    """
+    descriptor, i, j = args
+    e   = _worker[ 'engine' ]
+    s   = SharedArrays.attach( descriptor )
+    try:
+        return e.packed_outs( e.packed_ands( pack( s[ 'x' ][ i : j ] ) ) )
+    finally:
+        s.close()
+
+
+def _space_block( args ):
+    """
+    Valuta un intervallo dello spazio dei vettori di ingresso.
+
+    @param args: tupla (inizio, fine)
+    """
+    i, j    = args
+    e   = _worker[ 'engine' ]
+    return e.packed_outs( e.packed_ands( space( e.n_inputs, i, j ) ) )
+
+
+
+class ProcessRunner( ThreadRunner ):
+    """
+    Valutazione a blocchi su un insieme di processi.
+
+    Le matrici di connessione sono pubblicate una volta sola in memoria condivisa alla creazione
+    dell'oggetto; ogni processo le collega al suo avvio e costruisce il proprio BitEngine, le cui
+    strutture CSR sono proporzionali ai soli fusibili collegati. Anche i blocchi di vettori
+    passati a I{run} vengono pubblicati in memoria condivisa, e ai processi viene inviato solo
+    l'intervallo da valutare.
+
+    Il processo principale non costruisce alcun motore: le matrici vengono convertite in
+    booleani direttamente nei segmenti condivisi, e ne vengono conservate solo le dimensioni.
+
+    @ivar shared: matrici di connessione condivise
+    @type shared: SharedArrays
+    @ivar n_inputs: numero di ingressi
+    @ivar n_and: numero di porte AND
+    @ivar n_outputs: numero di uscite
+    """
+
+    def __init__( self, and_matrix, or_matrix, workers=None, chunk=chunk ):
+        """
+        Pubblica le matrici di connessione e avvia i processi.
+
+        @param and_matrix: matrice di connessione tra ingressi e porte AND
+        @param or_matrix: matrice di connessione tra porte AND e OR
+        @param workers: numero di processi, se None pari al numero di processori
+        @param chunk: numero di vettori per blocco, arrotondato a un multiplo di 64
+        """
+        and_matrix      = asarray( and_matrix )
+        or_matrix       = asarray( or_matrix )
+        self.n_and, c   = and_matrix.shape
+        self.n_inputs   = c // 2
+        self.n_outputs  = or_matrix.shape[ 1 ]
+        self.shared     = SharedArrays( { 'and_matrix': and_matrix, 'or_matrix': or_matrix },
+                                        kind=bool )
+        self.workers    = workers or cpu_count()
+        self.chunk      = max( 64, chunk - chunk % 64 )
+        try:
+            self.pool   = Pool( self.workers, _init_worker, ( self.shared.descriptor, ) )
+        except Exception:
+            self.shared.close()
+            raise
+
+
+    def close( self ):
+        """
+        Termina i processi e rimuove le matrici condivise.
+        """
+        ThreadRunner.close( self )
+        self.shared.close()
+
+
+    def run( self, x ):
+        x       = asarray( x )
+        with SharedArrays( { 'x': x }, kind=bool ) as s:
+            b   = [ ( s.descriptor, i, j ) for i, j in self._blocks( len( x ) ) ]
+            r   = self.pool.map( _run_block, b )
+        o       = concatenate( r, axis=1 ) if r else zeros( ( self.n_outputs, 0 ), dtype=uint64 )
+        return unpack( o, len( x ) )
+
+
+    def truth_table( self, start=0, stop=None ):
+        if stop is None:
+            stop = 1 << self.n_inputs
+        b       = [ ( start + i, start + j ) for i, j in self._blocks( stop - start ) ]
+        r       = self.pool.map( _space_block, b )
+        return concatenate( r, axis=1 ) if r else zeros( ( self.n_outputs, 0 ), dtype=uint64 )
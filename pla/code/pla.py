@@ -42,26 +42,66 @@
 
 """
 Il simulatore di Programmable Logic Array.
+
+Il modulo può essere importato senza effetti: la finestra del simulatore viene creata da I{main},
+eseguita solo quando il modulo è avviato come programma. Tkinter, NumPy e i moduli grafici sono
+importati da I{gui} alla creazione del primo oggetto Pla, così che l'importazione del modulo
+richieda pochi millisecondi (si può verificare con C{python -X importtime -c "import pla"}).
+Con l'opzione -d viene riportata la durata delle fasi di avvio, e vengono attivati i contatori di
+chiamate e tempi del modulo profiling, stampati al termine del programma; gli stessi contatori si
+possono attivare definendo la variabile d'ambiente PLA_PROFILE. Definendo PLA_TKTRACE vengono
+invece contate le chiamate al canvas, per metodo e per componente (vedi tktrace).
+
+Con l'opzione -b il simulatore funziona senza interfaccia grafica (vedi I{batch}): un circuito
+della libreria, o letto da una mappa di fusibili, viene valutato con il motore impacchettato per bit
+di parallel.ThreadRunner, per stampare la tabella di verità, valutare un file di vettori,
+verificarne le uscite rispetto a un riferimento o riportare statistiche sull'uso dei fusibili.
+
 @authors: Alice Plebe, Matteo Cavallaro
 @version: 3.0
-
-@var sim: istanza base di Tkinter
-@var pla: istanza della classe Pla, che contiene il simulatore corrente
 """
 
-from optparse   import OptionParser
-from sys import version_info
-if version_info[0]==2:
-    from Tkinter    import Tk, Frame, Canvas, IntVar
-    from Tkinter    import Button, Menubutton, Menu
-    from Tkinter    import RIGHT, LEFT, RAISED, NORMAL, HIDDEN
-elif version_info[0]==3:
-    from tkinter    import Tk, Frame, Canvas, IntVar
-    from tkinter    import Button, Menubutton, Menu
-    from tkinter    import RIGHT, LEFT, RAISED, NORMAL, HIDDEN
-from numpy      import array, empty, zeros
-from component  import And, Or, Not, Fuse, Wire, InPin, OutPin
-import circuits
+from itertools  import chain
+from time       import time
+from sys import version_info, stdout, exit
+import profiling
+import tktrace
+
+
+def gui():
+    """
+    Importa Tkinter, NumPy, la libreria di circuiti e i moduli grafici del simulatore, rendendoli
+    disponibili alla classe Pla come nomi globali del modulo. Le chiamate successive alla prima
+    non hanno effetto.
+
+    @return: durata dell'importazione [s]
+    """
+    global Tk, Toplevel, TclError, Frame, Canvas, IntVar, Button, Menubutton, Menu, Scrollbar
+    global RIGHT, LEFT, RAISED, NORMAL, HIDDEN, HORIZONTAL, VERTICAL, askstring
+    global empty, nonzero, count_nonzero, flatnonzero
+    global Port, And, Or, Not, Fuse, Wire, InPin, OutPin, PlaModel, resized, Viewport, Layout, circuits
+    if 'circuits' in globals():
+        return 0.
+    t   = time()
+    if version_info[0]==2:
+        from Tkinter    import Tk, Toplevel, TclError, Frame, Canvas, IntVar
+        from Tkinter    import Button, Menubutton, Menu, Scrollbar
+        from Tkinter    import RIGHT, LEFT, RAISED, NORMAL, HIDDEN, HORIZONTAL, VERTICAL
+        from tkSimpleDialog import askstring
+    elif version_info[0]==3:
+        from tkinter    import Tk, Toplevel, TclError, Frame, Canvas, IntVar
+        from tkinter    import Button, Menubutton, Menu, Scrollbar
+        from tkinter    import RIGHT, LEFT, RAISED, NORMAL, HIDDEN, HORIZONTAL, VERTICAL
+        from tkinter.simpledialog import askstring
+    from numpy      import empty, nonzero, count_nonzero, flatnonzero
+    from component  import Port, And, Or, Not, Fuse, Wire, InPin, OutPin
+    from model      import PlaModel, resized
+    from viewport   import Viewport
+    from layout     import Layout
+    import circuits
+    return time() - t
+
+
 
 class Pla( object ):
     """
@@ -78,6 +118,34 @@ class Pla( object ):
           due dimensioni
     Tutti i tre sistemi di riferimento hanno origine nell'angolo superiore sinistro.
 
+    Gli oggetti grafici sono raggruppati con tag Tkinter comuni (vedi I{row_tag}, I{col_tag} e
+    I{plane_tag}): per riga di porte AND, per colonna di ingresso (porta NOT, pin e le due colonne
+    di fusibili corrispondenti), per colonna di uscita (porta OR, pin e colonna di fusibili), e per
+    matrice di fusibili. Le operazioni su un intero gruppo richiedono così una sola chiamata al canvas.
+
+    Lo stato logico del circuito è conservato in un oggetto model.PlaModel (vedi I{model}), che
+    non dipende da Tkinter: la classe Pla ne è una vista, registrata come osservatore dei suoi
+    cambiamenti, e ridisegna ad ogni evento soltanto i componenti interessati (vedi I{_changed}).
+
+    Per PLA molto grandi (vedi I{virtual}) i fusibili non sono creati tutti: lo stato resta nelle
+    matrici del modello, e un oggetto viewport.Viewport disegna solo quelli visibili.
+    Il canvas diventa allora scorrevole e ingrandibile: rotella del mouse e barre di scorrimento per
+    spostare la vista, tasto centrale per trascinarla, Ctrl+rotella e i tasti "+" e "-" per lo zoom.
+    Con la vista rimpicciolita le matrici di fusibili sono disegnate come immagini.
+
+    Con I{place_progressive} i componenti vengono disegnati a blocchi, tra un evento e l'altro, così
+    che la finestra e i menu siano subito utilizzabili. Le operazioni richieste durante la costruzione
+    (caricamento di un circuito, RUN, FUSE, UNFUSE) vengono eseguite al suo termine.
+
+    Le dimensioni del PLA possono essere cambiate senza riavviare il programma, dal menu Resize
+    (vedi I{resize}): i componenti esistenti vengono spostati nel nuovo layout, e solo quelli
+    aggiunti o eliminati vengono creati o cancellati.
+
+    In modalità di valutazione continua (vedi I{live}) le uscite non attendono RUN: ogni cambiamento
+    di ingressi o fusibili programma una valutazione con after_idle, e i cambiamenti ravvicinati,
+    come una serie di clic o il caricamento di un circuito, sono raccolti in una sola valutazione
+    e un solo aggiornamento del canvas (vedi I{_schedule_run}).
+
     @cvar debug: livello di debug, dev'essere = 0 in produzione
     @cvar x_size: dimensione in pixel della lunghezza della finestra del simulatore
     @cvar n_inputs: numero di ingressi del circuito, corrispondente al numero di porte NOT
@@ -97,6 +165,20 @@ class Pla( object ):
     @cvar grid_cols: numero di colonne virtuali nella Tkinter.grid
     @cvar grid_but_extra: spazio aggiuntivo per il posizionamento del pulsante di run
     @type grid_but_extra: range [1.0-2.0]
+    @cvar y_max: altezza massima in pixel dell'area visibile del canvas in modalità virtuale
+    @cvar size_delta: passo di griglia a cui si riferiscono le dimensioni dei componenti
+    @type size_delta: dimensione normalizzata 0..1
+    @cvar virtual: se True i fusibili sono disegnati solo nella zona visibile, se None la modalità
+    viene scelta in base a I{virtual_limit}
+    @cvar virtual_limit: numero di fusibili oltre il quale viene usata la modalità virtuale
+    @cvar zoom_min: ingrandimento minimo della vista
+    @cvar zoom_max: ingrandimento massimo della vista
+    @cvar zoom_step: fattore di ingrandimento di un singolo passo di zoom
+    @cvar chunk_time: durata massima di un blocco della costruzione progressiva [s]
+    @cvar chunk_rows: numero di righe disegnate ad ogni passo della costruzione
+    @cvar sizes: dimensioni (input, output, AND) proposte nel menu Resize
+    @cvar live: se True le uscite vengono ricalcolate a ogni cambiamento di ingressi o fusibili
+    @cvar live_events: eventi del modello che richiedono una nuova valutazione in modalità continua
 
     @ivar g_inputs: lista dei componenti grafici della classe Component.InPin istanziati
     @ivar g_outputs: lista dei componenti grafici della classe Component.OutPin istanziati
@@ -105,16 +187,31 @@ class Pla( object ):
     @ivar g_or: lista dei componenti grafici della classe Component.Port.Or istanziati
     @ivar g_fuse_in: lista dei componenti grafici della classe Component.Fuse istanziati
     @ivar g_fuse_out: lista dei componenti grafici della classe Component.Fuse istanziati
-    @ivar inputs: lista di variabili di classe IntVar usate per gli input
+    @ivar model: lo stato logico del circuito
+    @type model: model.PlaModel
+    @ivar inputs: lista di variabili di classe IntVar usate per gli input, copia dei valori del modello
     @ivar n_or: numero di porte OR
     @ivar n_not: numero di porte NOT
     @ivar grid_delta: passo di griglia del layout del circuito
     @ivar a_ratio: aspect ratio della finestra del simulatore
+    @ivar layout: coordinate di tutti i componenti
+    @type layout: layout.Layout
+    @ivar background: colore di sfondo del canvas
+    @ivar unit: fattore di scala delle dimensioni dei componenti, minore di 1 con griglie fitte
+    @ivar zoom: ingrandimento corrente della vista
+    @ivar view: la vista parziale dei fusibili, None se tutti i fusibili sono creati
+    @ivar shapes: sagome delle porte logiche per il layout corrente, vedi Component.Port.shape
+    @type view: viewport.Viewport
+    @ivar building: i passi restanti della costruzione progressiva, None se la costruzione è completa
+    @ivar pending: lista delle operazioni rinviate al termine della costruzione
+    @ivar live_var: variabile del menu associata a I{live}
+    @ivar live_job: valutazione programmata in modalità continua, None se non ce n'è
     """
 
     debug           = 0                     # livello di debug
 
-    usage           = """%prog [-x x_size][-i n_inputs][-o n_outputs][-a n_and]""";
+    usage           = """%prog [-x x_size][-i n_inputs][-o n_outputs][-a n_and][-v][-c][-l][-d]
+       %prog -b circuit|fuse_map [-t][-e vectors][-r reference][-s][-m]""";
 
 
 # ------------------------------------------------------------------------------------------------------- #
@@ -135,6 +232,19 @@ class Pla( object ):
     lower_block     = 5                     # minima spaziatura verticale tra outputs e bordo inferiore
     grid_cols       = 10                    # numero di colonne virtuali nella Tkinter.grid
     grid_but_extra  = 1.8                   # spazio aggiuntivo per il posizionamento del pulsante di run
+    y_max           = 960                   # altezza massima dell'area visibile in modalità virtuale [pixel]
+    size_delta      = 0.04                  # passo di griglia delle dimensioni dei componenti
+
+    virtual         = None                  # disegno dei soli fusibili visibili, None se automatico
+    virtual_limit   = 40000                 # numero di fusibili oltre il quale la modalità è virtuale
+    zoom_min        = 1.0                   # ingrandimento minimo
+    zoom_max        = 16.0                  # ingrandimento massimo
+    zoom_step       = 1.25                  # fattore di un passo di zoom
+    chunk_time      = 0.04                  # durata massima di un blocco di costruzione [s]
+    chunk_rows      = 8                     # righe disegnate ad ogni passo della costruzione
+    sizes           = ( ( 6, 8, 16 ), ( 16, 8, 64 ) )   # dimensioni proposte nel menu Resize
+    live            = False                 # valutazione continua, senza RUN
+    live_events     = ( 'fuse', 'fuses', 'fill', 'load', 'input', 'resize' )
 
 
 
@@ -151,12 +261,21 @@ class Pla( object ):
     g_fuse_in       = None
     g_fuse_out      = None
 
+    model           = None                  # stato logico del circuito
     inputs          = []                    # lista di variabili di classe IntVar usate per gli input
 
     n_or            = 0                     # numero di porte OR
     n_not           = 0                     # numero di porte NOT
     grid_delta      = 0                     # passo di griglia del layout del circuito
     a_ratio         = 0                     # aspect ratio della finestra del simulatore
+    layout          = None                  # coordinate di tutti i componenti
+    unit            = 1.0                   # fattore di scala delle dimensioni dei componenti
+    zoom            = 1.0                   # ingrandimento corrente della vista
+    live_job        = None                  # valutazione programmata in modalità continua
+    view            = None                  # vista parziale dei fusibili
+    shapes          = None                  # sagome delle porte per il layout corrente
+    building        = None                  # passi restanti della costruzione progressiva
+    pending         = []                    # operazioni rinviate al termine della costruzione
 
 
 # ======================================================================================================= #
@@ -168,35 +287,26 @@ class Pla( object ):
         Viene anzitutto definita l'unità di griglia, che può essere la spaziatura minima dei componenti
         in senso orizzontale oppure verticale, in funzione della I{aspec ratio} e del numero di componenti.
 
-        Vengono successivamente stabilite le coordinate fisse dei vari componenti.
+        Le coordinate di tutti i componenti sono calcolate da un oggetto layout.Layout; qui vengono
+        stabilite le coordinate fisse dei vari componenti.
         """
         self.n_not          = self.n_inputs
         self.n_or           = self.n_outputs
 
-        l                   = 2 * self.n_inputs + self.n_outputs + self.l_and
-        h                   = self.upper_block + ( self.n_and - 1 ) + self.lower_block + self.l_or
+        L                   = Layout( self )
+        self.layout         = L
+        self.a_ratio        = L.a_ratio
+        self.size           = L.size
 
-        self.a_ratio        = float( l ) / float( h )
-        self.size           = ( self.x_size, self.x_size / self.a_ratio )
-
-        d                   = 1.0 / h
+        d                   = L.d
         self.grid_delta     = d
+        self.unit           = min( 1.0, d / self.size_delta )
+        self.shapes         = {}
+        L.set_pins( Not.shape( self )[ 1 ], And.shape( self )[ 1 ], Or.shape( self )[ 1 ] )
 
-        
-        self.not_start      = d
-        Not.y_not           = d * self.upper_block
-
-        self.inputs_start   = d
-        InPin.y_in          = 2 * d
-
-        self.or_start       = d * ( 2 * self.n_inputs + self.l_and )
-        Or.y_or             = d * ( self.upper_block + self.n_and + self.l_or + 0.5 )
-
-        self.outputs_start  = d * ( 2 * self.n_inputs + self.l_and )
-        OutPin.y_in         = d * ( self.upper_block + self.n_and + self.l_or + 1.5 )
-
-        self.and_start      = d * ( self.upper_block + 1 )
-        And.x_and           = d * ( 2 * self.n_inputs + self.l_and / 2 )
+        self.not_start      = L.fuse_x[ 'in' ][ 0 ] if self.n_not else 0.
+        self.or_start       = L.or_x[ 0 ] if self.n_or else 0.
+        self.and_start      = L.and_y[ 0 ] if self.n_and else 0.
 
 
 
@@ -222,31 +332,58 @@ class Pla( object ):
         self.g_inputs   = empty( self.n_inputs, dtype=object )
         self.g_outputs  = empty( self.n_outputs, dtype=object )
 
-        c               = 2 * self.n_not
-        r               = self.n_and
-        self.g_fuse_in  = empty( ( r, c ), dtype=object )
-
-        c               = self.n_or
-        r               = self.n_and
-        self.g_fuse_out = empty( ( r, c ), dtype=object )
+        if self.view is None:
+            self.g_fuse_in  = empty( ( self.n_and, 2 * self.n_not ), dtype=object )
+            self.g_fuse_out = empty( ( self.n_and, self.n_or ), dtype=object )
 
 
     
-    def __init__( self, root ):
+    def __init__( self, root, n_inputs=None, n_outputs=None, n_and=None, x_size=None ):
         """
-        Inizializza il Programmable Logic Array
+        Inizializza il Programmable Logic Array, importando se necessario i moduli grafici (vedi gui).
+        Con il debug attivo, o la variabile d'ambiente PLA_PROFILE, viene attivata la strumentazione
+        del modulo profiling; con la variabile d'ambiente PLA_TKTRACE il canvas viene tracciato dal
+        modulo tktrace.
+
+        Le dimensioni non specificate sono quelle degli attributi di classe: istanze diverse, ad
+        esempio in finestre Toplevel distinte, possono così avere dimensioni diverse.
 
         @param root: la Tk root widget
         @type root: Tkinter object
-        """
+        @param n_inputs: numero di ingressi
+        @param n_outputs: numero di uscite
+        @param n_and: numero di porte AND
+        @param x_size: dimensione in pixel della lunghezza della finestra
+        """
+        gui()
+        if self.debug or profiling.requested():
+            profiling.enable( Pla )
+        for k, v in ( ( 'n_inputs', n_inputs ), ( 'n_outputs', n_outputs ),
+                      ( 'n_and', n_and ), ( 'x_size', x_size ) ):
+            setattr( self, k, getattr( self, k ) if v is None else v )
+        self.counts     = {}
+        self.model      = PlaModel( self.n_inputs, self.n_outputs, self.n_and )
+        self.model.subscribe( self._changed )
         self._layout()
 
         root.title( self.title )
         self.root       = root
 
+        virtual         = self.virtual
+        if virtual is None:
+            virtual     = self.n_and * ( 2 * self.n_not + self.n_or ) > self.virtual_limit
+
         w, h            = self.size
+        if virtual:
+            h           = min( h, self.y_max )
         self.canvas     = Canvas( root, height=h, width=w )
+        if tktrace.requested():
+            tktrace.trace( self )
         self.canvas.grid( row=0, column=0, rowspan=3, columnspan=self.grid_cols )
+        self.background = self.canvas.cget( 'background' )
+        if virtual:
+            self.view   = Viewport( self )
+            self._scroll_init()
 
         # menubar
         self.menubar	= Menu( root )
@@ -255,22 +392,28 @@ class Pla( object ):
         self.menubar.add_cascade( label="Simulation", menu=menu_b )
         menu_b.add_command( label="Fuse all", command=self.fuse_all, accelerator="F" )
         menu_b.add_command( label="Unfuse all", command=self.reset, accelerator="U" )
+        self.live_var   = IntVar( root, value=int( self.live ) )
+        menu_b.add_checkbutton( label="Live evaluation", variable=self.live_var,
+                command=lambda: self.set_live( self.live_var.get() ), accelerator="L" )
         menu_b.add_command( label="Quit", command=self.root.quit, accelerator="Q" )
         menu_b		= Menu( self.menubar, tearoff=0 )
         self.menubar.add_cascade( label="Library", menu=menu_b )
         for c in circuits.circs:
             self._m_init( menu_b, c )
+        menu_b		= Menu( self.menubar, tearoff=0 )
+        self.menubar.add_cascade( label="Resize", menu=menu_b )
+        for n_i, n_o, n_a in self.sizes:
+            menu_b.add_command( label="%d inputs, %d outputs, %d AND" % ( n_i, n_o, n_a ),
+                    command=lambda s=( n_i, n_o, n_a ) : self.resize( *s ) )
+        menu_b.add_command( label="Other...", command=self._ask_size )
         try:
             self.root.config( menu=self.menubar )
         except AttributeError:
             self.root.tk.call( root, "config", "-menu", self.menubar )
 
         # pulsanti
-        n_i2            = 2 * self.n_inputs
-        n_tot           = int( ( n_i2 + self.n_outputs ) * self.grid_but_extra )
-        col             = self.grid_cols * int(n_i2 / n_tot)
         self.b_run      = Button( root, text='RUN', width=10, command=self.run )
-        self.b_run.grid( row=2, column=col )
+        self._grid_buttons()
 
         self.inputs     = [ IntVar( root ) for i in range( self.n_inputs ) ]
 
@@ -284,11 +427,24 @@ class Pla( object ):
         self.root.bind( "<KeyPress-U>", self._event_u )
         self.root.bind( "<KeyPress-r>", self._event_r )
         self.root.bind( "<KeyPress-R>", self._event_r )
+        self.root.bind( "<KeyPress-l>", self._event_l )
+        self.root.bind( "<KeyPress-L>", self._event_l )
 
         
 
 
 
+    def _grid_buttons( self ):
+        """
+        Posiziona i pulsanti nella griglia della finestra, in funzione del numero di input e output.
+        """
+        n_i2            = 2 * self.n_inputs
+        n_tot           = int( ( n_i2 + self.n_outputs ) * self.grid_but_extra )
+        col             = self.grid_cols * int(n_i2 / n_tot)
+        self.b_run.grid( row=2, column=col )
+
+
+
     def nor_to_abs( self, n ):
         """
         Converte coordinate normalizzate in dimensioni assolute.
@@ -298,7 +454,79 @@ class Pla( object ):
         @type n: dimensione normalizzata 0..1
         @return: coordinata in dimensioni assolute [pixel]
         """
-        return int( self.size[ 1 ] * n )
+        return int( self.size[ 1 ] * self.zoom * n )
+
+
+# ------------------------------------------------------------------------------------------------------- #
+
+
+    def row_tag( self, r ):
+        """
+        Restituisce il tag del gruppo di oggetti grafici di una riga: porta AND, fusibili e linee
+        di collegamento.
+
+        @param r: indice della riga
+        """
+        return 'row_%d' % r
+
+    def col_tag( self, plane, c ):
+        """
+        Restituisce il tag del gruppo di oggetti grafici di una colonna.
+
+        @param plane: 'in' per le colonne di ingresso, 'out' per quelle di uscita
+        @param c: indice dell'ingresso o dell'uscita
+        """
+        return 'col_%s_%d' % ( plane, c )
+
+    def fuse_tags( self, plane, r, c ):
+        """
+        Restituisce i tag dei gruppi a cui appartiene un fusibile.
+
+        @param plane: matrice del fusibile, 'in' oppure 'out'
+        @param r: riga del fusibile
+        @param c: colonna del fusibile
+        """
+        col     = c // 2 if plane == 'in' else c
+        return ( self.row_tag( r ), self.col_tag( plane, col ), self.plane_tag( plane ) )
+
+    def plane_tag( self, plane ):
+        """
+        Restituisce il tag del gruppo di oggetti grafici di una matrice di fusibili.
+
+        @param plane: 'in' per la matrice IN-AND, 'out' per la matrice AND-OR
+        """
+        return 'plane_' + plane
+
+
+
+    def hide_values( self ):
+        """
+        Nasconde i valori visualizzati da tutte le porte AND e da tutti i pin di output.
+        """
+        self.canvas.itemconfigure( And.text_tag, text='0', state=HIDDEN )
+        self.canvas.itemconfigure( OutPin.text_tag, text='0', state=HIDDEN )
+        for g in chain( self.g_and, self.g_outputs ):
+            g.shown = None
+
+
+    def disable_rows( self, start, stop ):
+        """
+        Disattiva le porte AND delle righe da I{start} a I{stop} escluso.
+
+        @param start: indice della prima riga
+        @param stop: indice successivo all'ultima riga
+        """
+        And.reset_all( self, self.g_and[ start : stop ], locked=True )
+
+
+    def highlight( self, tag, color=None ):
+        """
+        Evidenzia le linee di collegamento di un gruppo di oggetti grafici.
+
+        @param tag: tag del gruppo, vedi I{row_tag}, I{col_tag} e I{plane_tag}
+        @param color: colore delle linee, se None viene ripristinato il colore normale
+        """
+        self.canvas.itemconfigure( '(%s)&&%s' % ( tag, Wire.tag ), fill=color or Wire.color )
 
 
 # ======================================================================================================= #
@@ -311,18 +539,18 @@ class Pla( object ):
         @param y: coordinata verticale del centro della porta
         @type y: dimensione normalizzata 0..1
         """
-        self.g_and[ And.count - 1 ] = And( self, y )
+        i   = self.counts.get( And.name, 0 )
+        self.g_and[ i ] = And( self, y, ( self.row_tag( i ), ), n=i )
 
-    def place_and( self ):
+    def place_and( self, rows=None ):
         """
         Crea tutte le porte AND nelle posizioni stabilite dal layout.
-        """
-        y   = self.and_start
-        dy  = self.grid_delta
 
-        for i in range( self.n_and ):
+        @param rows: intervallo (primo, ultimo + 1) delle righe da creare, None per tutte
+        """
+        start, stop = rows or ( 0, self.n_and )
+        for y in self.layout.and_y[ start : stop ]:
             self.add_and( y )
-            y += dy
 
 
 
@@ -333,18 +561,18 @@ class Pla( object ):
         @param x: coordinata orizzontale del centro della porta
         @type x: dimensione normalizzata 0..1
         """
-        self.g_or[ Or.count - 1 ] = Or( self, x )
+        i   = self.counts.get( Or.name, 0 )
+        self.g_or[ i ] = Or( self, x, ( self.col_tag( 'out', i ), ), n=i )
 
-    def place_or( self ):
+    def place_or( self, cols=None ):
         """
         Crea tutte le porte OR nelle posizioni stabilite dal layout.
-        """
-        x   = self.or_start
-        dx  = self.grid_delta
 
-        for i in range( self.n_or ):
+        @param cols: intervallo (primo, ultimo + 1) delle porte da creare, None per tutte
+        """
+        start, stop = cols or ( 0, self.n_or )
+        for x in self.layout.or_x[ start : stop ]:
             self.add_or( x )
-            x += dx
 
 
 
@@ -355,52 +583,46 @@ class Pla( object ):
         @param x: coordinata orizzontale del centro della porta
         @type x: dimensione normalizzata 0..1
         """
-        self.g_not[ Not.count - 1 ] = Not( self, x )
+        i   = self.counts.get( Not.name, 0 )
+        self.g_not[ i ] = Not( self, x, ( self.col_tag( 'in', i ), ), n=i )
 
-    def place_not( self ):
+    def place_not( self, cols=None ):
         """
         Crea tutte le porte NOT nelle posizioni stabilite dal layout.
-        """
-        x   = self.not_start
-        dx  = 2 * self.grid_delta
 
-        for i in range( self.n_not ):
+        @param cols: intervallo (primo, ultimo + 1) delle porte da creare, None per tutte
+        """
+        start, stop = cols or ( 0, self.n_not )
+        for x in self.layout.not_x[ start : stop ]:
             self.add_not( x )
-            x += dx
 
 
 # ------------------------------------------------------------------------------------------------------- #
 
 
-    def place_inputs( self ):
+    def place_inputs( self, cols=None ):
         """
         Crea tutti i pin di input e conserva gli oggetti grafici negli array.
-        Genera inoltre i relativi collegamenti con le porte NOT.
-        """
-        x   = self.inputs_start
-        dx  = 2 * self.grid_delta
+        I collegamenti con le porte NOT sono disegnati da I{place_wire_in}.
 
-        x += dx / 2
-        for i in range( self.n_inputs ):
-            inpin		= InPin( self, x, self.inputs[ i ] )
-            inpin.wire_not( self, self.g_not[ i ] )
-            self.g_inputs[ i ]  = inpin
-            x += dx
+        @param cols: intervallo (primo, ultimo + 1) dei pin da creare, None per tutti
+        """
+        start, stop = cols or ( 0, self.n_inputs )
+        for i in range( start, stop ):
+            self.g_inputs[ i ]  = InPin( self, self.layout.in_x[ i ], self.inputs[ i ],
+                    ( self.col_tag( 'in', i ), ), lambda k=i : self.model.toggle_input( k ) )
 
 
-    def place_outputs( self ):
+    def place_outputs( self, cols=None ):
         """
         Crea tutti i pin di output e conserva gli oggetti grafici negli array.
-        Genera inoltre i relativi collegamenti con le porte OR.
-        """
-        x   = self.outputs_start
-        dx  = self.grid_delta
+        I collegamenti con le porte OR sono disegnati da I{place_wire_out}.
 
-        for i in range( self.n_outputs ):
-            outpin              = OutPin( self, x )
-            self.g_outputs[ i ] = outpin
-            Wire( self, self.g_or[ i ], outpin )
-            x += dx
+        @param cols: intervallo (primo, ultimo + 1) dei pin da creare, None per tutti
+        """
+        start, stop = cols or ( 0, self.n_outputs )
+        for i in range( start, stop ):
+            self.g_outputs[ i ] = OutPin( self, self.layout.out_x[ i ], ( self.col_tag( 'out', i ), ) )
 
 
 # ------------------------------------------------------------------------------------------------------- #
@@ -408,151 +630,133 @@ class Pla( object ):
 
     def place_wire_in( self ):
         """
-        Realizza i collegamenti tra i fusibili nella matrice di collegamenti tra input e porte AND.
+        Realizza i collegamenti tra i fusibili nella matrice di collegamenti tra input e porte AND,
+        e quelli tra i pin di input e le porte NOT.
+
+        Ogni riga di fusibili è collegata alla sua porta AND da un'unica linea, posta sotto a tutti
+        gli altri componenti: i fusibili interrotti ne mascherano il tratto che li attraversa.
+        I vertici di tutti i collegamenti sono quelli calcolati dal layout.
         """
-        for r in range( self.n_and ):
-            for c in range( 2 * self.n_not - 1 ):
-                Wire( self, self.g_fuse_in[ r, c ], self.g_fuse_in[ r, c + 1 ] )
-            Wire( self, self.g_fuse_in[ r, 2 * self.n_not - 1 ], self.g_and[ r ] )
+        px  = self.layout.px
+        for c, coords in enumerate( px[ 'wire_not' ].tolist() ):
+            Wire.line( self, coords, self.g_inputs[ c ].tags )
+
+        for r, coords in enumerate( px[ 'wire_row_in' ].tolist() ):
+            Wire.line( self, coords, tags=( 'wire_row', self.row_tag( r ), self.plane_tag( 'in' ) ) )
 
-        for c in range( self.n_not ):
-            Wire( self, self.g_not[ c ], self.g_fuse_in[ self.n_and - 1, 2 * c ],
-                    placement=( 'pin', 'center' ) )
+        for col, coords in enumerate( px[ 'wire_col_in' ].tolist() ):
+            Wire.line( self, coords, tags=( self.col_tag( 'in', col // 2 ), self.plane_tag( 'in' ) ) )
 
-        for c in range( self.n_inputs ):
-            Wire( self, self.g_inputs[ c ], self.g_fuse_in[ self.n_and - 1, 2 * c + 1 ],
-                    placement=( 'pin', 'center' ) )
+        self.canvas.tag_lower( 'wire_row' )
 
 
     def place_wire_out( self ):
         """
-        Realizza i collegamenti tra i fusibili nella matrice di collegamenti tra porte AND e OR.
+        Realizza i collegamenti tra i fusibili nella matrice di collegamenti tra porte AND e OR,
+        e quelli tra le porte OR e i pin di output.
+
+        Come per la matrice IN-AND, ogni riga è un'unica linea dalla porta AND all'ultimo fusibile.
         """
-        for r in range( self.n_and ):
-            Wire( self, self.g_and[ r ], self.g_fuse_out[ r, 0 ] )
-            for c in range( self.n_or - 1 ):
-                Wire( self, self.g_fuse_out[ r, c ], self.g_fuse_out[ r, c + 1 ] )
+        px  = self.layout.px
+        for c, coords in enumerate( px[ 'wire_out' ].tolist() ):
+            Wire.line( self, coords, tags=( self.col_tag( 'out', c ), ) )
 
-        for c in range( self.n_or ):
-            Wire( self, self.g_fuse_out[ 0, c ], self.g_or[ c ], placement=( 'center', 'pin' ) )
+        for r, coords in enumerate( px[ 'wire_row_out' ].tolist() ):
+            Wire.line( self, coords, tags=( 'wire_row', self.row_tag( r ), self.plane_tag( 'out' ) ) )
 
+        for c, coords in enumerate( px[ 'wire_col_out' ].tolist() ):
+            Wire.line( self, coords, tags=( self.col_tag( 'out', c ), self.plane_tag( 'out' ) ) )
 
-# ------------------------------------------------------------------------------------------------------- #
+        self.canvas.tag_lower( 'wire_row' )
 
 
-    def _get_fuse_in( self, tag ):
-        """
-        Restituisce l'oggetto grafico del fusibile corrispondente ad un I{tag},
-        appartenente alla matrice IN-AND.
+# ------------------------------------------------------------------------------------------------------- #
 
-        @param tag: il tag del fusibile.
-        """
-        l   = len( 'fuse_in_' )
-        n   = int( tag[ l : ] )
-        r   = n // ( self.n_not * 2 )
-        c   = n % ( self.n_not * 2 )
-        return self.g_fuse_in[ r, c ]
 
-    def place_fuse_in( self ):
-        """
-        Crea i fusibili relativi alla matrice IN-AND.
+    def fuse_center( self, plane, r, c ):
         """
-        x   = self.not_start
-        dx  = self.grid_delta
-        y   = self.and_start
-        dy  = self.grid_delta
-
-        for r in range( self.n_and ):
-            x   = self.not_start
-            for c in range( 2 * self.n_not ):
-                self.g_fuse_in[ r, c ] = Fuse( self, x, y, 'in_' )
-                x += dx
-            y += dy
+        Calcola la posizione del centro di un fusibile nel reticolo definito dal layout.
 
+        @param plane: matrice del fusibile, 'in' per IN-AND oppure 'out' per AND-OR
+        @param r: riga del fusibile
+        @param c: colonna del fusibile
+        @return: coordinate normalizzate del centro del fusibile
+        """
+        return ( self.layout.fuse_x[ plane ][ c ], self.layout.and_y[ r ] )
 
 
 
-    def _get_fuse_out( self, tag ):
+    def place_fuse_in( self, rows=None ):
         """
-        Restituisce l'oggetto grafico del fusibile corrispondente ad un I{tag},
-        appartenente alla matrice AND-OR.
+        Crea i fusibili relativi alla matrice IN-AND.
 
-        @param tag: il tag del fusibile.
+        @param rows: intervallo (primo, ultimo + 1) delle righe da creare, None per tutte
         """
-        l   = len( 'fuse_out_' )
-        n   = int( tag[ l : ] )
-        r   = n // self.n_or
-        c   = n % self.n_or
-        return self.g_fuse_out[ r, c ]
+        start, stop = rows or ( 0, self.n_and )
+        L   = self.layout
+        for r in range( start, stop ):
+            y   = L.and_y[ r ]
+            for c, x in enumerate( L.fuse_x[ 'in' ] ):
+                self.g_fuse_in[ r, c ] = Fuse( self, x, y, 'in_', self.fuse_tags( 'in', r, c ) )
 
-    def place_fuse_out( self ):
+
+    def place_fuse_out( self, rows=None ):
         """
         Crea i fusibili relativi alla matrice AND-OR.
-        """
-        x   = self.or_start
-        dx  = self.grid_delta
-        y   = self.and_start
-        dy  = self.grid_delta
 
-        for r in range( self.n_and ):
-            x   = self.or_start
-            for c in range( self.n_or ):
-                self.g_fuse_out[ r, c ] = Fuse( self, x, y, 'out_' )
-                x += dx
-            y += dy
+        @param rows: intervallo (primo, ultimo + 1) delle righe da creare, None per tutte
+        """
+        start, stop = rows or ( 0, self.n_and )
+        L   = self.layout
+        for r in range( start, stop ):
+            y   = L.and_y[ r ]
+            for c, x in enumerate( L.fuse_x[ 'out' ] ):
+                self.g_fuse_out[ r, c ] = Fuse( self, x, y, 'out_', self.fuse_tags( 'out', r, c ) )
 
 
 # ======================================================================================================= #
 
 
-    def switch_fuse_in( self, tag ):
-        """
-        Realizza lo switch di un fusibile della matrice IN-AND.
-
-        @param tag: il tag del fusibile.
-        """
-        f   = self._get_fuse_in( tag )
-        f.toggle( self )
-
-    def switch_fuse_out( self, tag ):
+    def switch_fuse( self, plane, r, c ):
         """
-        Realizza lo switch di un fusibile della matrice AND-OR.
+        Realizza lo switch di un fusibile individuato dalla sua posizione.
 
-        @param tag: il tag del fusibile.
+        @param plane: matrice del fusibile, 'in' per IN-AND oppure 'out' per AND-OR
+        @param r: riga del fusibile
+        @param c: colonna del fusibile
         """
-        f   = self._get_fuse_out( tag )
-        f.toggle( self )
+        self.model.toggle( plane, r, c )
 
 
 
-    def get_tag( self, x, y, comp=None ):
+    def locate( self, x, y ):
         """
-        Cerca il componente più vicino alla coordinata specificata, e ne restituisce il I{tag}.
+        Individua il fusibile più vicino a un punto del canvas.
 
-        Se viene specificato l'argomento I{comp} la ricerca è limitata a quel tipo di componente
-        i componenti vengono rilevati in un intervallo rettangolare di dimensioni \I{halo}.
+        I fusibili occupano un reticolo regolare definito dal layout, quindi riga e colonna si
+        calcolano direttamente dall'origine e dal passo di griglia con Layout.index, senza
+        interrogare il canvas: il costo non dipende dal numero di oggetti grafici presenti.
+        Il punto deve distare dal centro del fusibile meno di I{halo}, e comunque meno di mezzo
+        passo di griglia.
 
-        @param x: coordinata orizzontale del punto di inizio della ricerca
-        @param y: coordinata verticale del punto di inizio della ricerca
-        @param comp: categoria di componente a cui viene limitata la ricerca
-        @type comp: Component
+        @param x: coordinata orizzontale del punto nel canvas [pixel]
+        @param y: coordinata verticale del punto nel canvas [pixel]
+        @return: tupla (matrice, riga, colonna) con matrice 'in' oppure 'out', o None
         """
-        halo	= self.halo * self.x_size
-        x0      = x - halo
-        x1      = x + halo
-        y0      = y - halo
-        y1      = y + halo
-        ids     = self.canvas.find_overlapping( x0, y0, x1, y1 )
+        L       = self.layout
+        h       = float( self.size[ 1 ] * self.zoom )
+        u, v    = x / h, y / h
+        tol     = min( self.halo * self.x_size / h, 0.5 * L.d )
 
-        fl      = lambda x: len( self.canvas.gettags( x ) )
-        ids     = list(filter( fl, ids ))
-        if comp is not None:
-            fl      = ( lambda x: comp in self.canvas.gettags( x )[ 0 ] )
-            ids     = list(filter( fl, ids ))
-
-        if not len( ids ):
+        r       = L.index( 'and_y', v, tol )
+        if r is None:
             return None
-        return self.canvas.gettags( ids[ 0 ] )[ 0 ]
+
+        for plane in ( 'in', 'out' ):
+            c   = L.index( 'fuse_%s_x' % plane, u, tol )
+            if c is not None:
+                return ( plane, r, c )
+        return None
 
 
 
@@ -593,6 +797,15 @@ class Pla( object ):
         """
         self.run()
 
+    def _event_l( self, event ):
+        """
+        Gestore della I{shortcut} da tastiera "l"/"L": attiva o disattiva la valutazione continua.
+
+        @param event: evento catturato da Tkinter.bind, non utilizzato
+        @type event: instance
+        """
+        self.set_live( not self.live )
+
 
 
     def handler( self, event ):
@@ -604,140 +817,514 @@ class Pla( object ):
         @param event: evento catturato da Tkinter.bind, utilizzato per identificare la posizione del mouse
         @type event: instance
         """
-        t   = self.get_tag( event.x, event.y, 'fuse' )
+        f   = self.locate( self.canvas.canvasx( event.x ), self.canvas.canvasy( event.y ) )
 
         if self.debug > 2:
-            print(event.x, event.y, ': ', t)
+            print(event.x, event.y, ': ', f)
 
-        if t is None:
+        if f is None:
             return
-        if 'fuse_in' in t:
-            return self.switch_fuse_in( t )
-        if 'fuse_out' in t:
-            return self.switch_fuse_out( t )
+        return self.switch_fuse( *f )
 
 
 
-    def place_components( self ):
+# ------------------------------------------------------------------------------------------------------- #
+#   vista scorrevole e ingrandibile, in modalità virtuale
+# ------------------------------------------------------------------------------------------------------- #
+
+
+    def _scroll_init( self ):
         """
-        Posiziona l'intero set di componenti nel layout, e avvia la gestione del mouse.
+        Aggiunge al canvas le barre di scorrimento e i comandi di spostamento e zoom della vista.
+        """
+        cv              = self.canvas
+        self.x_scroll   = Scrollbar( self.root, orient=HORIZONTAL, command=self._xview )
+        self.y_scroll   = Scrollbar( self.root, orient=VERTICAL, command=self._yview )
+        self.x_scroll.grid( row=3, column=0, columnspan=self.grid_cols, sticky='ew' )
+        self.y_scroll.grid( row=0, column=self.grid_cols, rowspan=3, sticky='ns' )
+        cv.configure( xscrollcommand=self.x_scroll.set, yscrollcommand=self.y_scroll.set )
+        self._scroll_region()
+
+        cv.bind( "<Configure>", lambda e: self.view.schedule() )
+        cv.bind( "<MouseWheel>", self._event_wheel )
+        cv.bind( "<Shift-MouseWheel>", self._event_wheel )
+        cv.bind( "<Control-MouseWheel>", self._event_wheel )
+        for b in ( 4, 5 ):
+            cv.bind( "<Button-%d>" % b, self._event_wheel )
+            cv.bind( "<Shift-Button-%d>" % b, self._event_wheel )
+            cv.bind( "<Control-Button-%d>" % b, self._event_wheel )
+        cv.bind( "<ButtonPress-2>", lambda e: cv.scan_mark( e.x, e.y ) )
+        cv.bind( "<B2-Motion>", self._event_drag )
+        self.root.bind( "<KeyPress-plus>", lambda e: self.zoom_at( self.zoom_step ) )
+        self.root.bind( "<KeyPress-equal>", lambda e: self.zoom_at( self.zoom_step ) )
+        self.root.bind( "<KeyPress-minus>", lambda e: self.zoom_at( 1 / self.zoom_step ) )
+
+
+    def _scroll_region( self ):
+        """
+        Adegua l'area scorrevole del canvas alle dimensioni del layout all'ingrandimento corrente.
+        """
+        w, h    = self.size
+        self.canvas.configure( scrollregion=( 0, 0, w * self.zoom, h * self.zoom ) )
+
+
+    def _xview( self, *args ):
+        """
+        Comando della barra di scorrimento orizzontale.
+        """
+        self.canvas.xview( *args )
+        self.view.schedule()
+
+    def _yview( self, *args ):
+        """
+        Comando della barra di scorrimento verticale.
+        """
+        self.canvas.yview( *args )
+        self.view.schedule()
+
+
+    def _event_wheel( self, event ):
+        """
+        Gestore della rotella del mouse: scorrimento verticale, orizzontale con Shift, zoom con Ctrl.
+
+        @param event: evento catturato da Tkinter.bind
+        @type event: instance
+        """
+        up      = event.num == 4 or getattr( event, 'delta', 0 ) > 0
+        if event.state & 0x0004:
+            self.zoom_at( self.zoom_step if up else 1 / self.zoom_step, event.x, event.y )
+            return
+        view    = self.canvas.xview_scroll if event.state & 0x0001 else self.canvas.yview_scroll
+        view( -3 if up else 3, 'units' )
+        self.view.schedule()
+
+
+    def _event_drag( self, event ):
+        """
+        Gestore del trascinamento della vista con il tasto centrale del mouse.
+
+        @param event: evento catturato da Tkinter.bind
+        @type event: instance
+        """
+        self.canvas.scan_dragto( event.x, event.y, gain=1 )
+        self.view.schedule()
+
+
+    def zoom_at( self, f, x=None, y=None ):
+        """
+        Modifica l'ingrandimento della vista, mantenendo fermo il punto indicato.
+
+        Gli oggetti grafici esistenti vengono riscalati dal canvas; la vista viene poi aggiornata
+        per disegnare i fusibili della nuova zona visibile.
+
+        @param f: fattore di ingrandimento
+        @param x: coordinata orizzontale del punto fisso nella finestra, se None il centro
+        @param y: coordinata verticale del punto fisso nella finestra, se None il centro
+        """
+        cv      = self.canvas
+        zoom    = min( max( self.zoom * f, self.zoom_min ), self.zoom_max )
+        f       = zoom / self.zoom
+        if f == 1:
+            return
+        if x is None:
+            x   = cv.winfo_width() / 2
+            y   = cv.winfo_height() / 2
+        cx, cy  = cv.canvasx( x ), cv.canvasy( y )
+
+        cv.scale( 'all', 0, 0, f, f )
+        self.zoom       = zoom
+        self.layout.rescale( self.size[ 1 ] * zoom )
+        self._scroll_region()
+        w, h    = self.size
+        cv.xview_moveto( max( 0, cx * f - x ) / ( w * zoom ) )
+        cv.yview_moveto( max( 0, cy * f - y ) / ( h * zoom ) )
+        self.view.refresh( force=True )
+
+
+
+    def _place_steps( self ):
+        """
+        Generatore dei passi di costruzione del layout: ad ogni passo viene disegnata una parte dei
+        componenti, le porte AND e i fusibili a blocchi di I{chunk_rows} righe.
         """
-        self.place_and()
+        n   = self.chunk_rows
+        for r in range( 0, self.n_and, n ):
+            self.place_and( ( r, min( r + n, self.n_and ) ) )
+            yield
         self.place_or()
         self.place_not()
         self.place_inputs()
         self.place_outputs()
-        self.place_fuse_in()
-        self.place_fuse_out()
+        yield
+        if self.view is None:
+            for r in range( 0, self.n_and, n ):
+                rows    = ( r, min( r + n, self.n_and ) )
+                self.place_fuse_in( rows )
+                self.place_fuse_out( rows )
+                yield
+        else:
+            self.view.refresh()
         self.place_wire_in()
         self.place_wire_out()
 
         self.canvas.bind( "<Button-1>", self.handler )
 
 
+    def place_components( self ):
+        """
+        Posiziona l'intero set di componenti nel layout, e avvia la gestione del mouse.
+        """
+        for step in self._place_steps():
+            pass
 
-# ======================================================================================================= #
-#
-#       controllo della parte logica
-#
-# ======================================================================================================= #
 
-    def compute_and( self, r ):
+    def place_progressive( self ):
+        """
+        Avvia la costruzione progressiva del layout: i passi di I{_place_steps} vengono eseguiti a
+        blocchi di durata I{chunk_time}, programmati con after, così che la finestra venga mostrata
+        subito e resti reattiva. In modalità debug vengono riportati il tempo di comparsa della
+        finestra e quello totale di costruzione.
         """
-        Computa la funzione di una porta logica AND.
+        self.t_build    = time()
+        self.building   = self._place_steps()
+        self.pending    = []
+        self.root.after_idle( self._place_chunk, True )
 
-        @param r: la riga di fusibili a cui è legata la porta.
+
+    def _place_chunk( self, first=False ):
         """
-        default     = False
-        fuses       = self.g_fuse_in[ r ]
+        Esegue un blocco della costruzione progressiva, e programma il successivo.
 
-        for k in range( self.n_inputs ):
-            f       = fuses[ 2 * k ].status
-            i       = self.g_inputs[ k ].var.get()
-            if ( f and i ):
-                return False
-            if ( f and not i ):
-                default = True
+        @param first: vale True per il primo blocco, eseguito alla prima comparsa della finestra
+        """
+        t   = time()
+        if first and self.debug:
+            print("primo frame dopo %.3f s" % ( t - self.t_build ))
 
-        for k in range( self.n_inputs ):
-            f       = fuses[ 2 * k + 1].status
-            i       = self.g_inputs[ k ].var.get()
-            if ( f and not i ):
-                return False
-            if ( f and i ):
-                default = True
+        for step in self.building:
+            if time() - t > self.chunk_time:
+                self.root.after( 1, self._place_chunk )
+                return
 
-        return default
+        self.building   = None
+        if self.debug:
+            print("costruzione completata in %.3f s" % ( time() - self.t_build ))
+        pending, self.pending   = self.pending, []
+        for f, args in pending:
+            f( *args )
 
 
-    def compute_ands( self ):
+    def _defer( self, f, *args ):
         """
-        Calcola gli output ottenuti dalle porte AND.
+        Rinvia un'operazione al termine della costruzione progressiva, se questa è in corso.
+
+        @param f: il metodo da eseguire
+        @param args: gli argomenti del metodo
+        @return: True se l'operazione è stata rinviata
         """
-        for i in range( self.n_and ):
-            self.g_and[ i ].value( self, self.compute_and( i ) )
+        if self.building is None:
+            return False
+        self.pending.append( ( f, args ) )
+        return True
 
 
 
-    def compute_out( self, c ):
+# ------------------------------------------------------------------------------------------------------- #
+#   ridimensionamento
+# ------------------------------------------------------------------------------------------------------- #
+
+
+    def _resize_fuses( self, plane, rows, cols ):
+        """
+        Adegua i fusibili di una matrice alle nuove dimensioni, dopo il calcolo del nuovo layout.
+
+        I fusibili comuni alle vecchie e nuove dimensioni vengono spostati; se il numero di colonne
+        cambia, cambia anche il loro numero progressivo, e con esso il tag. Quelli delle righe e
+        colonne eliminate devono essere già stati cancellati dal canvas.
+
+        @param plane: matrice, 'in' oppure 'out'
+        @param rows: numero di righe comuni
+        @param cols: numero di colonne comuni
+        """
+        L       = self.layout
+        old     = self.g_fuse_in if plane == 'in' else self.g_fuse_out
+        m       = self.model.and_matrix if plane == 'in' else self.model.or_matrix
+        g       = empty( m.shape, dtype=object )
+        n_r, n_c    = m.shape
+        retag   = old.shape[ 1 ] != n_c
+        suffix  = plane + '_'
+
+        for r in range( n_r ):
+            y   = L.and_y[ r ]
+            for c in range( n_c ):
+                x   = L.fuse_x[ plane ][ c ]
+                if r < rows and c < cols:
+                    f   = old[ r, c ]
+                    if retag:
+                        f.tag   = f.category + str( r * n_c + c )
+                        f.place( self, x, y, f.status, self.fuse_tags( plane, r, c ) )
+                    else:
+                        f.move( self, x, y )
+                else:
+                    f   = Fuse( self, x, y, suffix, self.fuse_tags( plane, r, c ), n=r * n_c + c )
+                g[ r, c ]   = f
+        self.counts[ Fuse.name + suffix ]   = n_r * n_c
+
+        if plane == 'in':
+            self.g_fuse_in  = g
+        else:
+            self.g_fuse_out = g
+
+
+    def resize( self, n_inputs=None, n_outputs=None, n_and=None, x_size=None ):
         """
-        Computa la funzione di una porta logica OR.
+        Modifica le dimensioni del PLA senza ricostruire il simulatore.
+
+        Viene calcolato il nuovo layout, e i componenti esistenti vengono spostati nelle nuove
+        posizioni riutilizzandone gli oggetti grafici; vengono creati solo i componenti delle righe e
+        colonne aggiunte, e cancellati quelli delle righe e colonne eliminate. Lo stato dei fusibili
+        comuni alle due dimensioni viene conservato, quelli aggiunti sono collegati. I collegamenti,
+        che cambiano lunghezza, vengono ridisegnati. La modalità di disegno, virtuale o meno,
+        resta quella scelta all'avvio.
 
-        @param c: la colonna di fusibili a cui è legata la porta.
+        @param n_inputs: nuovo numero di ingressi, None per lasciarlo invariato
+        @param n_outputs: nuovo numero di uscite, None per lasciarlo invariato
+        @param n_and: nuovo numero di porte AND, None per lasciarlo invariato
+        @param x_size: nuova dimensione in pixel della lunghezza della finestra, None per lasciarla invariata
         """
-        fuses       = self.g_fuse_out[ :, c ]
+        if self._defer( self.resize, n_inputs, n_outputs, n_and, x_size ):
+            return
 
-        for k in range( self.n_and ):
-            f       = fuses[ k ].status
-            a       = self.g_and[ k ].status
-            if ( f and a ):          # il solo caso in cui la OR e` vera
-                return True
+        old         = ( self.n_inputs, self.n_outputs, self.n_and, self.x_size )
+        new         = tuple( o if n is None else n
+                        for o, n in zip( old, ( n_inputs, n_outputs, n_and, x_size ) ) )
+        if new == old:
+            return
+        if min( new ) < 1:
+            print("dimensioni non valide: %d input, %d output, %d AND" % new[ : 3 ])
+            return
 
-        return False
+        t           = time()
+        cv          = self.canvas
+        i0, o0, a0  = old[ : 3 ]
+        i1, o1, a1  = new[ : 3 ]
+        ni, no, na  = min( i0, i1 ), min( o0, o1 ), min( a0, a1 )
+
+        # collegamenti e componenti eliminati, cancellati per identificativo con una sola chiamata
+        # al canvas; in modalità virtuale i fusibili della vista restano
+        cv.delete( Wire.tag )
+        gone        = list( chain( self.g_and[ a1 : ], self.g_not[ i1 : ], self.g_inputs[ i1 : ],
+                                   self.g_or[ o1 : ], self.g_outputs[ o1 : ] ) )
+        if self.view is None:
+            for g, cols in ( ( self.g_fuse_in, 2 * i1 ), ( self.g_fuse_out, o1 ) ):
+                gone    += list( g[ a1 : ].flat ) + list( g[ : a1, cols : ].flat )
+        elif gone:
+            self.view.reset()
+        ids         = [ i for g in gone for i in g.items() ]
+        if ids:
+            cv.delete( *ids )
+        for inpin in self.g_inputs[ i1 : ]:
+            inpin.button.destroy()
+
+        # nuovo layout
+        self.n_inputs, self.n_outputs, self.n_and, self.x_size  = new
+        self._layout()
+        L           = self.layout
+        w, h        = self.size
+        if self.view is not None:
+            h       = min( h, self.y_max )
+        cv.configure( width=w, height=h )
+        self._grid_buttons()
+
+        self.model.resize( i1, o1, a1 )
+        self.g_and      = resized( self.g_and, ( a1, ) )
+        self.g_not      = resized( self.g_not, ( i1, ) )
+        self.g_inputs   = resized( self.g_inputs, ( i1, ) )
+        self.g_or       = resized( self.g_or, ( o1, ) )
+        self.g_outputs  = resized( self.g_outputs, ( o1, ) )
+        self.inputs     = self.inputs[ : i1 ] + [ IntVar( self.root ) for i in range( ni, i1 ) ]
+        self.counts.update( { And.name: na, Not.name: ni, Or.name: no } )
+
+        # componenti esistenti, spostati nel nuovo layout
+        for i in range( na ):
+            self.g_and[ i ].move( self, L.and_y[ i ] )
+        for k in range( ni ):
+            self.g_not[ k ].move( self, L.not_x[ k ] )
+            self.g_inputs[ k ].move( self, L.in_x[ k ] )
+        for c in range( no ):
+            self.g_or[ c ].move( self, L.or_x[ c ] )
+            self.g_outputs[ c ].move( self, L.out_x[ c ] )
+
+        # componenti aggiunti
+        self.place_and( ( na, a1 ) )
+        self.place_not( ( ni, i1 ) )
+        self.place_inputs( ( ni, i1 ) )
+        self.place_or( ( no, o1 ) )
+        self.place_outputs( ( no, o1 ) )
+        if self.view is None:
+            self._resize_fuses( 'in', na, 2 * ni )
+            self._resize_fuses( 'out', na, no )
+        self.place_wire_in()
+        self.place_wire_out()
+
+        InPin.reset_all( self, self.g_inputs )
+        And.reset_all( self, self.g_and )
+        OutPin.reset_all( self, self.g_outputs )
+
+        if self.view is not None:
+            self._scroll_region()
+            self.view.reset()
+            self.view.refresh( force=True )
 
+        if self.debug:
+            print("ridimensionamento a %d input, %d output, %d AND in %.3f s" % (
+                    i1, o1, a1, time() - t ))
 
-    def compute_outs( self ):
+
+    def _ask_size( self ):
         """
-        Calcola gli output ottenuti dalle porte OR, e quindi dell'intero PLA.
+        Chiede all'utente le nuove dimensioni del PLA, e lo ridimensiona.
         """
-        for i in range( self.n_outputs ):
-            self.g_outputs[ i ].value( self, self.compute_out( i ) )
+        s   = askstring( "Resize", "Inputs, outputs, AND:", parent=self.root,
+                initialvalue="%d %d %d" % ( self.n_inputs, self.n_outputs, self.n_and ) )
+        if not s:
+            return
+        try:
+            n_i, n_o, n_a   = [ int( v ) for v in s.replace( ',', ' ' ).split() ]
+        except ValueError:
+            print("dimensioni non valide: %s" % s)
+            return
+        self.resize( n_i, n_o, n_a )
 
 
 
+# ======================================================================================================= #
+#
+#       controllo della parte logica
+#
+# ======================================================================================================= #
+
+    def _changed( self, event, *args ):
+        """
+        Osservatore dei cambiamenti del modello: ridisegna la parte del circuito interessata
+        dall'evento, con il metodo I{_on_<evento>} corrispondente. Gli eventi notificati durante
+        la costruzione progressiva vengono ridisegnati al suo termine.
+
+        @param event: nome dell'evento, vedi model.PlaModel
+        @param args: argomenti dell'evento
+        """
+        if self._defer( self._changed, event, *args ):
+            return
+        if self.live and event in self.live_events:
+            self._schedule_run()
+        f   = getattr( self, '_on_' + event, None )
+        if f is not None:
+            f( *args )
+
+
+    def _on_fuse( self, plane, r, c ):
+        """
+        Ridisegna un fusibile cambiato nel modello.
+
+        @param plane: matrice del fusibile, 'in' per IN-AND oppure 'out' per AND-OR
+        @param r: riga del fusibile
+        @param c: colonna del fusibile
+        """
+        if self.view is not None:
+            self.view.update( plane, r, c )
+        elif plane == 'in':
+            self.g_fuse_in[ r, c ].set( self, self.model.and_matrix[ r, c ] )
+        else:
+            self.g_fuse_out[ r, c ].set( self, self.model.or_matrix[ r, c ] )
+
+
+    def _on_input( self, k ):
+        """
+        Aggiorna il pulsante di un ingresso cambiato nel modello.
+
+        @param k: indice dell'ingresso
+        """
+        v   = int( self.model.inputs[ k ] )
+        if self.inputs[ k ].get() != v:
+            self.inputs[ k ].set( v )
+
+
     def run( self ):
         """
         Avvia la computazione dell'output del PLA.
         """
-        self.compute_ands()
-        self.compute_outs()
+        if self._defer( self.run ):
+            return
+        self.model.run()
 
+    def set_live( self, live ):
+        """
+        Attiva o disattiva la valutazione continua; all'attivazione le uscite vengono subito
+        ricalcolate.
 
+        @param live: True per attivare la valutazione continua
+        """
+        self.live   = bool( live )
+        if self.live_var.get() != int( self.live ):
+            self.live_var.set( int( self.live ) )
+        if self.live:
+            self._schedule_run()
 
-# ======================================================================================================= #
+    def _schedule_run( self ):
+        """
+        Programma una valutazione con after_idle, se non ce n'è già una in attesa: tutti i
+        cambiamenti notificati prima che Tkinter sia inattivo producono una sola valutazione.
+        La valutazione viene programmata da I{_changed} prima di ridisegnare il cambiamento, così
+        che preceda il ridisegno del canvas, anch'esso eseguito quando Tkinter è inattivo, e i testi
+        delle porte vengano aggiornati nello stesso ridisegno dei fusibili.
+        """
+        if self.live_job is None:
+            self.live_job   = self.root.after_idle( self._live_run )
 
+    def _live_run( self ):
+        """
+        Esegue la valutazione programmata da I{_schedule_run}.
+        La valutazione usa il motore conservato dal modello (vedi model.PlaModel.engine), che a
+        ogni fusibile modificato viene aggiornato e non ricostruito: la ricostruzione avviene solo
+        dopo i cambiamenti in blocco (caricamento, riempimento, ridimensionamento).
+        """
+        self.live_job   = None
+        if self.live:
+            self.run()
 
-    def fuse_all( self ):
+    def _on_run( self ):
         """
-        Resetta i componenti grafici come al momento di avvio del programma,
-        con i fusibili tutti non collegati.
+        Visualizza le uscite delle porte AND e del PLA calcolate dal modello; i testi che non
+        cambiano non vengono riconfigurati.
         """
-        for i in range( self.n_inputs ):
-            self.g_inputs[ i ].reset( self )
+        for g, a in zip( self.g_and, self.model.ands ):
+            g.value( self, a )
+        for g, o in zip( self.g_outputs, self.model.outs ):
+            g.value( self, o )
 
-        for i in range( self.n_and ):
-            self.g_and[ i ].reset( self )
 
-        for i in range( self.n_outputs ):
-            self.g_outputs[ i ].reset( self )
 
-        for r in range( self.n_and ):
-            for c in range( 2 * self.n_inputs ):
-                self.g_fuse_in[ r, c ].deset( self )
+# ======================================================================================================= #
 
-        for r in range( self.n_and ):
-            for c in range( self.n_outputs ):
-                self.g_fuse_out[ r, c ].deset( self )
+
+    def fuses( self ):
+        """
+        Restituisce un iteratore su tutti i fusibili, prima della matrice IN-AND e poi della AND-OR.
+        In modalità virtuale restituisce i soli fusibili della vista.
+        """
+        if self.view is not None:
+            return self.view.fuses()
+        return chain( self.g_fuse_in.flat, self.g_fuse_out.flat )
+
+
+    def fuse_all( self ):
+        """
+        Resetta i componenti grafici come al momento di avvio del programma,
+        con i fusibili tutti non collegati.
+        """
+        if self._defer( self.fuse_all ):
+            return
+        self.model.fuse_all()
 
 
     def reset( self ):
@@ -745,79 +1332,137 @@ class Pla( object ):
         Resetta i componenti grafici come al momento di avvio del programma,
         con i fusibili tutti collegati.
         """
-        for i in range( self.n_inputs ):
-            self.g_inputs[ i ].reset( self )
+        if self._defer( self.reset ):
+            return
+        self.model.reset()
 
-        for i in range( self.n_and ):
-            self.g_and[ i ].reset( self )
 
-        for i in range( self.n_outputs ):
-            self.g_outputs[ i ].reset( self )
+    def _on_fill( self, status ):
+        """
+        Riporta i componenti grafici allo stato iniziale, con i fusibili tutti nello stato indicato.
 
-        for r in range( self.n_and ):
-            for c in range( 2 * self.n_inputs ):
-                self.g_fuse_in[ r, c ].reset( self )
+        @param status: stato dei fusibili
+        """
+        InPin.reset_all( self, self.g_inputs )
+        And.reset_all( self, self.g_and )
+        OutPin.reset_all( self, self.g_outputs )
 
-        for r in range( self.n_and ):
-            for c in range( self.n_outputs ):
-                self.g_fuse_out[ r, c ].reset( self )
+        Fuse.set_all( self, status, self.fuses() )
+        if self.view is not None:
+            self.view.sync()
 
 
 # ======================================================================================================= #
 
 
+    def set_fuses( self, and_matrix, or_matrix ):
+        """
+        Porta i fusibili nello stato indicato dalle matrici (vedi I{_on_fuses}).
+
+        @param and_matrix: nuovo stato della matrice IN-AND
+        @param or_matrix: nuovo stato della matrice AND-OR
+        """
+        self.model.set_fuses( and_matrix, or_matrix )
+
+
+    def _on_fuses( self, old_and, old_or ):
+        """
+        Ridisegna i fusibili dopo un cambiamento delle matrici del modello, modificando solo quelli
+        che cambiano.
+
+        Se i fusibili da modificare sono più di quelli che differiscono dallo stato prevalente
+        nelle nuove matrici, conviene portare prima tutti i fusibili nello stato prevalente,
+        con una chiamata al canvas per tag comune (vedi Fuse.set_all), e poi correggere i restanti.
+        Lo stesso criterio viene poi applicato a ogni riga di ciascuna matrice, tramite il tag
+        della riga.
+        In modalità virtuale vengono aggiornati solo i fusibili della vista.
+
+        @param old_and: stato disegnato della matrice IN-AND, non più usato dal modello
+        @param old_or: stato disegnato della matrice AND-OR, non più usato dal modello
+        @return: numero di fusibili modificati singolarmente
+        """
+        if self.view is not None:
+            return self.view.sync()
+
+        and_matrix  = self.model.and_matrix
+        or_matrix   = self.model.or_matrix
+        changed     = count_nonzero( and_matrix != old_and ) + \
+                      count_nonzero( or_matrix != old_or )
+        on          = count_nonzero( and_matrix ) + count_nonzero( or_matrix )
+        total       = and_matrix.size + or_matrix.size
+        major       = 2 * on >= total
+        minor       = on if not major else total - on
+        if minor + 1 < changed:
+            Fuse.set_all( self, major, self.fuses() )
+            old_and[ ... ]  = major
+            old_or[ ... ]   = major
+
+        n           = 0
+        for plane, g, m, t in ( ( 'in', self.g_fuse_in, old_and, and_matrix ),
+                                ( 'out', self.g_fuse_out, old_or, or_matrix ) ):
+            on          = t.sum( 1 )
+            major       = 2 * on >= t.shape[ 1 ]
+            minor       = ( t.shape[ 1 ] - on ) * major + on * ~major
+            for r in flatnonzero( minor + 1 < ( m != t ).sum( 1 ) ):
+                tag     = '%s&&%s' % ( self.plane_tag( plane ), self.row_tag( r ) )
+                Fuse.set_all( self, major[ r ], g[ r ], tag )
+                m[ r ]  = major[ r ]
+
+            rows, cols  = nonzero( m != t )
+            for r, c in zip( rows, cols ):
+                g[ r, c ].set( self, t[ r, c ] )
+            m[ rows, cols ] = t[ rows, cols ]
+            n           += len( rows )
+
+        if self.debug > 1:
+            print("fusibili modificati: %d su %d" % ( n, changed ))
+        return n
+
+
+
     def load( self, circ ):
         """
         Carica uno dei circuiti disponibili in libreria.
 
+        Rispetto allo stato corrente vengono aggiornati solo i fusibili, le porte e le etichette
+        che cambiano (vedi I{_on_fuses}).
+
         @param circ: circuito da caricare
         @type circ: Circuit
         """
-        if circ.n_inputs > self.n_inputs:
-            print("non ci sono abbastanza input disponibili per caricare questo circuito")
+        if self._defer( self.load, circ ):
             return
+        self.model.load( circ )
 
-        if circ.n_and > self.n_and:
-            print("non ci sono abbastanza porte AND disponibili per caricare questo circuito")
-            return
 
-        if circ.n_outputs > self.n_outputs:
-            print("non ci sono abbastanza output disponibili per caricare questo circuito")
-            return
-
-        self.fuse_all()
-
-        # matrice fuse sinistra
-        for r in range( circ.n_and ):
-            for c in range( 2 * circ.n_inputs ):
-                if circ.and_matrix[ r, c ]:
-                    self.g_fuse_in[ r, c ].reset( self )
-                else:
-                    self.g_fuse_in[ r, c ].deset( self )
+    def _on_load( self, circ, old_and, old_or ):
+        """
+        Ridisegna il circuito caricato nel modello.
 
-        # matrice fuse destra
-        for r in range( circ.n_and ):
-            for c in range( circ.n_outputs ):
-                if circ.or_matrix[ r, c ]:
-                    self.g_fuse_out[ r, c ].reset( self )
-                else:
-                    self.g_fuse_out[ r, c ].deset( self )
+        @param circ: il circuito caricato
+        @type circ: Circuit
+        @param old_and: stato disegnato della matrice IN-AND
+        @param old_or: stato disegnato della matrice AND-OR
+        """
+        self._on_fuses( old_and, old_or )
 
         # array porte and
-        for i in range( circ.n_and, self.n_and ):
-            self.g_and[ i ].disable( self )
+        And.reset_all( self, self.g_and )
+        self.disable_rows( circ.n_and, self.n_and )
 
         # array inputs
         for i in range( circ.n_inputs ):
-            self.g_inputs[ i ].set_label( self, circ.labels_i[ i ] )
+            self.g_inputs[ i ].reset( self, circ.labels_i[ i ] )
         for i in range( circ.n_inputs, self.n_inputs ):
             self.g_inputs[ i ].disable()
+            self.g_inputs[ i ].reset_label( self )
 
         # array outputs
         for i in range( circ.n_outputs ):
-            self.g_outputs[ i ].set_label( self, circ.labels_o[ i ] )
+            self.g_outputs[ i ].reset( self, circ.labels_o[ i ] )
         for i in range( circ.n_outputs, self.n_outputs ):
             self.g_outputs[ i ].disable( self )
+            self.g_outputs[ i ].reset_label( self )
 
 
 # ======================================================================================================= #
@@ -867,17 +1512,272 @@ def options( a ):
             help    = "numero di porte AND",
             default = Pla.n_and
     )
+    a.add_option( "-v",
+            action  = "store_true",
+            dest    = "virtual",
+            help    = "disegna solo i fusibili visibili, con vista scorrevole e ingrandibile",
+            default = None
+    )
+    a.add_option( "-c",
+            action  = "store_true",
+            dest    = "composite",
+            help    = "disegna ogni porta logica con un unico oggetto grafico",
+            default = False
+    )
+    a.add_option( "-l",
+            action  = "store_true",
+            dest    = "live",
+            help    = "ricalcola le uscite a ogni cambiamento di ingressi o fusibili, senza RUN",
+            default = Pla.live
+    )
+    a.add_option( "-d",
+            action  = "count",
+            dest    = "debug",
+            help    = "livello di debug, ripetere per aumentarlo; riporta la durata delle fasi di avvio",
+            default = Pla.debug
+    )
+    a.add_option( "-b",
+            action  = "store",
+            type    = "string",
+            dest    = "batch",
+            metavar = "<circuit>",
+            help    = "simula senza interfaccia grafica un circuito della libreria, o una mappa di fusibili",
+            default = None
+    )
+    a.add_option( "-t",
+            action  = "store_true",
+            dest    = "table",
+            help    = "con -b, stampa la tabella di verità (azione predefinita)",
+            default = False
+    )
+    a.add_option( "-e",
+            action  = "store",
+            type    = "string",
+            dest    = "vectors",
+            metavar = "<vectors>",
+            help    = "con -b, valuta i vettori di ingresso del file, uno per riga",
+            default = None
+    )
+    a.add_option( "-r",
+            action  = "store",
+            type    = "string",
+            dest    = "reference",
+            metavar = "<reference>",
+            help    = "con -b, verifica le uscite rispetto a una tabella di riferimento",
+            default = None
+    )
+    a.add_option( "-s",
+            action  = "store_true",
+            dest    = "stats",
+            help    = "con -b, riporta le statistiche dei fusibili",
+            default = False
+    )
+    a.add_option( "-m",
+            action  = "store_true",
+            dest    = "map",
+            help    = "con -b, stampa la mappa dei fusibili",
+            default = False
+    )
+
+
+
+# ------------------------------------------------------------------------------------------------------- #
+#   simulazione senza interfaccia grafica
+# ------------------------------------------------------------------------------------------------------- #
+
+table_inputs    = 24            # numero massimo di ingressi per la tabella di verità di batch
+
 
-args            = OptionParser( Pla.usage )
-options( args )
-( opts, more )  = args.parse_args()
-Pla.x_size      = opts.x_size
-Pla.n_inputs    = opts.n_inputs
-Pla.n_outputs   = opts.n_outputs
-Pla.n_and       = opts.n_and
-
-sim             = Tk()
-pla             = Pla( sim )
-sim.attributes( '-topmost', 1 )     # per porre la finestra in primo piano
-pla.place_components()
-sim.mainloop()
+def read_vectors( path, n_inputs, n_outputs=0 ):
+    """
+    Legge un file di vettori di ingresso, uno per riga come cifre 0/1, eventualmente seguiti da
+    uno spazio e dalle uscite attese: è il formato della tabella di verità stampata da I{batch}.
+    Il testo che segue un carattere '#' è un commento.
+
+    @param path: nome del file
+    @param n_inputs: numero di ingressi
+    @param n_outputs: numero di uscite attese per ogni vettore, 0 se il file contiene solo ingressi
+    @return: coppia (vettori, uscite attese) di array booleani, le uscite sono None se n_outputs = 0
+    @raise ValueError: se una riga non è ben formata
+    """
+    from numpy      import array
+    x, y    = [], []
+    with open( path ) as f:
+        for n, line in enumerate( f, 1 ):
+            fields  = line.partition( '#' )[ 0 ].split()
+            if not fields:
+                continue
+            v       = fields[ 0 ]
+            o       = ''.join( fields[ 1 : ] )
+            if len( v ) != n_inputs or len( o ) != n_outputs or not set( v + o ) <= set( '01' ):
+                raise ValueError( "%s, riga %d: attesi %d ingressi e %d uscite: %r" % (
+                        path, n, n_inputs, n_outputs, line.strip() ) )
+            x.append( [ d == '1' for d in v ] )
+            y.append( [ d == '1' for d in o ] )
+    x       = array( x, dtype=bool ).reshape( len( x ), n_inputs )
+    if not n_outputs:
+        return x, None
+    return x, array( y, dtype=bool ).reshape( len( y ), n_outputs )
+
+
+def _bits( v ):
+    """
+    Rappresenta un vettore di booleani come stringa di cifre 0/1.
+    """
+    return ''.join( '1' if b else '0' for b in v )
+
+
+def _table( x, o ):
+    """
+    Stampa le righe di una tabella di verità, nel formato letto da I{read_vectors}.
+
+    @param x: blocco di vettori di ingresso
+    @param o: blocco delle uscite corrispondenti
+    """
+    for v, w in zip( x, o ):
+        print( "%s %s" % ( _bits( v ), _bits( w ) ) )
+
+
+def stats( c ):
+    """
+    Calcola le statistiche di uso dei fusibili di un circuito.
+
+    @param c: il circuito
+    @type c: circuits.Circuit
+    @return: lista di coppie (descrizione, valore)
+    """
+    from numpy      import count_nonzero
+    a, o    = c.and_matrix != 0, c.or_matrix != 0
+    used    = a.any( 1 ) & o.any( 1 )
+    n_in    = count_nonzero( a.reshape( c.n_and, c.n_inputs, 2 ).any( 2 ).any( 0 ) )
+    return [
+        ( "circuito", c.description ),
+        ( "ingressi", "%d (%d usati)" % ( c.n_inputs, n_in ) ),
+        ( "uscite", "%d (%d usate)" % ( c.n_outputs, count_nonzero( o[ used ].any( 0 ) ) ) ),
+        ( "porte AND", "%d (%d usate)" % ( c.n_and, count_nonzero( used ) ) ),
+        ( "fusibili IN-AND", "%d collegati, %d interrotti" % ( count_nonzero( a ),
+                a.size - count_nonzero( a ) ) ),
+        ( "fusibili AND-OR", "%d collegati, %d interrotti" % ( count_nonzero( o ),
+                o.size - count_nonzero( o ) ) ),
+    ]
+
+
+def batch( opts ):
+    """
+    Esegue il simulatore senza interfaccia grafica, e senza importare Tkinter.
+
+    Il circuito indicato dall'opzione -b è cercato prima come file di mappa di fusibili (vedi
+    circuits.Circuit.read_map), poi per nome nella libreria (vedi circuits.find). Le uscite sono
+    calcolate a blocchi su più thread da parallel.ThreadRunner. Tabelle di verità e risultati delle
+    valutazioni sono stampati una riga per vettore, con ingressi e uscite come cifre 0/1 separate
+    da uno spazio: lo stesso formato letto dalla verifica. La tabella di verità ha 2^n righe, e
+    viene rifiutata per circuiti con più di I{table_inputs} ingressi: in tal caso vanno indicati
+    i vettori da valutare con l'opzione -e.
+
+    @param opts: le opzioni della riga di comando
+    @return: codice di uscita del programma: 0 se tutto è corretto, 1 se la verifica fallisce,
+    2 in caso di errore negli argomenti
+    """
+    from os.path    import isfile
+    from numpy      import arange
+    from parallel   import ThreadRunner, unpack
+    import circuits
+
+    try:
+        if isfile( opts.batch ):
+            with open( opts.batch ) as f:
+                c   = circuits.Circuit.read_map( f, opts.batch )
+        else:
+            c   = circuits.find( opts.batch )
+            if c is None:
+                print("circuito non trovato: %s" % opts.batch)
+                return 2
+        x       = y = None
+        if opts.vectors:
+            x, y    = read_vectors( opts.vectors, c.n_inputs )
+        if opts.reference:
+            r, y    = read_vectors( opts.reference, c.n_inputs, c.n_outputs )
+    except ( IOError, ValueError ) as e:
+        print(e)
+        return 2
+
+    code    = 0
+    table   = opts.table or not ( opts.vectors or opts.reference or opts.stats or opts.map )
+    if table and c.n_inputs > table_inputs:
+        print("tabella di verità troppo grande: %d ingressi, al più %d; indicare i vettori con -e <vectors>"
+                % ( c.n_inputs, table_inputs ))
+        return 2
+    with ThreadRunner( c.and_matrix, c.or_matrix ) as runner:
+        if opts.map:
+            c.write_map( stdout )
+        if opts.stats:
+            for k, v in stats( c ):
+                print("# %-16s %s" % ( k + ':', v ))
+        if table or opts.vectors:
+            print("# %s | %s" % ( ' '.join( c.labels_i ), ' '.join( c.labels_o ) ))
+        if table:
+            n   = 1 << c.n_inputs
+            o   = unpack( runner.truth_table(), n )
+            s   = c.n_inputs - 1 - arange( c.n_inputs )
+            for i in range( 0, n, runner.chunk ):
+                j   = arange( i, min( i + runner.chunk, n ) )
+                _table( ( j[ :, None ] >> s ) & 1, o[ i : i + runner.chunk ] )
+        if opts.vectors:
+            _table( x, runner.run( x ) )
+        if opts.reference:
+            o       = runner.run( r )
+            bad     = ( o != y ).any( 1 ).nonzero()[ 0 ]
+            for i in bad:
+                print("# errore: %s atteso %s ottenuto %s" % ( _bits( r[ i ] ), _bits( y[ i ] ),
+                        _bits( o[ i ] ) ))
+            print("# verifica: %d vettori, %d errati" % ( len( r ), len( bad ) ))
+            code    = 1 if len( bad ) else 0
+
+    if opts.debug:
+        print("# %s: %d ingressi, %d uscite, %d porte AND" % ( c.description, c.n_inputs,
+                c.n_outputs, c.n_and ))
+    return code
+
+
+
+
+def main( argv=None ):
+    """
+    Avvia il simulatore: interpreta le opzioni della riga di comando, crea la finestra e il PLA,
+    e ne avvia la costruzione progressiva. Con l'opzione -b esegue invece I{batch}, e termina il
+    processo con il suo codice di uscita.
+
+    @param argv: argomenti della riga di comando, se None quelli del processo
+    @return: il simulatore, al termine del mainloop di Tkinter
+    @rtype: Pla
+    """
+    t0              = time()
+    from optparse   import OptionParser
+    args            = OptionParser( Pla.usage )
+    options( args )
+    ( opts, more )  = args.parse_args( argv )
+    if opts.batch is not None:
+        exit( batch( opts ) )
+    Pla.debug       = opts.debug
+    Pla.x_size      = opts.x_size
+    Pla.n_inputs    = opts.n_inputs
+    Pla.n_outputs   = opts.n_outputs
+    Pla.n_and       = opts.n_and
+    Pla.virtual     = opts.virtual
+    Pla.live        = opts.live
+
+    t_import        = gui()
+    Port.composite  = opts.composite
+    sim             = Tk()
+    pla             = Pla( sim )
+    sim.attributes( '-topmost', 1 )     # per porre la finestra in primo piano
+    if pla.debug:
+        print("moduli importati in %.3f s, simulatore creato in %.3f s" % (
+                t_import, time() - t0 ))
+    pla.place_progressive()
+    sim.mainloop()
+    return pla
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: profiling.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Contatori di chiamate e tempi delle operazioni principali del simulatore.
+
+La strumentazione è facoltativa: viene attivata da I{enable}, che sostituisce i metodi elencati in
+I{targets} con versioni che ne contano le chiamate e ne accumulano il tempo di esecuzione. Finché
+non viene attivata i metodi restano quelli originali, e non c'è alcun costo aggiuntivo.
+
+Pla la attiva alla creazione se il livello di debug è maggiore di 0, oppure se è definita la
+variabile d'ambiente PLA_PROFILE (vedi I{requested}). I tempi sono cumulativi, cioè comprendono
+quelli dei metodi chiamati: le righe di model.PlaModel misurano la valutazione, e in particolare
+I{engine} la costruzione del motore dopo ogni invalidazione; quelle I{_on_*} di Pla il ridisegno
+sul canvas, quelle I{place_*} e di layout.Layout la costruzione del layout.
+
+Al termine del programma la tabella dei contatori viene stampata sullo standard error, o scritta
+nel file indicato da PLA_PROFILE se questo non vale "1".
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+
+@var targets: metodi strumentati, per modulo e classe
+@var stats: contatori, per nome del metodo: lista [chiamate, tempo totale in secondi]
+"""
+
+from __future__ import print_function
+import atexit
+import os
+import sys
+try:
+    from time   import perf_counter as clock
+except ImportError:                     # Python 2
+    from time   import time as clock
+
+targets = {
+    ( 'model', 'PlaModel' ):    ( 'run', 'engine', 'load', 'set_fuses', 'fill', 'toggle', 'set_input',
+                                  'resize' ),
+    ( 'layout', 'Layout' ):     ( '__init__', 'rescale' ),
+    ( 'pla', 'Pla' ):           ( 'run', 'load', 'fuse_all', 'reset', 'resize', 'handler',
+                                  'place_progressive', 'place_components', 'place_and', 'place_or',
+                                  'place_not', 'place_inputs', 'place_outputs', 'place_wire_in',
+                                  'place_wire_out', 'place_fuse_in', 'place_fuse_out',
+                                  '_on_fuse', '_on_fuses', '_on_fill', '_on_load', '_on_input',
+                                  '_on_run' ),
+}
+
+stats   = {}
+_classes    = []                        # classi strumentate
+_dump       = [ False ]                 # registrazione della stampa finale
+
+
+def requested():
+    """
+    Indica se la strumentazione è richiesta dalla variabile d'ambiente PLA_PROFILE.
+    """
+    return os.environ.get( 'PLA_PROFILE', '0' ) not in ( '', '0' )
+
+
+def _timed( name, f ):
+    """
+    Restituisce una versione di un metodo che ne aggiorna i contatori.
+
+    @param name: nome del metodo nei contatori
+    @param f: il metodo originale
+    """
+    s   = stats.setdefault( name, [ 0, 0. ] )
+    def timed( *args, **kw ):
+        t   = clock()
+        try:
+            return f( *args, **kw )
+        finally:
+            s[ 0 ]  += 1
+            s[ 1 ]  += clock() - t
+    timed.__name__  = f.__name__
+    timed.__doc__   = f.__doc__
+    timed.profiled  = f
+    return timed
+
+
+def instrument( cls, names ):
+    """
+    Strumenta alcuni metodi di una classe. I metodi già strumentati, o non definiti dalla classe
+    stessa, vengono ignorati.
+
+    @param cls: la classe
+    @param names: nomi dei metodi
+    """
+    for n in names:
+        f   = cls.__dict__.get( n )
+        if f is None or hasattr( f, 'profiled' ):
+            continue
+        setattr( cls, n, _timed( '%s.%s' % ( cls.__name__, n ), f ) )
+    if cls not in _classes:
+        _classes.append( cls )
+
+
+def enable( *classes ):
+    """
+    Attiva la strumentazione dei metodi di I{targets}, e la stampa dei contatori al termine del
+    programma. Le classi dei moduli già importati vengono cercate in sys.modules; le classi
+    indicate come argomenti sostituiscono quelle omonime, ad esempio per Pla quando pla.py è
+    eseguito come programma e il suo modulo si chiama __main__.
+
+    @param classes: classi da strumentare al posto di quelle omonime di I{targets}
+    """
+    given   = dict( ( c.__name__, c ) for c in classes )
+    for ( module, name ), names in targets.items():
+        cls = given.get( name )
+        if cls is None:
+            cls = getattr( sys.modules.get( module ), name, None )
+        if cls is not None:
+            instrument( cls, names )
+    if not _dump[ 0 ]:
+        atexit.register( dump )
+        _dump[ 0 ]  = True
+
+
+def disable():
+    """
+    Ripristina i metodi originali di tutte le classi strumentate; i contatori sono conservati.
+    """
+    for cls in _classes:
+        for n, f in list( cls.__dict__.items() ):
+            if hasattr( f, 'profiled' ):
+                setattr( cls, n, f.profiled )
+    del _classes[ : ]
+
+
+def enabled():
+    """
+    Indica se la strumentazione è attiva.
+    """
+    return bool( _classes )
+
+
+def clear():
+    """
+    Azzera tutti i contatori.
+    """
+    for s in stats.values():
+        s[ : ]  = [ 0, 0. ]
+
+
+def snapshot():
+    """
+    Restituisce i contatori dei metodi chiamati almeno una volta.
+
+    @return: dizionario { nome: ( chiamate, tempo totale in secondi ) }
+    """
+    return dict( ( n, tuple( s ) ) for n, s in stats.items() if s[ 0 ] )
+
+
+def dump( f=None ):
+    """
+    Stampa la tabella dei contatori, in ordine di tempo totale decrescente.
+
+    @param f: file aperto in scrittura; se None lo standard error, o il file indicato da PLA_PROFILE
+    """
+    rows    = sorted( snapshot().items(), key=lambda r: -r[ 1 ][ 1 ] )
+    if not rows:
+        return
+    path    = os.environ.get( 'PLA_PROFILE', '1' )
+    out     = f
+    if out is None:
+        out = sys.stderr if path in ( '', '0', '1' ) else open( path, 'w' )
+    print( '# %-30s %10s %14s %12s' % ( 'metodo', 'chiamate', 'totale [ms]', 'media [ms]' ), file=out )
+    for n, ( calls, t ) in rows:
+        print( '  %-30s %10d %14.3f %12.4f' % ( n, calls, 1e3 * t, 1e3 * t / calls ), file=out )
+    if out is not f and out is not sys.stderr:
+        out.close()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: test_model.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Verifica del modello logico senza interfaccia grafica.
+
+Le uscite di model.PlaModel, calcolate con il motore a maschere di bit conservato tra una
+valutazione e l'altra e aggiornato fusibile per fusibile, sono confrontate con quelle di
+engine.DenseEngine costruito da zero sulle matrici correnti del modello. Il modulo non richiede
+Tkinter né un display:
+
+    python -m unittest test_model
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+"""
+
+import unittest
+from itertools  import product
+from numpy      import asarray
+from numpy.random import RandomState
+from engine     import DenseEngine
+from model      import PlaModel
+import circuits
+
+
+def expected( m ):
+    """
+    Calcola le uscite attese di un modello con DenseEngine, azzerando le porte AND non attive.
+
+    @param m: il modello
+    @type m: PlaModel
+    @return: coppia (uscite AND, uscite del PLA) come liste di bool
+    """
+    e   = DenseEngine( m.and_matrix, m.or_matrix )
+    a   = asarray( e.ands( m.inputs ), dtype=bool ).copy()
+    a[ m.active[ 2 ] : ] = False
+    return a.tolist(), asarray( e.outs( a ), dtype=bool ).tolist()
+
+
+
+class PlaModelTest( unittest.TestCase ):
+
+    def check( self, m ):
+        """
+        Valuta il modello e ne confronta le uscite con quelle attese.
+        """
+        outs    = m.run()
+        a, o    = expected( m )
+        self.assertEqual( m.ands, a )
+        self.assertEqual( outs, o )
+        self.assertEqual( m.outs, o )
+
+
+    def random_inputs( self, m, rs ):
+        for k in range( m.active[ 0 ] ):
+            m.set_input( k, rs.randint( 0, 2 ) )
+
+
+    def test_initial( self ):
+        m   = PlaModel( 4, 3, 6 )
+        self.check( m )
+        self.assertFalse( any( m.ands ) or any( m.outs ) )
+
+
+    def test_load( self ):
+        for c in circuits.circs:
+            m   = PlaModel( c.n_inputs + 1, c.n_outputs + 1, c.n_and + 2 )
+            self.assertTrue( m.load( c ) )
+            self.assertEqual( m.active, ( c.n_inputs, c.n_outputs, c.n_and ) )
+            ref = DenseEngine( c.and_matrix, c.or_matrix )
+            for x in product( ( 0, 1 ), repeat=c.n_inputs ):
+                for k, v in enumerate( x ):
+                    m.set_input( k, v )
+                self.check( m )
+                self.assertEqual( m.outs[ : c.n_outputs ],
+                                  asarray( ref.run( asarray( x ) ), dtype=bool ).tolist() )
+
+
+    def test_load_too_large( self ):
+        c   = circuits.circ_b
+        m   = PlaModel( c.n_inputs - 1, c.n_outputs, c.n_and )
+        self.assertFalse( m.load( c ) )
+
+
+    def test_toggle( self ):
+        rs  = RandomState( 0 )
+        m   = PlaModel( 6, 4, 12 )
+        self.assertTrue( m.load( circuits.circ_h ) )
+        m.run()
+        e   = m.engine()
+        for i in range( 500 ):
+            plane   = 'in' if rs.randint( 0, 2 ) else 'out'
+            shape   = ( m.and_matrix if plane == 'in' else m.or_matrix ).shape
+            m.toggle( plane, rs.randint( 0, shape[ 0 ] ), rs.randint( 0, shape[ 1 ] ) )
+            if i % 3 == 0:
+                self.random_inputs( m, rs )
+            self.check( m )
+        self.assertIs( m.engine(), e )
+
+
+    def test_fill( self ):
+        rs  = RandomState( 1 )
+        m   = PlaModel( 5, 3, 8 )
+        for status in ( False, True, False ):
+            m.run()
+            m.fill( status )
+            self.assertTrue( ( m.and_matrix == status ).all() and ( m.or_matrix == status ).all() )
+            self.assertEqual( m.inputs, [ 0 ] * 5 )
+            self.check( m )
+            for i in range( 100 ):
+                m.toggle( 'in', rs.randint( 0, 8 ), rs.randint( 0, 10 ) )
+                m.toggle( 'out', rs.randint( 0, 8 ), rs.randint( 0, 3 ) )
+                self.random_inputs( m, rs )
+                self.check( m )
+
+
+    def test_invalidation( self ):
+        m   = PlaModel( 3, 2, 4 )
+        m.run()
+        e   = m.engine()
+        m.toggle( 'in', 0, 0 )
+        self.assertIs( m.engine(), e )
+        m.fill( False )
+        self.assertIsNot( m.engine(), e )
+        e   = m.engine()
+        m.load( circuits.circ_h )
+        self.assertIsNot( m.engine(), e )
+        e   = m.engine()
+        m.set_fuses( m.and_matrix, m.or_matrix )
+        self.assertIsNot( m.engine(), e )
+        e   = m.engine()
+        m.resize( 4, 2, 5 )
+        self.assertIsNot( m.engine(), e )
+        self.check( m )
+
+
+    def test_explicit_engine( self ):
+        rs  = RandomState( 2 )
+        m   = PlaModel( 4, 3, 8 )
+        self.assertTrue( m.load( circuits.circ_a ) )
+        self.random_inputs( m, rs )
+        o   = list( m.run() )
+        self.assertEqual( m.run( DenseEngine( m.and_matrix, m.or_matrix ) ), o )
+
+
+    def test_empty( self ):
+        for dims in ( ( 0, 2, 3 ), ( 2, 0, 3 ), ( 2, 2, 0 ), ( 0, 0, 0 ) ):
+            m   = PlaModel( *dims )
+            self.check( m )
+            if dims[ 2 ] and dims[ 1 ]:
+                m.toggle( 'out', 0, 0 )
+                self.check( m )
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: tktrace.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Traccia delle chiamate al canvas del simulatore.
+
+La classe TracedCanvas si sostituisce a Pla.canvas e inoltra al canvas Tkinter ogni chiamata,
+contandola e misurandone il tempo per metodo (create_oval, itemconfigure, delete, gettags, ...) e
+per classe chiamante (Fuse, And, Pla, Viewport, ...). La funzione I{alive} conta invece gli oggetti
+grafici esistenti per prefisso del tag del componente (fuse_in_, and_, or_, wire, ...): un oggetto
+in più del previsto, ad esempio un fusibile disegnato due volte, si nota subito dal numero di
+oggetti per tag.
+
+Pla usa TracedCanvas se è definita la variabile d'ambiente PLA_TKTRACE, e stampa la traccia al
+termine del programma sullo standard error, o nel file indicato da PLA_TKTRACE se questo non vale
+"1". La traccia si può anche attivare su un simulatore già creato con I{trace}, ma in tal caso non
+comprende gli oggetti già disegnati.
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+"""
+
+from __future__ import print_function
+import atexit
+import os
+import sys
+try:
+    from time   import perf_counter as clock
+except ImportError:                     # Python 2
+    from time   import time as clock
+
+
+def requested():
+    """
+    Indica se la traccia è richiesta dalla variabile d'ambiente PLA_TKTRACE.
+    """
+    return os.environ.get( 'PLA_TKTRACE', '0' ) not in ( '', '0' )
+
+
+def caller( frame ):
+    """
+    Restituisce il nome della classe che ha chiamato il canvas: la classe di I{self} nella prima
+    funzione chiamante che non sia una lambda o una list comprehension, oppure la classe in cui è
+    definito il metodo statico, oppure il nome della funzione.
+
+    @param frame: frame della funzione chiamante
+    """
+    while frame.f_code.co_name.startswith( '<' ) and frame.f_back is not None \
+            and 'self' not in frame.f_locals:
+        frame   = frame.f_back
+    obj     = frame.f_locals.get( 'self' )
+    if obj is not None:
+        return type( obj ).__name__
+    name    = getattr( frame.f_code, 'co_qualname', frame.f_code.co_name )
+    return name.split( '.' )[ 0 ]
+
+
+def prefix( tag ):
+    """
+    Restituisce il prefisso di un tag, cioè il tag senza il numero finale: 'fuse_in_' per
+    'fuse_in_12', 'and_' per 'and_3', 'wire' per 'wire'.
+
+    @param tag: il tag
+    """
+    return tag.rstrip( '0123456789' )
+
+
+
+class TracedCanvas( object ):
+    """
+    Canvas Tkinter con contatori delle chiamate.
+
+    Gli attributi non definiti dalla classe sono quelli del canvas; i metodi vengono avvolti da
+    una funzione che aggiorna i contatori, creata alla prima richiesta e poi conservata
+    nell'istanza.
+
+    @ivar canvas: il canvas Tkinter
+    @ivar calls: contatori per metodo e classe chiamante: lista [chiamate, tempo totale in secondi]
+    @type calls: dict { (metodo, classe): list }
+    """
+
+    def __init__( self, canvas ):
+        """
+        @param canvas: il canvas Tkinter da tracciare
+        """
+        self.canvas     = canvas
+        self.calls      = {}
+
+
+    def __getattr__( self, name ):
+        f       = getattr( self.canvas, name )
+        if not callable( f ):
+            return f
+        calls   = self.calls
+
+        def traced( *args, **kw ):
+            key = ( name, caller( sys._getframe( 1 ) ) )
+            t   = clock()
+            try:
+                return f( *args, **kw )
+            finally:
+                s   = calls.get( key )
+                if s is None:
+                    s   = calls[ key ] = [ 0, 0. ]
+                s[ 0 ]  += 1
+                s[ 1 ]  += clock() - t
+        traced.__name__ = name
+        setattr( self, name, traced )
+        return traced
+
+
+    def clear( self ):
+        """
+        Azzera i contatori.
+        """
+        self.calls.clear()
+
+
+    def by_method( self ):
+        """
+        Restituisce i contatori sommati su tutte le classi chiamanti.
+
+        @return: dizionario { metodo: ( chiamate, tempo totale in secondi ) }
+        """
+        d   = {}
+        for ( m, c ), ( n, t ) in self.calls.items():
+            s   = d.get( m, ( 0, 0. ) )
+            d[ m ]  = ( s[ 0 ] + n, s[ 1 ] + t )
+        return d
+
+
+    def alive( self ):
+        """
+        Conta gli oggetti grafici esistenti per prefisso del primo tag, che è quello del
+        componente; gli oggetti senza tag sono contati sotto ''.
+
+        @return: dizionario { prefisso: ( oggetti, tag distinti ) }
+        """
+        cv      = self.canvas
+        items   = {}
+        tags    = {}
+        for i in cv.find_all():
+            t   = cv.gettags( i )
+            t   = t[ 0 ] if t else ''
+            p   = prefix( t )
+            items[ p ]  = items.get( p, 0 ) + 1
+            tags.setdefault( p, set() ).add( t )
+        return dict( ( p, ( n, len( tags[ p ] ) ) ) for p, n in items.items() )
+
+
+    def report( self, f=None ):
+        """
+        Stampa i contatori per metodo, per metodo e classe chiamante, e gli oggetti esistenti
+        per prefisso di tag, in ordine di tempo o di numero decrescente. Se il canvas è già stato
+        distrutto, al posto degli oggetti esistenti viene stampata una riga che lo segnala.
+
+        @param f: file aperto in scrittura, se None lo standard error
+        """
+        f       = f or sys.stderr
+        line    = '  %-28s %10d %14.3f %12.4f'
+        print( '# %-28s %10s %14s %12s' % ( 'metodo', 'chiamate', 'totale [ms]', 'media [ms]' ), file=f )
+        for m, ( n, t ) in sorted( self.by_method().items(), key=lambda r: -r[ 1 ][ 1 ] ):
+            print( line % ( m, n, 1e3 * t, 1e3 * t / n ), file=f )
+        print( '# %-28s %10s %14s %12s' % ( 'metodo / classe', 'chiamate', 'totale [ms]', 'media [ms]' ),
+               file=f )
+        for ( m, c ), ( n, t ) in sorted( self.calls.items(), key=lambda r: -r[ 1 ][ 1 ] ):
+            print( line % ( '%s / %s' % ( m, c ), n, 1e3 * t, 1e3 * t / n ), file=f )
+        if sys.version_info[ 0 ] == 2:
+            from Tkinter    import TclError
+        else:
+            from tkinter    import TclError
+        try:
+            alive   = self.alive()
+        except TclError:
+            print( '# canvas distrutto: oggetti esistenti non disponibili', file=f )
+            return
+        print( '# %-28s %10s %14s' % ( 'prefisso', 'oggetti', 'tag distinti' ), file=f )
+        for p, ( n, k ) in sorted( alive.items(), key=lambda r: -r[ 1 ][ 0 ] ):
+            print( '  %-28s %10d %14d' % ( p or "''", n, k ), file=f )
+
+
+
+def trace( pla ):
+    """
+    Sostituisce il canvas di un simulatore con un TracedCanvas, e ne registra la stampa al termine
+    del programma (vedi I{dump}). Se il canvas è già tracciato non viene modificato.
+
+    @param pla: il simulatore
+    @type pla: Pla
+    @return: il TracedCanvas
+    """
+    if not isinstance( pla.canvas, TracedCanvas ):
+        pla.canvas  = TracedCanvas( pla.canvas )
+        atexit.register( dump, pla.canvas )
+    return pla.canvas
+
+
+def dump( traced ):
+    """
+    Stampa la traccia di un canvas sullo standard error, o nel file indicato da PLA_TKTRACE.
+    Se la finestra è già stata distrutta la traccia comprende i contatori delle chiamate, ma non
+    gli oggetti esistenti (vedi TracedCanvas.report).
+
+    @param traced: il canvas tracciato
+    @type traced: TracedCanvas
+    """
+    path    = os.environ.get( 'PLA_TKTRACE', '1' )
+    f       = sys.stderr if path in ( '', '0', '1' ) else open( path, 'w' )
+    try:
+        traced.report( f )
+    finally:
+        if f is not sys.stderr:
+            f.close()
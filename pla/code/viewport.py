@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+# ======================================================================================================= #
+#
+#   $Log: viewport.py,v $
+#
+# ======================================================================================================= #
+
+"""
+Visualizzazione parziale delle matrici di fusibili, per PLA di grandi dimensioni.
+
+Con centinaia di ingressi e migliaia di porte AND non è possibile creare un oggetto Fuse, e due
+oggetti grafici, per ogni fusibile. In questo caso lo stato dei fusibili è conservato soltanto
+nelle matrici del modello (model.PlaModel), e la classe Viewport mantiene un insieme di oggetti
+Fuse che rappresentano i soli fusibili visibili nella finestra, più un margine.
+Quando la vista viene spostata o ingrandita, i fusibili usciti dalla zona visibile vengono
+riutilizzati per quelli entrati, spostandone gli oggetti grafici anziché crearne di nuovi.
+
+Con la vista rimpicciolita i fusibili sono larghi uno o due pixel, e disegnarli uno per uno non
+ha senso: sotto la soglia I{Viewport.lod_pitch} ciascuna matrice della zona visibile diventa
+un'unica immagine PhotoImage, costruita con operazioni NumPy a partire dallo stato dei fusibili.
+Il cambio di stato di un singolo fusibile modifica allora solo i pixel corrispondenti.
+
+@authors: Alice Plebe, Matteo Cavallaro
+@version: 3.0
+"""
+
+from sys import version_info
+if version_info[0]==2:
+    from Tkinter    import PhotoImage
+    from Tkinter    import HIDDEN, NORMAL, NW
+elif version_info[0]==3:
+    from tkinter    import PhotoImage
+    from tkinter    import HIDDEN, NORMAL, NW
+from itertools  import chain, product
+from math       import ceil, floor
+from numpy      import arange, floor as a_floor, abs as a_abs, empty, uint8, flatnonzero
+from component  import Fuse
+
+
+class Viewport( object ):
+    """
+    Insieme dei fusibili disegnati nella zona visibile del canvas.
+
+    @cvar margin: margine aggiunto su ogni lato della zona visibile
+    @type margin: frazione della dimensione della finestra
+    @cvar limit: numero massimo di fusibili disegnati; se la zona visibile ne contiene di più,
+    le matrici vengono rappresentate come immagini
+    @cvar lod_pitch: passo di griglia in pixel sotto il quale le matrici vengono rappresentate
+    come immagini
+    @cvar image_tag: tag comune delle immagini delle matrici
+    @ivar pla: il simulatore
+    @type pla: Pla
+    @ivar shown: fusibili disegnati, indicizzati da (matrice, riga, colonna)
+    @ivar free: fusibili non utilizzati, pronti per essere riposizionati
+    @ivar window: intervalli di righe e colonne correntemente disegnati
+    @ivar pending: identificativo dell'aggiornamento programmato con after_idle, o None
+    @ivar image: vale True se le matrici sono correntemente rappresentate come immagini
+    @ivar images: per ciascuna matrice, la coppia (PhotoImage, oggetto grafico del canvas)
+    @ivar regions: per ciascuna matrice, la zona rappresentata nell'immagine (vedi I{_render})
+    """
+
+    margin      = 0.5           # margine su ogni lato, in frazione della finestra
+    limit       = 20000         # massimo numero di fusibili disegnati
+    lod_pitch   = 8             # passo di griglia minimo per disegnare i singoli fusibili [pixel]
+    image_tag   = 'fuse_image'  # tag comune delle immagini
+
+
+    def __init__( self, pla ):
+        """
+        Inizializza la vista, senza disegnare alcun fusibile.
+
+        @param pla: il simulatore
+        @type pla: Pla
+        """
+        self.pla        = pla
+        self.shown      = {}
+        self.free       = []
+        self.window     = None
+        self.pending    = None
+        self.image      = False
+        self.images     = {}
+        self.regions    = {}
+
+
+
+    def _range( self, start, n, lo, hi ):
+        """
+        Calcola l'intervallo di indici di un reticolo regolare compreso tra due coordinate.
+
+        @param start: coordinata del primo elemento del reticolo
+        @param n: numero di elementi del reticolo
+        @param lo: coordinata inferiore della zona
+        @param hi: coordinata superiore della zona
+        @return: coppia (primo, ultimo + 1)
+        """
+        d       = self.pla.grid_delta
+        i0      = max( 0, int( ceil( ( lo - start ) / d ) ) )
+        i1      = min( n, int( floor( ( hi - start ) / d ) ) + 1 )
+        return ( i0, max( i0, i1 ) )
+
+
+    def visible( self ):
+        """
+        Calcola gli intervalli di righe e colonne delle matrici che cadono nella zona visibile
+        del canvas, margine compreso.
+
+        @return: tupla (righe, colonne IN-AND, colonne AND-OR) di coppie (primo, ultimo + 1)
+        """
+        pla     = self.pla
+        cv      = pla.canvas
+        h       = pla.size[ 1 ] * pla.zoom
+        w_px    = cv.winfo_width()
+        h_px    = cv.winfo_height()
+        if w_px <= 1:
+            w_px, h_px  = float( cv.cget( 'width' ) ), float( cv.cget( 'height' ) )
+
+        x0, x1  = cv.canvasx( 0 ) / h, cv.canvasx( w_px ) / h
+        y0, y1  = cv.canvasy( 0 ) / h, cv.canvasy( h_px ) / h
+        mx      = self.margin * ( x1 - x0 )
+        my      = self.margin * ( y1 - y0 )
+        x0, x1  = x0 - mx, x1 + mx
+        y0, y1  = y0 - my, y1 + my
+
+        return ( self._range( pla.and_start, pla.n_and, y0, y1 ),
+                 self._range( pla.not_start, 2 * pla.n_not, x0, x1 ),
+                 self._range( pla.or_start, pla.n_or, x0, x1 ) )
+
+
+    def cells( self, window ):
+        """
+        Restituisce l'insieme dei fusibili compresi negli intervalli indicati.
+
+        @param window: intervalli di righe e colonne, come restituiti da I{visible}
+        @return: insieme di tuple (matrice, riga, colonna)
+        """
+        rows, c_in, c_out   = window
+        rows    = range( *rows )
+        return set( chain( product( ( 'in', ), rows, range( *c_in ) ),
+                           product( ( 'out', ), rows, range( *c_out ) ) ) )
+
+
+
+    def refresh( self, force=False ):
+        """
+        Aggiorna i fusibili disegnati in base alla zona visibile del canvas.
+        I fusibili usciti dalla zona vengono parcheggiati e riutilizzati per quelli entrati.
+
+        @param force: se True ricalcola la zona anche se gli intervalli non sono cambiati,
+        ad esempio dopo un cambio di ingrandimento
+        """
+        self.pending    = None
+        window          = self.visible()
+        if window == self.window and not force:
+            return
+        self.window     = window
+
+        pla     = self.pla
+        rows, c_in, c_out   = window
+        n       = ( rows[ 1 ] - rows[ 0 ] ) * ( c_in[ 1 ] - c_in[ 0 ] + c_out[ 1 ] - c_out[ 0 ] )
+        pitch   = pla.grid_delta * pla.size[ 1 ] * pla.zoom
+        self.image  = pitch < self.lod_pitch or n > self.limit
+
+        if self.image:
+            wanted  = set()
+            self._render( 'in', rows, c_in )
+            self._render( 'out', rows, c_out )
+        else:
+            wanted  = self.cells( window )
+            for plane in self.images:
+                self._hide( plane )
+
+        for k in [ k for k in self.shown if k not in wanted ]:
+            f   = self.shown.pop( k )
+            f.park( pla )
+            self.free.append( f )
+
+        for k in wanted.difference( self.shown ):
+            plane, r, c = k
+            x, y        = pla.fuse_center( plane, r, c )
+            m           = pla.model.and_matrix if plane == 'in' else pla.model.or_matrix
+            tags        = pla.fuse_tags( plane, r, c )
+            if self.free:
+                f       = self.free.pop()
+                f.place( pla, x, y, m[ r, c ], tags )
+            else:
+                f       = Fuse( pla, x, y, 'view_', tags )
+                f.set( pla, m[ r, c ] )
+            self.shown[ k ] = f
+
+        if pla.debug > 1:
+            print("viewport: %d fusibili disegnati, %d liberi, immagini %s" % (
+                    len( self.shown ), len( self.free ), self.image ))
+
+
+
+    def reset( self ):
+        """
+        Rimette tra i fusibili liberi tutti quelli disegnati e nasconde le immagini, ad esempio
+        dopo un cambio di dimensioni del PLA; il successivo I{refresh} ridisegna la vista.
+        """
+        for f in self.shown.values():
+            f.park( self.pla )
+            self.free.append( f )
+        self.shown  = {}
+        self.window = None
+        for plane in list( self.images ):
+            self._hide( plane )
+
+
+
+    def _hide( self, plane ):
+        """
+        Nasconde l'immagine di una matrice.
+
+        @param plane: matrice, 'in' oppure 'out'
+        """
+        if plane in self.images and self.regions.get( plane ) is not None:
+            self.pla.canvas.itemconfigure( self.images[ plane ][ 1 ], state=HIDDEN )
+        self.regions[ plane ]   = None
+
+
+    def _render( self, plane, rows, cols ):
+        """
+        Costruisce l'immagine di una porzione di matrice, con un'unica operazione vettoriale.
+
+        Ogni pixel viene ricondotto alla cella del reticolo che lo contiene e alla posizione
+        all'interno della cella: i pixel sul cerchio di un fusibile collegato e quelli sulla linea
+        di riga fuori dai cerchi hanno il colore dei fusibili, tutti gli altri il colore di sfondo.
+        Un fusibile interrotto appare quindi come un'interruzione della linea.
+
+        @param plane: matrice, 'in' per IN-AND oppure 'out' per AND-OR
+        @param rows: intervallo (primo, ultimo + 1) delle righe
+        @param cols: intervallo (primo, ultimo + 1) delle colonne
+        """
+        ( r0, r1 ), ( c0, c1 )  = rows, cols
+        if r0 == r1 or c0 == c1:
+            self._hide( plane )
+            return
+
+        pla     = self.pla
+        cv      = pla.canvas
+        m       = pla.model.and_matrix if plane == 'in' else pla.model.or_matrix
+        h       = pla.size[ 1 ] * pla.zoom
+        d       = pla.grid_delta
+        pitch   = d * h
+        x_start, y_start    = pla.fuse_center( plane, 0, 0 )
+
+        x0      = int( floor( h * ( x_start + c0 * d ) - pitch / 2 ) )
+        y0      = int( floor( h * ( y_start + r0 * d ) - pitch / 2 ) )
+        w       = int( ceil( h * ( x_start + ( c1 - 1 ) * d ) + pitch / 2 ) ) - x0
+        hh      = int( ceil( h * ( y_start + ( r1 - 1 ) * d ) + pitch / 2 ) ) - y0
+
+        u       = ( ( x0 + arange( w ) + 0.5 ) / h - x_start ) / d + 0.5
+        v       = ( ( y0 + arange( hh ) + 0.5 ) / h - y_start ) / d + 0.5
+        cx      = a_floor( u ).astype( int ).clip( c0, c1 - 1 )
+        cy      = a_floor( v ).astype( int ).clip( r0, r1 - 1 )
+        rf      = max( 0.5 * Fuse.size * pla.unit / d, 0.5 / pitch )
+        dot_x   = a_abs( u - a_floor( u ) - 0.5 ) <= rf
+        dot_y   = a_abs( v - a_floor( v ) - 0.5 ) <= rf
+        line_y  = a_abs( v - a_floor( v ) - 0.5 ) <= 0.5 / pitch
+
+        dot     = dot_y[ :, None ] & dot_x[ None, : ]
+        on      = ( line_y[ :, None ] & ~dot ) | ( dot & m[ cy[ :, None ], cx[ None, : ] ] )
+
+        rgb     = empty( ( hh, w, 3 ), dtype=uint8 )
+        rgb[ ... ]  = [ c >> 8 for c in pla.root.winfo_rgb( pla.background ) ]
+        rgb[ on ]   = [ c >> 8 for c in pla.root.winfo_rgb( Fuse.color ) ]
+        data    = ( 'P6 %d %d 255\n' % ( w, hh ) ).encode( 'ascii' ) + rgb.tobytes()
+
+        if plane not in self.images:
+            photo   = PhotoImage( master=pla.root, data=data, format='PPM' )
+            item    = cv.create_image( x0, y0, image=photo, anchor=NW,
+                        tags=( self.image_tag, pla.plane_tag( plane ) ) )
+            self.images[ plane ]    = ( photo, item )
+        else:
+            photo, item = self.images[ plane ]
+            photo.blank()
+            photo.configure( data=data, format='PPM', width=w, height=hh )
+            cv.coords( item, x0, y0 )
+            if self.regions.get( plane ) is None:
+                cv.itemconfigure( item, state=NORMAL )
+        self.regions[ plane ]   = ( rows, cols, cx, cy, dot_x, dot_y )
+
+
+    def schedule( self ):
+        """
+        Programma un aggiornamento della vista non appena Tkinter è inattivo.
+        Più richieste ravvicinate, ad esempio durante il trascinamento, producono un solo aggiornamento.
+        """
+        if self.pending is None:
+            self.pending    = self.pla.root.after_idle( self.refresh )
+
+
+
+    def update( self, plane, r, c ):
+        """
+        Aggiorna la rappresentazione di un fusibile dopo un cambio di stato nelle matrici del
+        simulatore: il fusibile disegnato, se visibile, oppure i pixel della sua cella nell'immagine.
+
+        @param plane: matrice del fusibile, 'in' oppure 'out'
+        @param r: riga del fusibile
+        @param c: colonna del fusibile
+        """
+        pla     = self.pla
+        status  = ( pla.model.and_matrix if plane == 'in' else pla.model.or_matrix )[ r, c ]
+        f       = self.fuse( plane, r, c )
+        if f is not None:
+            f.set( pla, status )
+            return
+
+        region  = self.regions.get( plane )
+        if region is None:
+            return
+        rows, cols, cx, cy, dot_x, dot_y    = region
+        if not ( rows[ 0 ] <= r < rows[ 1 ] and cols[ 0 ] <= c < cols[ 1 ] ):
+            return
+        xs      = flatnonzero( ( cx == c ) & dot_x )
+        ys      = flatnonzero( ( cy == r ) & dot_y )
+        color   = Fuse.color if status else pla.background
+        self.images[ plane ][ 0 ].put( color, to=( xs[ 0 ], ys[ 0 ], xs[ -1 ] + 1, ys[ -1 ] + 1 ) )
+
+
+
+    def fuse( self, plane, r, c ):
+        """
+        Restituisce il fusibile disegnato in una posizione, o None se la posizione non è visibile.
+
+        @param plane: matrice del fusibile, 'in' oppure 'out'
+        @param r: riga del fusibile
+        @param c: colonna del fusibile
+        @rtype: Fuse
+        """
+        return self.shown.get( ( plane, r, c ) )
+
+
+    def fuses( self ):
+        """
+        Restituisce un iteratore su tutti i fusibili della vista, disegnati e parcheggiati.
+        """
+        return chain( self.shown.values(), self.free )
+
+
+    def sync( self ):
+        """
+        Allinea i fusibili disegnati allo stato delle matrici del simulatore.
+
+        Come in Pla._on_fuses, se i fusibili da modificare sono più di quelli che differiscono
+        dallo stato prevalente, tutti i fusibili della vista vengono prima portati in quello stato
+        con Fuse.set_all.
+
+        Se le matrici sono rappresentate come immagini, queste vengono ricostruite.
+
+        @return: numero di fusibili modificati singolarmente
+        """
+        pla     = self.pla
+        if self.image and self.window is not None:
+            rows, c_in, c_out   = self.window
+            self._render( 'in', rows, c_in )
+            self._render( 'out', rows, c_out )
+            return 0
+
+        target  = {}
+        for k in self.shown:
+            plane, r, c = k
+            m           = pla.model.and_matrix if plane == 'in' else pla.model.or_matrix
+            target[ k ] = bool( m[ r, c ] )
+
+        on      = sum( target.values() )
+        major   = 2 * on >= len( target )
+        minor   = on if not major else len( target ) - on
+        changed = sum( f.status != target[ k ] for k, f in self.shown.items() )
+        if minor + 1 < changed:
+            Fuse.set_all( pla, major, self.fuses() )
+
+        n       = 0
+        for k, f in self.shown.items():
+            if f.status != target[ k ]:
+                f.set( pla, target[ k ] )
+                n   += 1
+        return n